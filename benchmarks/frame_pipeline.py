@@ -0,0 +1,281 @@
+"""
+帧管线性能基准测试。
+
+在无界面环境（SDL_VIDEODRIVER=dummy）下构建 100 ~ 100k 个节点的合成 UI 树，
+测量渲染命令生成、渲染、命中测试、事件处理和各个布局器的耗时。
+
+结果以 JSON 格式输出，可以保存为基准文件，之后与基准文件对比，
+耗时超过阈值的项目视为性能退化，此时以退出码 1 结束。
+
+用法：
+    python benchmarks/frame_pipeline.py [--sizes 100 1000 ...] [--output FILE]
+        [--baseline FILE] [--threshold 0.2] [--config retained_mode ...]
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import json
+import random
+import argparse
+import platform
+import statistics
+from pathlib import Path
+from collections.abc import Callable
+from time import perf_counter_ns as get_time_ns
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+CWD = Path(__file__).parent.parent
+sys.path.insert(0, str(CWD))
+
+import fantas  # pylint: disable=wrong-import-position
+
+DEFAULT_SIZES = (100, 1000, 10000, 100000)  # 默认测试的节点数量
+WINDOW_SIZE = (1280, 720)  # 测试窗口尺寸
+PANEL_CAPACITY = 100  # 每个面板容纳的标签数量
+LABEL_SIZE = 8  # 标签边长（像素）
+SAMPLE_POINTS = 1000  # 命中测试和事件处理的采样点数量
+MIN_DELTA_MS = 0.05  # 低于此差值（毫秒）的变化视为噪声，不判定为退化
+
+
+def measure(func: Callable[[], object], repeat: int) -> float:
+    """
+    测量函数单次调用的耗时中位数。
+    Args:
+        func (Callable[[], object]): 被测函数。
+        repeat (int): 重复次数。
+    Returns:
+        float: 耗时中位数（毫秒）。
+    """
+    func()  # 预热
+    times = []
+    for _ in range(repeat):
+        start = get_time_ns()
+        func()
+        times.append(get_time_ns() - start)
+    return statistics.median(times) / 1_000_000
+
+
+def get_repeat(count: int) -> int:
+    """
+    根据节点数量决定重复次数，节点越多重复越少。
+    Args:
+        count (int): 节点数量。
+    Returns:
+        int: 重复次数。
+    """
+    return max(3, min(50, 100_000 // count))
+
+
+def build_tree(window: fantas.Window, count: int) -> list[fantas.UI]:
+    """
+    构建合成 UI 树，标签按面板分组并铺满窗口。
+    Args:
+        window (fantas.Window): 窗口对象。
+        count (int): 标签数量。
+    Returns:
+        list[fantas.UI]: 所有标签。
+    """
+    columns = WINDOW_SIZE[0] // LABEL_SIZE
+    rows = WINDOW_SIZE[1] // LABEL_SIZE
+    labels: list[fantas.UI] = []
+    panel = None
+    for i in range(count):
+        if i % PANEL_CAPACITY == 0:
+            panel = fantas.BlankUI(fantas.Rect((0, 0), WINDOW_SIZE))
+            window.append(panel)
+        cell = i % (columns * rows)
+        label = fantas.Label(
+            fantas.Rect(
+                cell % columns * LABEL_SIZE,
+                cell // columns * LABEL_SIZE,
+                LABEL_SIZE,
+                LABEL_SIZE,
+            ),
+            fantas.LabelStyle(bgcolor=(i * 37 % 256, i * 91 % 256, i * 53 % 256)),
+        )
+        panel.append(label)  # type: ignore[union-attr]
+        labels.append(label)
+    window.root_ui.build_pass_path_cache()
+    return labels
+
+
+def build_layouts(count: int) -> dict[str, fantas.Layout]:
+    """
+    为每种布局器构建包含 count 个子元素的布局。
+    Args:
+        count (int): 子元素数量。
+    Returns:
+        dict[str, fantas.Layout]: 布局器类名到布局器的映射。
+    """
+    docks = (
+        fantas.DockMode.LEFT,
+        fantas.DockMode.TOP,
+        fantas.DockMode.RIGHT,
+        fantas.DockMode.BOTTOM,
+        fantas.DockMode.NONE,
+    )
+    side = max(1, int(count**0.5))
+    relative = fantas.RelativeLayout()
+    ratio = fantas.RatioLayout()
+    dock = fantas.DockLayout()
+    grid = fantas.GridLayout()
+    grid.set_size(side, (count + side - 1) // side)
+    for i in range(count):
+        relative.append(
+            fantas.BlankUI(fantas.Rect(0, 0, 10, 10)), i % 50, i % 30, i % 20 or None
+        )
+        ratio.append(fantas.BlankUI(fantas.Rect(0, 0, 10, 10)), 0.1, 0.2, 0.5, 0.25)
+        dock.append(fantas.BlankUI(fantas.Rect(0, 0, 1, 1)), docks[i % len(docks)])
+        grid.append(fantas.BlankUI(fantas.Rect(0, 0, 10, 10)), i % side, i // side)
+    layouts: dict[str, fantas.Layout] = {}
+    for layout in (relative, ratio, dock, grid):
+        father = fantas.BlankUI(fantas.Rect((0, 0), WINDOW_SIZE))
+        father.append(layout)
+        layouts[type(layout).__name__] = layout
+    return layouts
+
+
+def bench_size(count: int, config: dict[str, bool]) -> dict[str, float]:
+    """
+    测量一种节点数量下的各项耗时。
+    Args:
+        count (int): 节点数量。
+        config (dict[str, bool]): 额外启用的 WindowConfig 选项。
+    Returns:
+        dict[str, float]: 测试项名称到耗时（毫秒）的映射。
+    """
+    window = fantas.Window(fantas.WindowConfig(window_size=WINDOW_SIZE, **config))
+    build_tree(window, count)
+    renderer = window.renderer
+    root_ui = window.root_ui
+    screen = window.screen
+    repeat = get_repeat(count)
+    rng = random.Random(count)
+    points = [
+        (rng.randrange(WINDOW_SIZE[0]), rng.randrange(WINDOW_SIZE[1]))
+        for _ in range(SAMPLE_POINTS)
+    ]
+    events = [
+        fantas.Event(
+            fantas.MOUSEMOTION,
+            pos=point,
+            rel=(0, 0),
+            buttons=(0, 0, 0),
+            touch=False,
+            window=window,
+        )
+        for point in points
+    ]
+
+    def hit_test() -> None:
+        for point in points:
+            renderer.coordinate_hit_test(point)
+
+    def handle_events() -> None:
+        for event in events:
+            window.event_handler.handle_event(event)
+
+    results = {
+        "pre_render": measure(lambda: renderer.pre_render(root_ui), repeat),
+        "render": measure(lambda: renderer.render(screen), repeat),
+        # 采样点的总耗时换算为单次调用耗时
+        "coordinate_hit_test": measure(hit_test, repeat) / SAMPLE_POINTS,
+        "handle_event": measure(handle_events, repeat) / SAMPLE_POINTS,
+    }
+    window.destroy()
+    for name, layout in build_layouts(count).items():
+        results[f"auto_layout.{name}"] = measure(layout.auto_layout, repeat)
+    return results
+
+
+def compare(
+    results: dict[str, float], baseline: dict[str, float], threshold: float
+) -> list[str]:
+    """
+    与基准结果对比并打印对比表格。
+    Args:
+        results (dict[str, float]): 本次结果。
+        baseline (dict[str, float]): 基准结果。
+        threshold (float): 允许的相对增幅，比如 0.2 表示慢 20% 以内不算退化。
+    Returns:
+        list[str]: 发生退化的测试项名称。
+    """
+    regressions = []
+    print(f"{'benchmark':<40}{'baseline':>12}{'current':>12}{'change':>10}")
+    for key, current in results.items():
+        base = baseline.get(key)
+        if base is None:
+            print(f"{key:<40}{'-':>12}{current:>12.4f}{'new':>10}")
+            continue
+        change = (current - base) / base if base else 0.0
+        mark = ""
+        if change > threshold and current - base > MIN_DELTA_MS:
+            regressions.append(key)
+            mark = "  <- regression"
+        print(f"{key:<40}{base:>12.4f}{current:>12.4f}{change:>+10.1%}{mark}")
+    return regressions
+
+
+def main() -> int:
+    """
+    命令行入口。
+    Returns:
+        int: 退出码，发生性能退化时为 1。
+    """
+    parser = argparse.ArgumentParser(description="fantas 帧管线性能基准测试")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="测试的节点数量"
+    )
+    parser.add_argument("--output", type=Path, help="结果 JSON 的保存路径")
+    parser.add_argument("--baseline", type=Path, help="用于对比的基准 JSON 路径")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="判定为退化的相对增幅"
+    )
+    parser.add_argument(
+        "--config",
+        nargs="*",
+        default=[],
+        help="额外启用的 WindowConfig 布尔选项，比如 retained_mode dirty_rect",
+    )
+    args = parser.parse_args()
+
+    config = {name: True for name in args.config}
+    results: dict[str, float] = {}
+    for count in args.sizes:
+        print(f"benchmarking {count} nodes ...", flush=True)
+        for name, value in bench_size(count, config).items():
+            results[f"{name}[{count}]"] = value
+
+    data = {
+        "meta": {
+            "fantas": fantas.__version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "config": sorted(config),
+        },
+        "results": results,
+    }
+    if args.output is not None:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(data, indent=4), encoding="utf-8")
+        print(f"results saved to {args.output}")
+
+    baseline: dict[str, float] = {}
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))["results"]
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(
+            f"{len(regressions)} benchmark(s) regressed by more than "
+            f"{args.threshold:.0%}"
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -50,6 +50,8 @@ CWD = Path(__file__).parent
 
 FANTAS_SOURCE_DIR = CWD / "fantas"  # fantas 项目的源代码目录
 FANTAS_DIST_DIR = CWD / "dist"  # fantas 项目的构建输出目录
+BENCHMARK_DIR = CWD / "benchmarks"  # 性能基准测试目录
+BENCHMARK_BASELINE = BENCHMARK_DIR / "baseline.json"  # 默认的性能基准文件
 
 
 def check_git_clean() -> None:
@@ -271,7 +273,7 @@ def _format(py: Path, ignore_git: bool) -> None:
     """
     pprint("格式化代码中", prompt="dev")
 
-    cmd_run([py, "-m", "black", "fantas", "tests", "tools", "dev.py"])
+    cmd_run([py, "-m", "black", "fantas", "tests", "tools", "benchmarks", "dev.py"])
 
     pprint("检查 fantas/__init__.py 中的版本是否与 pyproject.toml 中一致", prompt="dev")
 
@@ -391,6 +393,49 @@ def _test(py: Path, mod: list[Path]) -> None:
     pprint("测试已通过", prompt="dev", col=Colors.SUCCESS)
 
 
+def _bench(
+    py: Path,
+    sizes: list[int],
+    baseline: Path | None,
+    output: Path | None,
+    threshold: float,
+) -> None:
+    """
+    执行 bench 子命令，运行帧管线性能基准测试
+
+    Args:
+        py: Python 可执行文件的路径，用于运行基准测试
+        sizes: 测试的节点数量列表，如果列表为空则使用默认值
+        baseline: 用于对比的基准文件，为 None 时如果存在默认基准文件则使用它
+        output: 结果的保存路径，为 None 则不保存
+        threshold: 判定为性能退化的相对增幅
+    """
+    pprint("运行性能基准测试中", prompt="dev")
+
+    cmd: list[str | Path] = [
+        py,
+        BENCHMARK_DIR / "frame_pipeline.py",
+        "--threshold",
+        str(threshold),
+    ]
+    if sizes:
+        cmd.extend(["--sizes", *map(str, sizes)])
+    if baseline is None and BENCHMARK_BASELINE.exists():
+        baseline = BENCHMARK_BASELINE
+    if baseline is not None:
+        pprint(f"与基准文件 {baseline} 对比", prompt="dev", col=Colors.INFO)
+        cmd.extend(["--baseline", baseline])
+    if output is not None:
+        cmd.extend(["--output", output])
+    try:
+        cmd_run(cmd)
+    except subprocess.CalledProcessError:
+        pprint("性能基准测试未通过，存在性能退化", prompt="dev", col=Colors.ERROR)
+        sys.exit(1)
+
+    pprint("性能基准测试已完成", prompt="dev", col=Colors.SUCCESS)
+
+
 def _build(poetry_path: Path, py: Path, target: Path, install: bool) -> None:
     """
     执行 build 子命令，使用 Poetry 构建项目
@@ -816,6 +861,31 @@ def test(
     _test(venv_py, mod)
 
 
+@command
+def bench(
+    sizes: Annotated[
+        list[int],
+        typer.Argument(help="测试的节点数量。如果不提供，则测试 100 ~ 100000 个节点。"),
+    ] = [],
+    baseline: Annotated[
+        Path | None,
+        typer.Option("--baseline", "-b", help="用于对比的基准文件"),
+    ] = None,
+    output: Annotated[
+        Path | None, typer.Option("--output", "-o", help="结果的保存路径")
+    ] = None,
+    threshold: Annotated[
+        float, typer.Option("--threshold", "-t", help="判定为性能退化的相对增幅")
+    ] = 0.2,
+    ignore_git: IgnoreGitOption = False,
+) -> None:
+    """
+    运行性能基准测试
+    """
+    _, venv_py = _prep_all()
+    _bench(venv_py, sizes, baseline, output, threshold)
+
+
 @command
 def build(
     target: Annotated[Path, typer.Argument(help="whl 文件输出目录")] = FANTAS_DIST_DIR,
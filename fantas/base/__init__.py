@@ -6,6 +6,7 @@ from .fantas_typing import *
 from .constants import *
 from .misc import *
 from .nodebase import *
+from .hook import *
 from .window import *
 from .renderer import *
 from .event_handler import *
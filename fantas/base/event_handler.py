@@ -3,14 +3,100 @@
 """
 
 from __future__ import annotations
+import weakref
 from dataclasses import dataclass, field
 
 import fantas
 
-__all__ = ("EventHandler",)
+__all__ = (
+    "EventHandler",
+    "WeakListener",
+    "coalesce_mousemotion",
+)
 
+# 派发链缓存的最大条目数量，超过后清空重建
+MAX_DISPATCH_CACHE = 4096
 
-@dataclass(slots=True)
+
+def coalesce_mousemotion(events: list[fantas.Event]) -> list[fantas.Event]:
+    """
+    合并连续的、属于同一窗口的鼠标移动事件，避免对中间位置做无用的命中测试。
+    合并后的事件使用最后一个事件的位置，rel 为所有事件之和，buttons 为所有事件按位或。
+    Args:
+        events (list[fantas.Event]): 一帧内的事件列表。
+    Returns:
+        list[fantas.Event]: 合并后的事件列表，没有可以合并的事件时返回原列表。
+    """
+    MOUSEMOTION = fantas.MOUSEMOTION  # pylint: disable=invalid-name
+    result: list[fantas.Event] = []
+    merged = False
+    for event in events:
+        last = result[-1] if result else None
+        if (
+            last is None
+            or event.type != MOUSEMOTION
+            or last.type != MOUSEMOTION
+            or getattr(event, "window", None) is not getattr(last, "window", None)
+            or getattr(event, "touch", False) != getattr(last, "touch", False)
+        ):
+            result.append(event)
+            continue
+        attrs = event.dict.copy()
+        attrs["rel"] = (last.rel[0] + event.rel[0], last.rel[1] + event.rel[1])
+        attrs["buttons"] = tuple(a | b for a, b in zip(last.buttons, event.buttons))
+        result[-1] = fantas.Event(MOUSEMOTION, attrs)
+        merged = True
+    return result if merged else events
+
+
+class WeakListener:
+    """
+    弱引用监听器，只保存绑定方法的弱引用，不会阻止方法所属的对象被回收。
+    对象被回收后调用时什么也不做。与原绑定方法比较时视为相等，因此可以用原绑定方法移除。
+    """
+
+    __slots__ = ("ref",)
+
+    def __init__(self, listener: fantas.ListenerFunc) -> None:
+        """
+        初始化 WeakListener 实例。
+
+        :param listener: 绑定方法，所属对象需要支持弱引用。
+        :type listener: fantas.ListenerFunc
+        :raises TypeError: listener 不是绑定方法。
+        """
+        self.ref = weakref.WeakMethod(listener)  # type: ignore[arg-type]
+
+    def __call__(self, event: fantas.Event) -> bool | None:
+        method = self.ref()
+        if method is None:
+            return None
+        return method(event)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, WeakListener):
+            return self.ref == other.ref
+        return self.ref() == other
+
+
+def remove_listeners_by_ref(
+    handler_ref: weakref.ReferenceType[EventHandler], ui_id: fantas.UIid
+) -> None:
+    """
+    UI 元素被回收时由终结器调用，清除它的所有监听器。
+    终结器只保存事件处理器的弱引用，不会阻止窗口被回收。
+
+    :param handler_ref: 事件处理器的弱引用。
+    :type handler_ref: weakref.ReferenceType[EventHandler]
+    :param ui_id: UI 元素 ID。
+    :type ui_id: fantas.UIid
+    """
+    handler = handler_ref()
+    if handler is not None:
+        handler.remove_listeners_by_id(ui_id)
+
+
+@dataclass(slots=True, weakref_slot=True)
 class EventHandler:
     """
     事件处理器，负责预处理并分发事件。
@@ -29,6 +115,27 @@ class EventHandler:
     """ 上一次按下的 UI 元素 """
     listener_dict: fantas.ListenerDict = field(default_factory=dict, init=False)
     """ 事件监听注册表 """
+    dispatch_cache: dict[
+        tuple[fantas.EventType, int],
+        tuple[list[fantas.UI], fantas.DispatchChain],
+    ] = field(default_factory=dict, init=False, repr=False)
+    """ 派发链缓存，(事件类型, 焦点 UI 元素 ID) 到 (传递路径, 派发链) 的映射 """
+    listener_keys: dict[fantas.UIid, set[fantas.ListenerKey]] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    """ UI 元素 ID 到它在事件监听注册表中所有键的映射 """
+    finalizers: dict[fantas.UIid, weakref.finalize] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    """ UI 元素 ID 到终结器的映射，UI 元素被回收时终结器会清除它的监听器 """
+    listener_removals: int = field(default=0, init=False, repr=False)
+    """ 监听器被移除的次数，派发过程中据此判断是否需要检查监听器仍在注册表中 """
+    hover_command: fantas.RenderCommand | None = field(
+        default=None, init=False, repr=False
+    )
+    """ 上一次鼠标移动命中的渲染命令 """
+    hover_generation: int = field(default=-1, init=False, repr=False)
+    """ 上一次鼠标移动命中测试时渲染队列的版本号 """
 
     def __post_init__(self) -> None:
         self.active_ui = self.hover_ui = self.last_hover_ui = self.window.root_ui
@@ -59,22 +166,70 @@ class EventHandler:
         """
         # 获取焦点 UI 元素
         if focused_ui is None:
-            focused_ui = (
-                self.hover_ui
-                if fantas.get_event_category(event.type) == fantas.EventCategory.MOUSE
-                else self.active_ui
-            )
+            focused_ui = self.get_focused_ui(event)
+        removals = self.listener_removals
+        listener_dict = self.listener_dict
+        for key, callback in self.get_dispatch_chain(event.type, focused_ui):
+            # 前面的监听器移除了监听器时，跳过已经不在注册表中的监听器
+            if self.listener_removals != removals and not any(
+                listener is callback for listener in listener_dict.get(key, ())
+            ):
+                continue
+            if callback(event):
+                return
+
+    def get_dispatch_chain(
+        self, event_type: fantas.EventType, focused_ui: fantas.UI
+    ) -> fantas.DispatchChain:
+        """
+        获取事件的派发链，即按调用顺序排列的捕获阶段与冒泡阶段的监听器及其注册键。
+        派发链会被缓存，监听器增删时清空缓存，传递路径变化（UI 树结构变化）时重建。
+
+        :param event_type: 事件类型。
+        :type event_type: fantas.EventType
+        :param focused_ui: 事件传递的焦点 UI 元素。
+        :type focused_ui: fantas.UI
+        :return: 派发链。
+        :rtype: fantas.DispatchChain
+        """
         event_pass_path = focused_ui.get_pass_path()
+        key = (event_type, focused_ui.ui_id)
+        cached = self.dispatch_cache.get(key)
+        # 树结构变化时传递路径缓存会被清除，重新生成的传递路径是新的列表
+        if cached is not None and cached[0] is event_pass_path:
+            return cached[1]
+        listener_dict = self.listener_dict
+        chain: list[tuple[fantas.ListenerKey, fantas.ListenerFunc]] = []
         for ui in reversed(event_pass_path):
             # 捕获阶段
-            for callback in self.listener_dict.get((event.type, ui.ui_id, True), []):
-                if callback(event):
-                    return
+            listener_key = (event_type, ui.ui_id, True)
+            listeners = listener_dict.get(listener_key)
+            if listeners:
+                chain.extend((listener_key, listener) for listener in listeners)
         for ui in event_pass_path:
             # 冒泡阶段
-            for callback in self.listener_dict.get((event.type, ui.ui_id, False), []):
-                if callback(event):
-                    return
+            listener_key = (event_type, ui.ui_id, False)
+            listeners = listener_dict.get(listener_key)
+            if listeners:
+                chain.extend((listener_key, listener) for listener in listeners)
+        if len(self.dispatch_cache) >= MAX_DISPATCH_CACHE:
+            self.dispatch_cache.clear()
+        dispatch_chain = tuple(chain)
+        self.dispatch_cache[key] = (event_pass_path, dispatch_chain)
+        return dispatch_chain
+
+    def get_focused_ui(self, event: fantas.Event) -> fantas.UI:
+        """
+        获取事件传递的焦点 UI 元素，鼠标事件为悬停的 UI 元素，其他事件为激活的 UI 元素。
+
+        :param event: 事件对象。
+        :type event: fantas.Event
+        :return: 焦点 UI 元素。
+        :rtype: fantas.UI
+        """
+        if fantas.get_event_category(event.type) == fantas.EventCategory.MOUSE:
+            return self.hover_ui
+        return self.active_ui
 
     def add_event_listener(
         self,
@@ -82,9 +237,13 @@ class EventHandler:
         ui: fantas.UI,
         use_capture: bool,
         listener: fantas.ListenerFunc,
+        weak: bool = False,
     ) -> None:
         """
         为指定事件类型和 UI 元素添加事件监听器。
+        UI 元素被回收时会自动清除它的所有监听器。
+        监听器通常是 UI 元素自己的绑定方法，此时注册表会一直引用 UI 元素，
+        设置 weak 为 True 只保存绑定方法的弱引用，UI 元素不再被使用时才能被回收。
 
         :param event_type: 要监听的事件类型。
         :type event_type: fantas.EventType
@@ -94,11 +253,22 @@ class EventHandler:
         :type use_capture: bool
         :param listener: 要添加的事件监听函数。
         :type listener: fantas.ListenerFunc
+        :param weak: 是否只保存监听器的弱引用，此时监听器必须是绑定方法。
+        :type weak: bool
         """
-        listener_list = self.listener_dict.setdefault(
-            (event_type, ui.ui_id, use_capture), []
-        )
-        listener_list.append(listener)
+        ui_id = ui.ui_id
+        key = (event_type, ui_id, use_capture)
+        if weak:
+            listener = WeakListener(listener)
+        self.listener_dict.setdefault(key, []).append(listener)
+        self.listener_keys.setdefault(ui_id, set()).add(key)
+        if ui_id not in self.finalizers:
+            finalizer = weakref.finalize(
+                ui, remove_listeners_by_ref, weakref.ref(self), ui_id
+            )
+            finalizer.atexit = False
+            self.finalizers[ui_id] = finalizer
+        self.dispatch_cache.clear()
 
     def remove_event_listener(
         self,
@@ -119,11 +289,59 @@ class EventHandler:
         :param listener: 要移除的事件监听函数。
         :type listener: fantas.ListenerFunc
         """
-        listener_list = self.listener_dict.get((event_type, ui.ui_id, use_capture), [])
+        key = (event_type, ui.ui_id, use_capture)
+        listener_list = self.listener_dict.get(key, [])
         try:
             listener_list.remove(listener)
         except ValueError:
             raise ValueError("监听器不存在。") from None
+        if not listener_list:
+            del self.listener_dict[key]
+            self.listener_keys[ui.ui_id].discard(key)
+        self.listener_removals += 1
+        self.dispatch_cache.clear()
+
+    def purge_listeners(self, ui: fantas.UI, recursive: bool = True) -> None:
+        """
+        清除 UI 元素的所有监听器，通常在 UI 元素被移除且不再使用时调用。
+
+        :param ui: 要清除监听器的 UI 元素。
+        :type ui: fantas.UI
+        :param recursive: 是否同时清除所有后代元素的监听器。
+        :type recursive: bool
+        """
+        nodes = [ui]
+        while nodes:
+            node = nodes.pop()
+            self.remove_listeners_by_id(node.ui_id)
+            if recursive:
+                nodes.extend(node.children)
+
+    def remove_listeners_by_id(self, ui_id: fantas.UIid) -> None:
+        """
+        清除指定 ID 的 UI 元素的所有监听器。
+
+        :param ui_id: UI 元素 ID。
+        :type ui_id: fantas.UIid
+        """
+        for key in self.listener_keys.pop(ui_id, ()):
+            self.listener_dict.pop(key, None)
+        finalizer = self.finalizers.pop(ui_id, None)
+        if finalizer is not None:
+            finalizer.detach()
+        self.listener_removals += 1
+        self.dispatch_cache.clear()
+
+    def release_detached(self, node: fantas.UI) -> None:
+        """
+        子树从窗口中被移除后调用，释放缓存中对子树的引用，使不再使用的 UI 元素可以被回收。
+        监听器会保留，子树重新加入窗口后仍然有效。
+
+        :param node: 被移除的子树的根元素。
+        :type node: fantas.UI
+        """
+        self.dispatch_cache.clear()
+        self.hover_command = None
 
     def set_hover_ui(self, ui: fantas.UI) -> None:
         """
@@ -189,22 +407,45 @@ class EventHandler:
 
     def _handle_windowresized_event(self, event: fantas.Event) -> None:
         """
-        处理窗口调整大小事件，更新根 UI 元素的矩形。
+        处理窗口调整大小事件，更新根 UI 元素的矩形，并标记整个窗口需要重绘。
 
         :param event: 要处理的窗口调整大小事件对象。
         :type event: fantas.Event
         """
         if event.window is self.window:
             self.window.root_ui.update_rect()
+            self.window.renderer.invalidate()
 
     def _handle_mousemotion_event(self, event: fantas.Event) -> None:
         """
         处理鼠标移动事件，更新悬停的 UI 元素。
+        渲染队列没有变化、且坐标点仍命中上一次的渲染命令而没有命中它上层的渲染命令时，
+        直接复用上一次的命中结果。上层的渲染命令只检查网格索引中同一单元格的候选。
+        非保留模式下每帧都会重新生成渲染队列，队列版本号每帧都会变化，
+        因此只有同一帧内的多次鼠标移动能复用命中结果；保留模式下 UI 树没有变化时
+        渲染队列保持不变，命中结果可以跨帧复用。
 
         :param event: 要处理的鼠标移动事件对象。
         :type event: fantas.Event
         """
-        self.set_hover_ui(self.window.renderer.coordinate_hit_test(event.pos))
+        renderer = self.window.renderer
+        point = event.pos
+        command = self.hover_command
+        if (
+            command is not None
+            and self.hover_generation == renderer.queue_generation
+            and command.hit_test(point)
+            and not renderer.hit_test_above(command, point)
+        ):
+            self.set_hover_ui(command.get_hit_ui(point))
+            return
+        command = renderer.hit_test_command(point)
+        self.hover_command = command
+        self.hover_generation = renderer.queue_generation
+        if command is None:
+            self.set_hover_ui(self.window.root_ui)
+        else:
+            self.set_hover_ui(command.get_hit_ui(point))
 
     def _handle_mousebuttondown_event(self, event: fantas.Event) -> None:
         """
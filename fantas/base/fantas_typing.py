@@ -21,9 +21,11 @@ __all__ = (
     "ListenerKey",
     "ListenerFunc",
     "ListenerDict",
+    "DispatchChain",
     "QuadrantMask",
     "TextStyleFlag",
     "BlendFlag",
+    "BlitArgs",
     "Vector2",
     "Vector3",
 )
@@ -47,6 +49,9 @@ UIid: TypeAlias = int  # UI 元素唯一标识类型
 ListenerKey: TypeAlias = tuple[EventType, UIid, bool]  # 监听器键类型
 ListenerFunc: TypeAlias = Callable[[Event], bool | None]  # 监听器函数类型
 ListenerDict: TypeAlias = dict[ListenerKey, list[ListenerFunc]]  # 监听器字典类型
+DispatchChain: TypeAlias = tuple[
+    tuple[ListenerKey, ListenerFunc], ...
+]  # 派发链类型，按调用顺序排列的 (监听器键, 监听器函数)
 
 QuadrantMask: TypeAlias = int  # 象限掩码类型，是 fantas.Quadrant 通过或运算得到的值
 
@@ -55,3 +60,9 @@ TextStyleFlag: TypeAlias = (
 )
 
 BlendFlag: TypeAlias = int  # 混合标志类型，BLEND_* 常量
+
+BlitArgs: TypeAlias = (
+    tuple[Surface, Point]
+    | tuple[Surface, Point, RectLike | None]
+    | tuple[Surface, Point, RectLike | None, BlendFlag]
+)  # blit 参数类型，(源 Surface, 目标位置[, 源区域[, 混合标志]])
@@ -11,6 +11,7 @@ from .misc import generate_unique_id
 
 __all__ = (
     "run_framefuncs",
+    "has_framefuncs",
     "FrameFuncBase",
     "FramerBase",
     "TimerBase",
@@ -30,6 +31,15 @@ def run_framefuncs() -> None:
             framefunc_dict.pop(func_id)
 
 
+def has_framefuncs() -> bool:
+    """
+    检查是否有已启动的帧函数。
+    Returns:
+        bool: 如果有已启动的帧函数则返回 True，否则返回 False。
+    """
+    return bool(framefunc_dict)
+
+
 @dataclass(slots=True)
 class FrameFuncBase(ABC):
     """
@@ -0,0 +1,174 @@
+"""
+提供主循环的帧钩子接口。
+"""
+
+from __future__ import annotations
+from collections.abc import Callable, Iterable
+
+import fantas
+
+__all__ = (
+    "FrameHook",
+    "FrameHookChain",
+    "chain_hooks",
+)
+
+
+class FrameHook:
+    """
+    帧钩子基类，计时器、追踪器、分析器与调试工具通过它挂载到主循环。
+    主循环在每个阶段结束时调用 record，阶段依次为
+    "Idle"（等待帧率或事件）、"Event"（处理事件）、"FrameFunc"（运行帧函数）、
+    "PreRender"（生成渲染命令）与 "Render"（渲染），每帧结束时调用 end_frame。
+    主循环在进入时合并所有钩子，没有钩子时不会产生额外开销。
+    子类只需要重写关心的方法。
+    """
+
+    __slots__ = ()
+
+    def attach(self, window: fantas.Window) -> None:
+        """
+        挂载到窗口时调用。
+        Args:
+            window (fantas.Window): 窗口对象。
+        """
+
+    def detach(self, window: fantas.Window) -> None:
+        """
+        从窗口卸载时调用。
+        Args:
+            window (fantas.Window): 窗口对象。
+        """
+
+    def loop_start(self) -> None:
+        """
+        进入主循环时调用。
+        """
+
+    def record(self, phase: str) -> None:
+        """
+        一个阶段结束时调用。
+        Args:
+            phase (str): 阶段名称。
+        """
+
+    def end_frame(self) -> None:
+        """
+        一帧结束时调用。
+        """
+
+    def wrap_get_events(
+        self, get_events: Callable[[], list[fantas.Event]]
+    ) -> Callable[[], list[fantas.Event]]:
+        """
+        进入主循环时调用，可以包装主循环每帧获取事件的函数。
+        Args:
+            get_events (Callable[[], list[fantas.Event]]): 获取事件的函数。
+        Returns:
+            Callable[[], list[fantas.Event]]: 包装后的函数，默认原样返回。
+        """
+        return get_events
+
+    def wrap_handle_event(
+        self, handle_event: Callable[[fantas.Event], None]
+    ) -> Callable[[fantas.Event], None]:
+        """
+        进入主循环时调用，可以包装主循环的事件处理函数。
+        Args:
+            handle_event (Callable[[fantas.Event], None]): 事件处理函数。
+        Returns:
+            Callable[[fantas.Event], None]: 包装后的事件处理函数，默认原样返回。
+        """
+        return handle_event
+
+    def wrap_run_framefuncs(
+        self, run_framefuncs: Callable[[], None]
+    ) -> Callable[[], None]:
+        """
+        进入主循环时调用，可以包装主循环运行帧函数的函数。
+        Args:
+            run_framefuncs (Callable[[], None]): 运行帧函数的函数。
+        Returns:
+            Callable[[], None]: 包装后的函数，默认原样返回。
+        """
+        return run_framefuncs
+
+
+class FrameHookChain(FrameHook):
+    """
+    帧钩子链，按顺序调用多个帧钩子。
+    """
+
+    __slots__ = ("hooks", "records", "end_frames")
+
+    def __init__(self, hooks: Iterable[FrameHook]) -> None:
+        """
+        初始化 FrameHookChain 实例。
+        Args:
+            hooks (Iterable[FrameHook]): 帧钩子。
+        """
+        self.hooks: tuple[FrameHook, ...] = tuple(hooks)  # 帧钩子
+        self.records: tuple[Callable[[str], None], ...] = tuple(
+            hook.record for hook in self.hooks
+        )  # 各个帧钩子的 record 方法
+        self.end_frames: tuple[Callable[[], None], ...] = tuple(
+            hook.end_frame for hook in self.hooks
+        )  # 各个帧钩子的 end_frame 方法
+
+    def attach(self, window: fantas.Window) -> None:
+        for hook in self.hooks:
+            hook.attach(window)
+
+    def detach(self, window: fantas.Window) -> None:
+        for hook in self.hooks:
+            hook.detach(window)
+
+    def loop_start(self) -> None:
+        for hook in self.hooks:
+            hook.loop_start()
+
+    def record(self, phase: str) -> None:
+        for record in self.records:
+            record(phase)
+
+    def end_frame(self) -> None:
+        for end_frame in self.end_frames:
+            end_frame()
+
+    def wrap_get_events(
+        self, get_events: Callable[[], list[fantas.Event]]
+    ) -> Callable[[], list[fantas.Event]]:
+        for hook in self.hooks:
+            get_events = hook.wrap_get_events(get_events)
+        return get_events
+
+    def wrap_handle_event(
+        self, handle_event: Callable[[fantas.Event], None]
+    ) -> Callable[[fantas.Event], None]:
+        for hook in self.hooks:
+            handle_event = hook.wrap_handle_event(handle_event)
+        return handle_event
+
+    def wrap_run_framefuncs(
+        self, run_framefuncs: Callable[[], None]
+    ) -> Callable[[], None]:
+        for hook in self.hooks:
+            run_framefuncs = hook.wrap_run_framefuncs(run_framefuncs)
+        return run_framefuncs
+
+
+def chain_hooks(hooks: Iterable[FrameHook]) -> FrameHook | None:
+    """
+    合并多个帧钩子，重复的帧钩子只保留第一个。
+    Args:
+        hooks (Iterable[FrameHook]): 帧钩子。
+    Returns:
+        FrameHook | None: 没有帧钩子时返回 None，只有一个时返回它本身，
+            否则返回 FrameHookChain。
+    """
+    unique = tuple(dict.fromkeys(hooks))
+    if not unique:
+        return None
+    if len(unique) == 1:
+        return unique[0]
+    return FrameHookChain(unique)
@@ -5,7 +5,14 @@ nodebase.py
 from __future__ import annotations
 from dataclasses import dataclass, field
 from collections import deque
-from typing import Any, Deque, Generic, TypeVar, cast  # pylint: disable=unused-import
+from typing import (  # pylint: disable=unused-import
+    Any,
+    ClassVar,
+    Deque,
+    Generic,
+    TypeVar,
+    cast,
+)
 
 __all__ = ("NodeBase",)
 
@@ -16,11 +23,19 @@ T = TypeVar("T", bound="NodeBase[Any]")
 class NodeBase(Generic[T]):
     """树形节点基类，数据域由子类实现。"""
 
+    change_epoch: ClassVar[int] = 0  # 当前变化周期，每次保存版本号用于比较后增加
+
     father: T | None = field(default=None, init=False)  # 指向父节点
     children: list[T] = field(default_factory=list, init=False)  # 存储孩子节点，有序
     pass_path_cache: list[T] | None = field(
         default=None, init=False, repr=False
     )  # 传递路径缓存
+    version: int = field(
+        default=0, init=False, repr=False
+    )  # 版本号，自己或任意后代节点发生变化时增加
+    changed_epoch: int = field(
+        default=-1, init=False, repr=False
+    )  # 上一次增加版本号时的变化周期
 
     # === 结构操作方法 ===
 
@@ -34,7 +49,11 @@ class NodeBase(Generic[T]):
         if not node.is_root():
             node.leave()
         node.father = self
+        # 独立构建的子树可能缓存了不含新祖先的传递路径
+        node.clear_pass_path_cache()
         self.children.append(node)
+        self.mark_changed()
+        self.on_attach(node)
 
     def insert(self, index: int, node: T) -> None:
         """
@@ -47,7 +66,11 @@ class NodeBase(Generic[T]):
         if not node.is_root():
             node.leave()
         node.father = self
+        # 独立构建的子树可能缓存了不含新祖先的传递路径
+        node.clear_pass_path_cache()
         self.children.insert(index, node)
+        self.mark_changed()
+        self.on_attach(node)
 
     def remove(self, node: T) -> None:
         """
@@ -59,10 +82,12 @@ class NodeBase(Generic[T]):
         """
         try:
             self.children.remove(node)
-            node.father = None
-            node.clear_pass_path_cache()
         except ValueError:
             raise ValueError("要移除的节点不是当前节点的子节点。") from None
+        node.father = None
+        node.clear_pass_path_cache()
+        self.mark_changed()
+        self.on_detach(node)
 
     def pop(self, index: int) -> T:
         """
@@ -76,11 +101,13 @@ class NodeBase(Generic[T]):
         """
         try:
             node = self.children.pop(index)
-            node.father = None
-            node.clear_pass_path_cache()
-            return node
         except IndexError:
             raise IndexError("索引越界。") from None
+        node.father = None
+        node.clear_pass_path_cache()
+        self.mark_changed()
+        self.on_detach(node)
+        return node
 
     def leave(self) -> None:
         """从父节点中移除自己。"""
@@ -89,10 +116,55 @@ class NodeBase(Generic[T]):
 
     def clear(self) -> None:
         """移除所有子节点。"""
-        for child in self.children:
+        children = self.children[:]
+        for child in children:
             child.father = None
             child.clear_pass_path_cache()
         self.children.clear()
+        self.mark_changed()
+        for child in children:
+            self.on_detach(child)
+
+    def on_attach(self, node: T) -> None:
+        """
+        以 node 为根的子树被添加到自己或后代节点中后调用，默认继续通知父节点。
+        子类可以重写以记录与 node 相关的数据，重写时需要调用本方法。
+        Args:
+            node (NodeBase): 被添加的子树的根节点。
+        """
+        if self.father is not None:
+            self.father.on_attach(node)
+
+    def on_detach(self, node: T) -> None:
+        """
+        以 node 为根的子树从自己或后代节点中被移除后调用，默认继续通知父节点。
+        子类可以重写以清除与 node 相关的数据，重写时需要调用本方法。
+        Args:
+            node (NodeBase): 被移除的子树的根节点。
+        """
+        if self.father is not None:
+            self.father.on_detach(node)
+
+    def mark_changed(self) -> None:
+        """
+        标记自己发生了变化，自己及所有祖先节点的版本号都会增加。
+        同一变化周期内增加过版本号的节点，它的祖先节点也都已经增加过，遍历到这里即可停止，
+        因此连续修改同一个节点只需要增加它自己的版本号。
+        """
+        epoch = NodeBase.change_epoch
+        node: NodeBase[T] | None = self
+        while node is not None and node.changed_epoch != epoch:
+            node.changed_epoch = epoch
+            node.version += 1
+            node = node.father
+
+    @staticmethod
+    def observe_versions() -> None:
+        """
+        保存版本号用于之后比较时调用，开始新的变化周期。
+        之后的变化会重新增加祖先节点的版本号，保证与保存的版本号不同。
+        """
+        NodeBase.change_epoch += 1
 
     def build_pass_path_cache(self) -> None:
         """构建传递路径缓存，包括自己及所有子节点。"""
@@ -148,7 +220,8 @@ class NodeBase(Generic[T]):
             return self.pass_path_cache
         # 如果是根节点，路径即为自己
         if self.father is None:
-            return [cast(T, self)]
+            self.pass_path_cache = [cast(T, self)]
         # 否则递归获取父节点的传递路径并添加自己
-        self.pass_path_cache = [cast(T, self)] + self.father.get_pass_path()
+        else:
+            self.pass_path_cache = [cast(T, self)] + self.father.get_pass_path()
         return self.pass_path_cache
@@ -5,29 +5,162 @@ fantas.renderer 的 Docstring
 from __future__ import annotations
 from abc import ABC, abstractmethod
 from collections import deque
+from collections.abc import Iterable, Iterator, Sequence
 from dataclasses import dataclass, field
+from heapq import merge
+from typing import TypeAlias
 
 import fantas
 
 __all__ = (
     "Renderer",
     "RenderCommand",
+    "CacheGroupRenderCommand",
 )
 
 
+# 渲染命令快照类型，(渲染命令, 渲染范围矩形, 状态快照)
+RenderSnapshot: TypeAlias = tuple["RenderCommand", fantas.Rect | None, object]
+
+# 单帧脏矩形数量上限，超过后直接合并为一个矩形
+MAX_DAMAGED_RECTS = 16
+# 命中测试网格的单元格边长（像素）
+HIT_GRID_CELL_SIZE = 64
+# 渲染命令数量达到此值时才使用网格索引进行命中测试
+HIT_INDEX_THRESHOLD = 64
+# 遮挡剔除时最多记录的遮挡矩形数量
+MAX_OCCLUDERS = 32
+
+
+def merge_rects(rects: list[fantas.Rect]) -> list[fantas.Rect]:
+    """
+    合并相互重叠的矩形，返回互不重叠的矩形列表。
+    Args:
+        rects (list[fantas.Rect]): 要合并的矩形列表。
+    Returns:
+        list[fantas.Rect]: 合并后的矩形列表。
+    """
+    merged: list[fantas.Rect] = []
+    for rect in rects:
+        if rect.width <= 0 or rect.height <= 0:
+            continue
+        rect = fantas.Rect(rect)
+        i = 0
+        while i < len(merged):
+            if merged[i].colliderect(rect):
+                rect.union_ip(merged.pop(i))
+                i = 0
+            else:
+                i += 1
+        merged.append(rect)
+    if len(merged) > MAX_DAMAGED_RECTS:
+        return [merged[0].unionall(merged[1:])]
+    return merged
+
+
+def render_commands(
+    commands: Iterable[fantas.RenderCommand], target_surface: fantas.Surface
+) -> None:
+    """
+    依次执行渲染命令，连续的纯 blit 渲染命令会合并为一次 blits / fblits 调用。
+    Args:
+        commands (Iterable[fantas.RenderCommand]): 按层级升序排列的渲染命令。
+        target_surface (fantas.Surface): 目标 Surface 对象。
+    """
+    batch: list[fantas.BlitArgs] = []
+    simple = True  # 批次中是否全部为 (源 Surface, 目标位置) 形式，可以使用 fblits
+    for command in commands:
+        blits = command.get_blits()
+        if blits is None:
+            if batch:
+                flush_blits(batch, simple, target_surface)
+                batch = []
+                simple = True
+            command.render(target_surface)
+        else:
+            for args in blits:
+                if len(args) != 2:
+                    simple = False
+                batch.append(args)
+    if batch:
+        flush_blits(batch, simple, target_surface)
+
+
+def flush_blits(
+    batch: list[fantas.BlitArgs], simple: bool, target_surface: fantas.Surface
+) -> None:
+    """
+    执行一批 blit。
+    Args:
+        batch (list[fantas.BlitArgs]): blit 参数列表。
+        simple (bool): 是否全部为 (源 Surface, 目标位置) 形式。
+        target_surface (fantas.Surface): 目标 Surface 对象。
+    """
+    if simple:
+        target_surface.fblits(batch)
+    else:
+        target_surface.blits(batch, doreturn=False)
+
+
 @dataclass(slots=True)
 class Renderer:
     """
     渲染器类，管理渲染命令队列并执行渲染操作。
     Args:
-        window: 关联的窗口对象。
+        window           : 关联的窗口对象。
+        dirty_rect_mode  : 是否启用脏矩形增量渲染。
+        retained_mode    : 是否启用保留模式，复用没有变化的子树的渲染命令。
+        occlusion_culling: 是否启用遮挡剔除，跳过被不透明渲染命令完全遮挡的渲染命令。
+        viewport_culling : 是否启用视口剔除，跳过完全在窗口外的子树和渲染命令。
+        profiler         : 渲染性能分析器，None 表示不分析，通常通过 Window.add_hook 设置。
+        tracer           : 性能追踪器，None 表示不追踪，同时设置时优先于 profiler 执行渲染。
     """
 
     window: fantas.Window  # 关联的窗口对象
+    dirty_rect_mode: bool = False  # 是否启用脏矩形增量渲染
+    retained_mode: bool = False  # 是否启用保留模式
+    occlusion_culling: bool = False  # 是否启用遮挡剔除
+    viewport_culling: bool = False  # 是否启用视口剔除
+    profiler: fantas.RenderProfiler | None = None  # 渲染性能分析器，None 表示不分析
+    tracer: fantas.Tracer | None = None  # 性能追踪器，None 表示不追踪
 
     queue: deque[fantas.RenderCommand] = field(
         default_factory=deque, init=False, repr=False
     )  # 渲染命令队列，左端入右端出
+    snapshots: dict[int, RenderSnapshot] = field(
+        default_factory=dict, init=False, repr=False
+    )  # 上一帧的渲染命令快照，键为命令 id
+    damaged_rects: list[fantas.Rect] = field(
+        default_factory=list, init=False, repr=False
+    )  # 手动标记的脏矩形列表
+    full_damage: bool = field(default=True, init=False, repr=False)  # 是否需要全部重绘
+    pending: bool = field(
+        default=True, init=False, repr=False
+    )  # 是否有手动标记的变化尚未渲染，按需渲染模式据此决定能否休眠
+    retained_commands: tuple[fantas.RenderCommand, ...] | None = field(
+        default=None, init=False, repr=False
+    )  # 保留模式下当前渲染队列对应的渲染命令元组
+    queue_generation: int = field(
+        default=0, init=False, repr=False
+    )  # 渲染队列的版本号，队列内容变化时增加
+    hit_index_key: tuple[int, tuple[int, int]] | None = field(
+        default=None, init=False, repr=False
+    )  # 命中测试索引对应的 (队列版本号, 窗口尺寸)
+    hit_commands: list[fantas.RenderCommand] = field(
+        default_factory=list, init=False, repr=False
+    )  # 建立命中测试索引时的渲染命令列表
+    hit_grid: dict[tuple[int, int], list[int]] = field(
+        default_factory=dict, init=False, repr=False
+    )  # 命中测试网格，键为单元格坐标，值为按层级升序排列的渲染命令索引
+    hit_global: list[int] = field(
+        default_factory=list, init=False, repr=False
+    )  # 可能绘制到整个窗口的渲染命令索引，按层级升序排列
+    visible_queue: list[fantas.RenderCommand] = field(
+        default_factory=list, init=False, repr=False
+    )  # 遮挡剔除后实际需要渲染的渲染命令列表
+    visible_queue_key: tuple[int, tuple[int, int]] | None = field(
+        default=None, init=False, repr=False
+    )  # 遮挡剔除结果对应的 (队列版本号, 目标尺寸)
 
     def pre_render(self, root_ui: fantas.UI) -> None:
         """
@@ -35,18 +168,204 @@ class Renderer:
         Args:
             root_ui (fantas.UI): 根 UI 元素。
         """
-        self.queue.clear()
-        for command in root_ui.create_render_commands():
-            self.queue.append(command)
+        profiler = self.profiler
+        viewport = None
+        if self.viewport_culling:
+            viewport = fantas.Rect((0, 0), self.window.size)
+        fantas.UI.viewport = viewport
+        try:
+            commands: Iterable[fantas.RenderCommand]
+            # 性能分析期间不复用渲染命令，否则整个元组在包装前就已生成，无法统计各个元素的耗时
+            if self.retained_mode and profiler is None:
+                fantas.UI.retained = True
+                retained_commands = root_ui.create_retained_render_commands()
+                # 整棵树都没有变化，渲染队列保持不变
+                if retained_commands is self.retained_commands:
+                    return
+                self.retained_commands = commands = retained_commands
+            else:
+                self.retained_commands = None
+                commands = root_ui.create_render_commands()
+            if profiler is not None:
+                commands = profiler.profile_commands(commands)
+            self.queue.clear()
+            if viewport is None:
+                for command in commands:
+                    self.queue.append(command)
+            else:
+                # 剔除完全在视口外的渲染命令
+                for command in commands:
+                    rect = command.get_bounding_rect()
+                    if rect is None or rect.colliderect(viewport):
+                        self.queue.append(command)
+            self.queue_generation += 1
+        finally:
+            fantas.UI.retained = False
+            fantas.UI.viewport = None
 
-    def render(self, target_surface: fantas.Surface) -> None:
+    def render(self, target_surface: fantas.Surface) -> bool:
         """
-        执行渲染队列中的所有渲染命令。
+        执行渲染队列中的渲染命令。
+        脏矩形模式下只重绘发生变化的区域。
         Args:
             target_surface (fantas.Surface): 目标 Surface 对象。
+        Returns:
+            bool: 本帧是否有内容被重绘，为 False 时无需更新窗口显示。
         """
-        for command in self.queue:
-            command.render(target_surface)
+        self.pending = False
+        run = render_commands
+        if self.profiler is not None:
+            run = self.profiler.render_commands
+        if self.tracer is not None:
+            run = self.tracer.render_commands
+        queue: Iterable[fantas.RenderCommand] = self.queue
+        if self.occlusion_culling:
+            queue = self.get_visible_queue(target_surface.get_rect())
+        if not self.dirty_rect_mode:
+            run(queue, target_surface)
+            return True
+        damaged = self.collect_damaged_rects(queue, target_surface.get_rect())
+        # 全部重绘
+        if damaged is None:
+            run(queue, target_surface)
+            return True
+        # 没有变化
+        if not damaged:
+            return False
+        # 逐个脏矩形裁剪重绘
+        clip = target_surface.get_clip()
+        snapshots = self.snapshots.values()
+        for rect in damaged:
+            target_surface.set_clip(rect)
+            run(
+                (
+                    command
+                    for command, bounding, _ in snapshots
+                    if bounding is None or bounding.colliderect(rect)
+                ),
+                target_surface,
+            )
+        target_surface.set_clip(clip)
+        return True
+
+    def get_visible_queue(
+        self, target_rect: fantas.Rect
+    ) -> list[fantas.RenderCommand]:
+        """
+        遮挡剔除，从上层到下层遍历渲染队列，去掉被不透明渲染命令完全遮挡的渲染命令。
+        结果会缓存到渲染队列发生变化为止。
+        Args:
+            target_rect (fantas.Rect): 目标 Surface 的矩形区域。
+        Returns:
+            list[fantas.RenderCommand]: 按层级升序排列的可见渲染命令列表。
+        """
+        key = (self.queue_generation, target_rect.size)
+        if self.visible_queue_key == key:
+            return self.visible_queue
+        visible: list[fantas.RenderCommand] = []
+        occluders: list[fantas.Rect] = []
+        for command in reversed(self.queue):
+            rect = command.get_bounding_rect()
+            if rect is None:
+                visible.append(command)
+                # 不透明且覆盖整个目标的命令会遮挡下面所有的命令
+                if command.is_opaque():
+                    break
+                continue
+            # 被完全遮挡
+            if any(occluder.contains(rect) for occluder in occluders):
+                continue
+            visible.append(command)
+            if command.is_opaque():
+                if rect.contains(target_rect):
+                    break
+                if len(occluders) < MAX_OCCLUDERS:
+                    occluders.append(rect)
+        visible.reverse()
+        self.visible_queue = visible
+        self.visible_queue_key = key
+        return visible
+
+    def collect_damaged_rects(
+        self, queue: Iterable[fantas.RenderCommand], target_rect: fantas.Rect
+    ) -> list[fantas.Rect] | None:
+        """
+        对比上一帧的渲染命令快照，收集本帧需要重绘的矩形区域。
+        Args:
+            queue (Iterable[fantas.RenderCommand]): 本帧要渲染的渲染命令。
+            target_rect (fantas.Rect): 目标 Surface 的矩形区域。
+        Returns:
+            list[fantas.Rect] | None: 需要重绘的矩形列表，None 表示需要全部重绘。
+        """
+        full = self.full_damage
+        damaged = self.damaged_rects
+        last = self.snapshots
+        current: dict[int, RenderSnapshot] = {}
+        for command in queue:
+            key = id(command)
+            rect = command.get_bounding_rect()
+            state = command.get_render_key()
+            current[key] = (command, rect, state)
+            if full:
+                continue
+            old = last.get(key)
+            if old is None:
+                # 新增的渲染命令
+                if rect is None:
+                    full = True
+                else:
+                    damaged.append(rect)
+            elif state is None or old[2] != state or old[1] != rect:
+                # 状态发生变化的渲染命令，新旧区域都需要重绘
+                if rect is None or old[1] is None:
+                    full = True
+                else:
+                    damaged.append(old[1])
+                    damaged.append(rect)
+        if not full:
+            # 被移除的渲染命令
+            for key, (_, rect, _) in last.items():
+                if key not in current:
+                    if rect is None:
+                        full = True
+                        break
+                    damaged.append(rect)
+        if not full:
+            # 渲染命令的层级顺序发生变化
+            if [key for key in last if key in current] != [
+                key for key in current if key in last
+            ]:
+                full = True
+        # 更新快照
+        self.snapshots = current
+        self.damaged_rects = []
+        self.full_damage = False
+        if full:
+            return None
+        merged = merge_rects([rect.clip(target_rect) for rect in damaged])
+        # 重绘面积过大时直接全部重绘
+        if sum(rect.width * rect.height for rect in merged) * 2 > (
+            target_rect.width * target_rect.height
+        ):
+            return None
+        return merged
+
+    def mark_dirty(self, rect: fantas.RectLike) -> None:
+        """
+        手动标记一块区域为脏，下一帧会重绘该区域。
+        用于渲染命令无法自行察觉的变化，比如直接修改了 Surface 的像素。
+        Args:
+            rect (fantas.RectLike): 要重绘的矩形区域。
+        """
+        self.damaged_rects.append(fantas.Rect(rect))
+        self.pending = True
+
+    def invalidate(self) -> None:
+        """
+        标记整个窗口为脏，下一帧会全部重绘。
+        """
+        self.full_damage = True
+        self.pending = True
 
     def add_command(self, command: fantas.RenderCommand) -> None:
         """
@@ -55,6 +374,9 @@ class Renderer:
             command (fantas.RenderCommand): 渲染命令对象。
         """
         self.queue.appendleft(command)
+        self.retained_commands = None
+        self.queue_generation += 1
+        self.pending = True
 
     def coordinate_hit_test(self, point: fantas.IntPoint) -> fantas.UI:
         """
@@ -64,10 +386,106 @@ class Renderer:
         Returns:
             fantas.UI: 位于该点的最上层 UI 元素，如果没有命中任何元素则返回根 UI 元素。
         """
-        for rc in reversed(self.queue):
+        command = self.hit_test_command(point)
+        if command is None:
+            return self.window.root_ui
+        return command.get_hit_ui(point)
+
+    def hit_test_command(
+        self, point: fantas.IntPoint
+    ) -> fantas.RenderCommand | None:
+        """
+        根据给定的坐标点进行命中测试，返回位于该点的最上层渲染命令。
+        渲染命令较多时使用网格索引，只对候选渲染命令进行精确的命中测试。
+        Args:
+            point (fantas.IntPoint): 坐标点（x, y）。
+        Returns:
+            fantas.RenderCommand | None: 位于该点的最上层渲染命令，没有命中则返回 None。
+        """
+        for rc in self.get_hit_candidates(point):
+            if rc.hit_test(point):
+                return rc
+        return None
+
+    def hit_test_above(
+        self, command: fantas.RenderCommand, point: fantas.IntPoint
+    ) -> bool:
+        """
+        检查层级高于给定渲染命令的渲染命令中是否有命中坐标点的。
+        只对坐标点所在网格单元中位于给定渲染命令上层的候选进行精确测试。
+        Args:
+            command (fantas.RenderCommand): 渲染队列中命中该坐标点的渲染命令。
+            point (fantas.IntPoint): 坐标点（x, y）。
+        Returns:
+            bool: 是否被上层的渲染命令命中。
+        """
+        for rc in self.get_hit_candidates(point):
+            if rc is command:
+                return False
             if rc.hit_test(point):
-                return rc.creator
-        return self.window.root_ui
+                return True
+        return False
+
+    def get_hit_candidates(
+        self, point: fantas.IntPoint
+    ) -> Iterator[fantas.RenderCommand]:
+        """
+        按层级从上到下获取可能命中坐标点的渲染命令。
+        渲染命令较多时使用网格索引，否则返回整个渲染队列。
+        Args:
+            point (fantas.IntPoint): 坐标点（x, y）。
+        Yields:
+            fantas.RenderCommand: 候选渲染命令。
+        """
+        x, y = point
+        w, h = size = self.window.size
+        # 命令较少或坐标在窗口外时直接线性查找
+        if len(self.queue) < HIT_INDEX_THRESHOLD or not (0 <= x < w and 0 <= y < h):
+            yield from reversed(self.queue)
+            return
+        # 按需重建索引
+        if self.hit_index_key != (self.queue_generation, size):
+            self.build_hit_index()
+        # 合并单元格候选与全局候选，从上层到下层
+        commands = self.hit_commands
+        cell = self.hit_grid.get((x // HIT_GRID_CELL_SIZE, y // HIT_GRID_CELL_SIZE))
+        if cell is None:
+            candidates = reversed(self.hit_global)
+        else:
+            candidates = merge(reversed(cell), reversed(self.hit_global), reverse=True)
+        for index in candidates:
+            yield commands[index]
+
+    def build_hit_index(self) -> None:
+        """
+        根据渲染命令的范围矩形建立命中测试的均匀网格索引。
+        """
+        size = self.window.size
+        window_rect = fantas.Rect((0, 0), size)
+        commands = self.hit_commands = list(self.queue)
+        grid: dict[tuple[int, int], list[int]] = {}
+        hit_global: list[int] = []
+        for index, command in enumerate(commands):
+            rect = command.get_bounding_rect()
+            if rect is None:
+                hit_global.append(index)
+                continue
+            rect = rect.clip(window_rect)
+            # 完全在窗口外的渲染命令不会被窗口内的坐标命中
+            if rect.width <= 0 or rect.height <= 0:
+                continue
+            for cx in range(
+                rect.left // HIT_GRID_CELL_SIZE,
+                (rect.right - 1) // HIT_GRID_CELL_SIZE + 1,
+            ):
+                for cy in range(
+                    rect.top // HIT_GRID_CELL_SIZE,
+                    (rect.bottom - 1) // HIT_GRID_CELL_SIZE + 1,
+                ):
+                    grid.setdefault((cx, cy), []).append(index)
+        self.hit_grid = grid
+        self.hit_global = hit_global
+        self.hit_index_key = (self.queue_generation, size)
 
 
 @dataclass(slots=True)
@@ -97,3 +515,153 @@ class RenderCommand(ABC):
         Returns:
             bool: 如果点在区域内则返回 True，否则返回 False。
         """
+
+    def get_hit_ui(self, point: fantas.IntPoint) -> fantas.UI:
+        """
+        获取命中此渲染命令的坐标点实际对应的 UI 元素，默认为创建者。
+        Args:
+            point (fantas.IntPoint): 已命中此渲染命令的坐标点（x, y）。
+        Returns:
+            fantas.UI: 命中的 UI 元素。
+        """
+        return self.creator
+
+    def get_blits(self) -> Sequence[fantas.BlitArgs] | None:
+        """
+        以 blit 参数序列的形式完成渲染，由子类实现。
+        返回非 None 时，调用方会把这些参数合并到 blits 批次中，而不再调用 render()。
+        Returns:
+            Sequence[fantas.BlitArgs] | None: blit 参数序列，None 表示需要调用 render()。
+        """
+        return None
+
+    def is_opaque(self) -> bool:
+        """
+        是否会完全覆盖范围矩形内原有的像素，由子类实现。
+        返回 True 的渲染命令会遮挡范围矩形内下层的渲染命令。
+        Returns:
+            bool: 是否完全覆盖。
+        """
+        return False
+
+    def get_bounding_rect(self) -> fantas.Rect | None:
+        """
+        获取此渲染命令可能绘制到的矩形范围，由子类实现。
+        Returns:
+            fantas.Rect | None: 新的矩形对象，None 表示可能绘制到整个目标 Surface。
+        """
+        return None
+
+    def get_render_key(self) -> object:
+        """
+        获取决定渲染结果的状态快照，由子类实现。
+        两帧的快照相等时，认为此渲染命令的渲染结果没有变化。
+        Returns:
+            object: 状态快照，None 表示无法判断，每一帧都视为发生了变化。
+        """
+        return None
+
+
+@dataclass(slots=True)
+class CacheGroupRenderCommand(RenderCommand):
+    """
+    缓存组渲染命令类，绘制缓存组的离屏 Surface，命中测试时转发给子树的渲染命令。
+    Args:
+        rect           : 渲染区域。
+        surface        : 离屏 Surface。
+        commands       : 子树的渲染命令，坐标相对于离屏 Surface。
+        cache_version  : 离屏 Surface 对应的缓存组版本号。
+        static         : 子树是否可以在没有变化时复用。
+        content_version: 离屏 Surface 的内容版本号，每次重新绘制时增加。
+    """
+
+    rect: fantas.Rect = field(init=False)
+    surface: fantas.Surface | None = field(default=None, init=False, repr=False)
+    commands: tuple[RenderCommand, ...] = field(default=(), init=False, repr=False)
+    cache_version: int = field(default=-1, init=False, repr=False)
+    static: bool = field(default=False, init=False, repr=False)
+    content_version: int = field(default=0, init=False, repr=False)
+
+    def render(self, target_surface: fantas.Surface) -> None:
+        """
+        将离屏 Surface 绘制到目标 Surface 上。
+        Args:
+            target_surface (fantas.Surface): 目标 Surface 对象。
+        """
+        if self.surface is not None:
+            target_surface.blit(self.surface, self.rect)
+
+    def get_inner_command(self, point: fantas.IntPoint) -> RenderCommand | None:
+        """
+        获取子树中位于该点的最上层渲染命令。
+        Args:
+            point (fantas.IntPoint): 坐标点（x, y）。
+        Returns:
+            RenderCommand | None: 命中的渲染命令，没有命中则返回 None。
+        """
+        if not self.rect.collidepoint(point):
+            return None
+        inner_point = (point[0] - self.rect.left, point[1] - self.rect.top)
+        for command in reversed(self.commands):
+            if command.hit_test(inner_point):
+                return command
+        return None
+
+    def hit_test(self, point: fantas.IntPoint) -> bool:
+        """
+        命中测试，只有命中子树中的渲染命令时才算命中。
+        Args:
+            point (fantas.IntPoint): 坐标点（x, y）。
+        Returns:
+            bool: 如果命中子树中的渲染命令则返回 True，否则返回 False。
+        """
+        return self.get_inner_command(point) is not None
+
+    def get_hit_ui(self, point: fantas.IntPoint) -> fantas.UI:
+        """
+        获取子树中位于该点的 UI 元素。
+        Args:
+            point (fantas.IntPoint): 已命中此渲染命令的坐标点（x, y）。
+        Returns:
+            fantas.UI: 命中的 UI 元素。
+        """
+        command = self.get_inner_command(point)
+        if command is None:
+            return self.creator
+        return command.get_hit_ui((point[0] - self.rect.left, point[1] - self.rect.top))
+
+    def get_blits(self) -> Sequence[fantas.BlitArgs] | None:
+        """
+        只需要一次 blit，可以合并到 blits 批次中。
+        Returns:
+            Sequence[fantas.BlitArgs] | None: blit 参数序列。
+        """
+        if self.surface is None:
+            return ()
+        return ((self.surface, self.rect.topleft),)
+
+    def get_bounding_rect(self) -> fantas.Rect:
+        """
+        获取渲染范围矩形。
+        Returns:
+            fantas.Rect: 渲染范围矩形。
+        """
+        return self.rect.copy()
+
+    def get_render_key(self) -> object:
+        """
+        获取状态快照，离屏 Surface 每次重新绘制后都视为发生了变化。
+        Returns:
+            object: 状态快照。
+        """
+        return (tuple(self.rect), self.content_version)
+
+    def is_opaque(self) -> bool:
+        """
+        离屏 Surface 不透明时完全覆盖范围矩形。
+        Returns:
+            bool: 是否完全覆盖。
+        """
+        return self.surface is not None and not (
+            self.surface.get_flags() & fantas.SRCALPHA
+        )
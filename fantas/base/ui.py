@@ -5,25 +5,76 @@ fantas.ui 的 Docstring
 from __future__ import annotations
 from dataclasses import dataclass, field
 from collections.abc import Iterator
+from typing import Any, ClassVar, TypeAlias, cast
 
 import fantas
 from .nodebase import NodeBase
 from .misc import generate_unique_id
+from .renderer import CacheGroupRenderCommand, render_commands
 
 __all__ = (
     "UI",
     "BlankUI",
+    "CacheGroup",
     "WindowRoot",
 )
 
+# 渲染命令缓存类型，(版本号, 偏移位置, 视口, 渲染命令元组, 是否可复用)
+RenderCache: TypeAlias = tuple[
+    int,
+    tuple[float, ...],
+    tuple[int, ...] | None,
+    tuple["fantas.RenderCommand", ...],
+    bool,
+]
 
-@dataclass(slots=True)
+# 不影响渲染结果的属性，修改它们不会增加版本号
+UNTRACKED_ATTRS: frozenset[str] = frozenset(
+    (
+        "father",
+        "children",
+        "pass_path_cache",
+        "version",
+        "changed_epoch",
+        "render_cache",
+        "animating",
+        "animating_count",
+    )
+)
+
+
+@dataclass(slots=True, weakref_slot=True)
 class UI(NodeBase["UI"]):
-    """显示元素基类。"""
+    """
+    显示元素基类。
+    给属性赋值会增加自己及祖先节点的版本号，保留模式的渲染器据此复用渲染命令。
+    原地修改属性（比如 ui.rect.x += 1）无法被察觉，需要手动调用 mark_changed()。
+    支持弱引用，事件处理器据此在元素被回收时清除它的监听器。
+    """
+
+    retained: ClassVar[bool] = False  # 当前是否正在以保留模式生成渲染命令
+    viewport: ClassVar[fantas.Rect | None] = None  # 当前用于剔除的视口，None 表示不剔除
 
     ui_id: fantas.UIid = field(
         default_factory=generate_unique_id, init=False
     )  # 唯一标识 ID
+    contains_children: bool = field(
+        default=False, init=False
+    )  # 是否保证自己及所有后代元素都绘制在自己的 rect 范围内，视口剔除据此跳过整个子树
+    render_cache: RenderCache | None = field(
+        default=None, init=False, repr=False
+    )  # 保留模式的渲染命令缓存
+    animating: bool = field(
+        default=False, init=False, repr=False
+    )  # 自己是否正在播放需要持续重绘的内容
+    animating_count: int = field(
+        default=0, init=False, repr=False
+    )  # 自己及后代节点中正在播放的元素数量
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        object.__setattr__(self, name, value)
+        if name not in UNTRACKED_ATTRS:
+            self.mark_changed()
 
     def create_render_commands(
         self, offset: fantas.Point = (0, 0)
@@ -35,8 +86,147 @@ class UI(NodeBase["UI"]):
         Yields:
             RenderCommand: 渲染命令对象。
         """
+        viewport = UI.viewport
+        if viewport is not None:
+            yield from self.create_culled_children_render_commands(offset, viewport)
+        elif UI.retained:
+            for child in self.children:
+                yield from child.create_retained_render_commands(offset)
+        else:
+            for child in self.children:
+                yield from child.create_render_commands(offset)
+
+    def create_culled_children_render_commands(
+        self, offset: fantas.Point, viewport: fantas.Rect
+    ) -> Iterator[fantas.RenderCommand]:
+        """
+        遍历子节点并生成渲染命令，跳过完全在视口外的子树。
+        只有声明了 contains_children 的子节点才能被整体剔除。
+        Args:
+            offset (fantas.Point): 当前元素的偏移位置，用于计算子元素的绝对位置。
+            viewport (fantas.Rect): 视口矩形。
+        Yields:
+            RenderCommand: 渲染命令对象。
+        """
+        retained = UI.retained
+        viewport_key = tuple(viewport)
         for child in self.children:
-            yield from child.create_render_commands(offset)
+            if child.contains_children and not viewport.colliderect(
+                cast(Any, child).rect.move(offset)
+            ):
+                if retained:
+                    # 在这个视口下被剔除的子树不生成任何命令，这个结果本身可以复用
+                    # 视口变化时父节点的缓存会失效，重新判断是否剔除
+                    child.render_cache = (
+                        child.version,
+                        tuple(offset),
+                        viewport_key,
+                        (),
+                        True,
+                    )
+                    self.observe_versions()
+                continue
+            if retained:
+                yield from child.create_retained_render_commands(offset)
+            else:
+                yield from child.create_render_commands(offset)
+
+    def create_retained_render_commands(
+        self, offset: fantas.Point = (0, 0)
+    ) -> tuple[fantas.RenderCommand, ...]:
+        """
+        以保留模式创建渲染命令列表。
+        自己及所有后代节点都没有变化且偏移位置与视口都相同时，直接复用上次的结果。
+        Args:
+            offset (fantas.Point): 当前元素的偏移位置，用于计算子元素的绝对位置。
+        Returns:
+            tuple[RenderCommand, ...]: 渲染命令元组。
+        """
+        viewport = UI.viewport
+        viewport_key = None if viewport is None else tuple(viewport)
+        cache = self.render_cache
+        if (
+            cache is not None
+            and cache[4]
+            and cache[0] == self.version
+            and cache[1] == offset
+            and cache[2] == viewport_key
+        ):
+            return cache[3]
+        commands = tuple(self.create_render_commands(offset))
+        # 自己及所有子节点的结果都可复用时，结果才可复用
+        cacheable = self.is_retainable() and all(
+            child.render_cache is not None and child.render_cache[4]
+            for child in self.children or ()
+        )
+        self.render_cache = (
+            self.version,
+            tuple(offset),
+            viewport_key,
+            commands,
+            cacheable,
+        )
+        self.observe_versions()
+        return commands
+
+    def is_retainable(self) -> bool:
+        """
+        自己的渲染命令是否可以在没有变化时复用，每帧都会变化的元素应返回 False。
+        Returns:
+            bool: 是否可以复用。
+        """
+        return True
+
+    def set_animating(self, animating: bool) -> None:
+        """
+        设置自己是否正在播放需要持续重绘的内容，同时更新自己及所有祖先节点的计数。
+        Args:
+            animating (bool): 是否正在播放。
+        """
+        if animating == self.animating:
+            return
+        self.animating = animating
+        delta = 1 if animating else -1
+        node: fantas.UI | None = self
+        while node is not None:
+            node.animating_count += delta
+            node = node.father
+
+    def is_animating(self) -> bool:
+        """
+        自己或后代节点是否正在播放需要持续重绘的内容，按需渲染模式据此决定能否休眠。
+        Returns:
+            bool: 是否正在播放。
+        """
+        return self.animating_count > 0
+
+    def on_attach(self, node: fantas.UI) -> None:
+        """
+        子树被添加后将其中正在播放的元素计入计数。
+        Args:
+            node (fantas.UI): 被添加的子树的根元素。
+        """
+        self.animating_count += node.animating_count
+        NodeBase.on_attach(self, node)
+
+    def on_detach(self, node: fantas.UI) -> None:
+        """
+        子树被移除后从计数中减去其中正在播放的元素。
+        Args:
+            node (fantas.UI): 被移除的子树的根元素。
+        """
+        self.animating_count -= node.animating_count
+        NodeBase.on_detach(self, node)
+
+    def is_static(self) -> bool:
+        """
+        自己及所有后代节点是否都可以在没有变化时复用渲染结果。
+        Returns:
+            bool: 是否整个子树都可以复用。
+        """
+        return self.is_retainable() and all(
+            child.is_static() for child in self.children or ()
+        )
 
 
 @dataclass(slots=True)
@@ -58,6 +248,120 @@ class BlankUI(UI):
         yield from UI.create_render_commands(self, self.rect.move(offset).topleft)
 
 
+@dataclass(slots=True)
+class CacheGroup(UI):
+    """
+    缓存组元素类，将整个子树绘制到离屏 Surface 上，之后每帧只需要一次 blit。
+    子树的版本号变化时才会重新绘制，原地修改属性或样式后需要手动调用 mark_changed()。
+    子树中包含每帧都会变化的元素（比如正在播放的动画）时，每帧都会重新绘制。
+    子元素的坐标相对于 rect 左上角，超出 rect 的部分会被裁剪。
+    Args:
+        rect   : 矩形区域。
+        bgcolor: 离屏 Surface 的背景色，None 表示透明背景。
+                 使用不透明背景色时混合结果与直接绘制完全一致，且 blit 更快。
+    """
+
+    rect: fantas.Rect | fantas.FRect
+    bgcolor: fantas.ColorLike | None = None
+
+    command: CacheGroupRenderCommand = field(init=False, repr=False)  # 渲染命令对象
+
+    def __post_init__(self) -> None:
+        """初始化 CacheGroup 实例"""
+        self.command = CacheGroupRenderCommand(creator=self)
+        self.contains_children = True
+
+    def create_render_commands(
+        self, offset: fantas.Point = (0, 0)
+    ) -> Iterator[fantas.RenderCommand]:
+        """
+        创建渲染命令列表，子树没有变化时直接复用离屏 Surface。
+        Args:
+            offset (fantas.Point): 当前元素的偏移位置，用于计算子元素的绝对位置。
+        Yields:
+            RenderCommand: 渲染命令对象。
+        """
+        c = self.command
+        c.rect = fantas.Rect(self.rect).move(offset)
+        if (
+            c.surface is None
+            or c.cache_version != self.version
+            or not c.static
+            or c.surface.get_size() != c.rect.size
+        ):
+            self.update_cache()
+        yield c
+
+    def create_retained_render_commands(
+        self, offset: fantas.Point = (0, 0)
+    ) -> tuple[fantas.RenderCommand, ...]:
+        """
+        以保留模式创建渲染命令列表，子树由自己管理，不需要检查子节点的缓存。
+        Args:
+            offset (fantas.Point): 当前元素的偏移位置，用于计算子元素的绝对位置。
+        Returns:
+            tuple[RenderCommand, ...]: 渲染命令元组。
+        """
+        viewport = UI.viewport
+        viewport_key = None if viewport is None else tuple(viewport)
+        cache = self.render_cache
+        # 被剔除时父节点写入的空缓存以视口为键，视口变化后需要重新生成
+        if (
+            cache is not None
+            and cache[4]
+            and cache[0] == self.version
+            and cache[1] == offset
+            and cache[2] == viewport_key
+        ):
+            return cache[3]
+        commands = tuple(self.create_render_commands(offset))
+        self.render_cache = (
+            self.version,
+            tuple(offset),
+            viewport_key,
+            commands,
+            self.command.static,
+        )
+        self.observe_versions()
+        return commands
+
+    def update_cache(self) -> None:
+        """
+        重新生成子树的渲染命令并绘制到离屏 Surface 上。
+        """
+        c = self.command
+        size = c.rect.size
+        if c.surface is None or c.surface.get_size() != size:
+            if self.bgcolor is None:
+                c.surface = fantas.Surface(size, fantas.SRCALPHA)
+            else:
+                c.surface = fantas.Surface(size)
+        c.surface.fill((0, 0, 0, 0) if self.bgcolor is None else self.bgcolor)
+        # 离屏绘制时不使用视口剔除与保留模式
+        retained, viewport = UI.retained, UI.viewport
+        UI.retained = False
+        UI.viewport = None
+        try:
+            commands = tuple(UI.create_render_commands(self))
+        finally:
+            UI.retained = retained
+            UI.viewport = viewport
+        render_commands(commands, c.surface)
+        c.commands = commands
+        c.cache_version = self.version
+        self.observe_versions()
+        c.static = all(child.is_static() for child in self.children or ())
+        c.content_version += 1
+
+    def is_retainable(self) -> bool:
+        """
+        子树中没有每帧都会变化的元素时才可以复用。
+        Returns:
+            bool: 是否可以复用。
+        """
+        return self.command.static
+
+
 @dataclass(slots=True)
 class WindowRoot(UI):
     """
@@ -75,3 +379,13 @@ class WindowRoot(UI):
     def update_rect(self) -> None:
         """更新窗口矩形区域。"""
         self.rect.size = self.window.size
+        self.mark_changed()
+
+    def on_detach(self, node: fantas.UI) -> None:
+        """
+        子树从窗口中被移除后，让事件处理器释放对它的引用。
+        Args:
+            node (fantas.UI): 被移除的子树的根元素。
+        """
+        self.window.event_handler.release_detached(node)
+        UI.on_detach(self, node)
@@ -7,7 +7,7 @@ from collections.abc import Callable
 from dataclasses import dataclass
 
 from fantas._vendor.pygame.window import Window as PygameWindow
-from fantas._vendor.pygame.constants import WINDOWPOS_UNDEFINED
+from fantas._vendor.pygame.constants import WINDOWPOS_UNDEFINED, NOEVENT
 
 import fantas
 
@@ -33,6 +33,32 @@ class WindowConfig:
         mouse_focus (bool): 窗口是否在创建时获得鼠标焦点。
         input_focus (bool): 窗口是否在创建时获得输入焦点。
         allow_high_dpi (bool): 是否允许高 DPI 显示。
+        dirty_rect (bool): 是否启用脏矩形增量渲染，只重绘发生变化的区域。
+        retained_mode (bool): 是否启用保留模式，复用没有变化的子树的渲染命令。
+            启用后原地修改 UI 属性（比如 ui.rect.x += 1）需要调用 ui.mark_changed()。
+        occlusion_culling (bool): 是否启用遮挡剔除，跳过被不透明元素完全遮挡的元素。
+        viewport_culling (bool): 是否启用视口剔除，跳过完全在窗口外的元素，
+            以及声明了 contains_children 且完全在窗口外的整个子树。
+        on_demand (bool): 是否启用按需渲染，没有帧函数、没有播放中的动画、
+            UI 树没有变化且没有手动标记的脏区域时，阻塞等待事件而不是重绘。
+            直接修改 Surface 像素等无法察觉的变化需要调用 renderer.mark_dirty()。
+        on_demand_timeout (int): 按需渲染时单次等待的最长时间（毫秒），
+            超时后会重绘一次，0 表示一直等待到有事件为止。
+        record_frame_times (bool): 是否记录每帧各个阶段的耗时，
+            启用后可以通过 window.frame_times 查询百分位耗时与卡顿帧数。
+        frame_time_dump (str | None): 程序退出时保存帧耗时记录的文件路径，
+            后缀为 .csv 时保存为 CSV，否则保存为 JSON，设置后自动启用帧耗时记录。
+        coalesce_mousemotion (bool): 是否合并一帧内连续的鼠标移动事件，
+            合并后只对最后的位置做一次命中测试，rel 为累计值，buttons 为按位或。
+        trace_file (str | None): 程序退出时保存性能追踪数据的文件路径，
+            设置后启用性能追踪，记录帧阶段、帧函数、事件分发与渲染命令的耗时，
+            保存为 Chrome 追踪事件格式的 JSON，可以用 Perfetto 打开。
+        event_record_file (str | None): 程序退出时保存事件录制数据的文件路径，
+            设置后录制每帧处理的事件与时间，可以用 event_replay_file 回放。
+        event_replay_file (str | None): 要回放的事件录制文件路径，设置后忽略真实的
+            输入事件，回放结束后关闭窗口，配合帧耗时记录可以重复运行同一个性能测试场景。
+        replay_real_time (bool): 是否按录制时的时间实时回放，
+            否则不限制帧率地全速回放，并让每帧读到的时间与录制时相同。
     """
 
     title: str = "Fantas Window"
@@ -44,6 +70,19 @@ class WindowConfig:
     mouse_focus: bool = True
     input_focus: bool = True
     allow_high_dpi: bool = True
+    dirty_rect: bool = False
+    retained_mode: bool = False
+    occlusion_culling: bool = False
+    viewport_culling: bool = False
+    on_demand: bool = False
+    on_demand_timeout: int = 1000
+    record_frame_times: bool = False
+    frame_time_dump: str | None = None
+    coalesce_mousemotion: bool = False
+    trace_file: str | None = None
+    event_record_file: str | None = None
+    event_replay_file: str | None = None
+    replay_real_time: bool = False
 
     @property
     def width(self) -> int:
@@ -83,8 +122,22 @@ class Window(PygameWindow):
 
         self.running: bool = True  # 窗口运行状态标志
         self.fps: int = window_config.fps  # 窗口帧率设置
+        self.on_demand: bool = window_config.on_demand  # 是否启用按需渲染
+        self.on_demand_timeout: int = (
+            window_config.on_demand_timeout
+        )  # 按需渲染时单次等待的最长时间（毫秒）
+        self.rendered_version: int = -1  # 上次渲染时根 UI 元素的版本号
+        self.coalesce_mousemotion: bool = (
+            window_config.coalesce_mousemotion
+        )  # 是否合并一帧内连续的鼠标移动事件
         self.screen: fantas.Surface = self.get_surface()  # 窗口的主 Surface 对象
-        self.renderer: fantas.Renderer = fantas.Renderer(self)  # 窗口的渲染器对象
+        self.renderer: fantas.Renderer = fantas.Renderer(
+            self,
+            dirty_rect_mode=window_config.dirty_rect,
+            retained_mode=window_config.retained_mode,
+            occlusion_culling=window_config.occlusion_culling,
+            viewport_culling=window_config.viewport_culling,
+        )  # 窗口的渲染器对象
         self.root_ui: fantas.WindowRoot = fantas.WindowRoot(
             window=self
         )  # 窗口的根 UI 元素
@@ -92,6 +145,37 @@ class Window(PygameWindow):
             window=self
         )  # 窗口的事件处理器对象
         self.mouse_magnify_ratio: int = 0
+        self.hooks: list[fantas.FrameHook] = []  # 挂载到主循环的帧钩子
+        self.frame_times: fantas.FrameTimeRecorder | None = (
+            None
+        )  # 帧耗时记录器，未启用帧耗时记录时为 None
+        if window_config.record_frame_times or window_config.frame_time_dump:
+            # 帧预算在挂载时按窗口的帧率设置，之后每帧跟随帧率更新
+            self.frame_times = fantas.FrameTimeRecorder()
+            if window_config.frame_time_dump:
+                self.frame_times.dump_at_exit(window_config.frame_time_dump)
+            self.add_hook(self.frame_times)
+        self.tracer: fantas.Tracer | None = None  # 性能追踪器，未启用追踪时为 None
+        if window_config.trace_file:
+            self.tracer = fantas.Tracer(tid=self.id)
+            self.tracer.dump_at_exit(window_config.trace_file)
+            self.add_hook(self.tracer)
+        self.event_recorder: fantas.EventRecorder | None = (
+            None
+        )  # 事件录制器，未启用事件录制时为 None
+        if window_config.event_record_file:
+            self.event_recorder = fantas.EventRecorder()
+            self.event_recorder.dump_at_exit(window_config.event_record_file)
+            self.add_hook(self.event_recorder)
+        self.event_replayer: fantas.EventReplayer | None = (
+            None
+        )  # 事件回放器，未启用事件回放时为 None
+        if window_config.event_replay_file:
+            self.event_replayer = fantas.EventReplayer.load(
+                window_config.event_replay_file,
+                real_time=window_config.replay_real_time,
+            )
+            self.add_hook(self.event_replayer)
 
         # 方便访问根 UI 元素的方法
         self.append: Callable[[fantas.UI], None] = self.root_ui.append
@@ -102,6 +186,55 @@ class Window(PygameWindow):
         # 方便访问事件处理器的管理监听器方法
         self.add_event_listener = self.event_handler.add_event_listener
         self.remove_event_listener = self.event_handler.remove_event_listener
+        self.purge_listeners = self.event_handler.purge_listeners
+
+    def add_hook(self, hook: fantas.FrameHook) -> None:
+        """
+        挂载帧钩子，在下一次进入主循环时生效。
+        Args:
+            hook (fantas.FrameHook): 帧钩子。
+        """
+        self.hooks.append(hook)
+        hook.attach(self)
+
+    def remove_hook(self, hook: fantas.FrameHook) -> None:
+        """
+        卸载帧钩子，在下一次进入主循环时生效。
+        Args:
+            hook (fantas.FrameHook): 帧钩子。
+        """
+        self.hooks.remove(hook)
+        hook.detach(self)
+
+    def is_idle(self) -> bool:
+        """
+        检查窗口是否没有需要重绘的内容，用于按需渲染。
+        Returns:
+            bool: 没有帧函数、没有播放中的动画、UI 树自上次渲染后没有变化且
+                没有手动标记的脏区域时返回 True。
+        """
+        return (
+            not fantas.has_framefuncs()
+            and not self.renderer.pending
+            and self.rendered_version == self.root_ui.version
+            and not self.root_ui.is_animating()
+        )
+
+    def render_frame(self, hook: fantas.FrameHook | None = None) -> None:
+        """
+        生成渲染命令并渲染窗口，有内容被重绘时更新窗口显示。
+        Args:
+            hook (fantas.FrameHook | None): 记录 PreRender 与 Render 阶段的帧钩子。
+        """
+        self.renderer.pre_render(self.root_ui)
+        if hook is not None:
+            hook.record("PreRender")
+        if self.renderer.render(self.screen):
+            self.flip()
+        self.rendered_version = self.root_ui.version
+        self.root_ui.observe_versions()
+        if hook is not None:
+            hook.record("Render")
 
     def mainloop(self) -> None:
         """
@@ -109,33 +242,53 @@ class Window(PygameWindow):
         """
         # 简化引用
         tick = fantas.CLOCK.tick
-        get = fantas.event.get
-        handle_event = self.event_handler.handle_event
+        get: Callable[[], list[fantas.Event]] = fantas.event.get
+        wait = fantas.event.wait
+        handle_event: Callable[[fantas.Event], None] = self.event_handler.handle_event
         run_framefuncs = fantas.run_framefuncs
-        pre_render = self.renderer.pre_render
-        render = self.renderer.render
-        root_ui = self.root_ui
-        screen = self.screen
-        flip = self.flip
+        render_frame = self.render_frame
+        is_idle = self.is_idle
+        coalesce_mousemotion = fantas.coalesce_mousemotion
+        # 合并帧钩子，没有帧钩子时 hook 为 None，主循环没有额外开销
+        hook = fantas.chain_hooks(self.hooks)
+        if hook is not None:
+            get = hook.wrap_get_events(get)
+            handle_event = hook.wrap_handle_event(handle_event)
+            run_framefuncs = hook.wrap_run_framefuncs(run_framefuncs)
         # 清空事件队列
         fantas.event.clear()
         # 预生成传递路径缓存
-        root_ui.build_pass_path_cache()
+        self.root_ui.build_pass_path_cache()
+        if hook is not None:
+            hook.loop_start()
         # 主循环
         while self.running:
             # 限制帧率
             tick(self.fps)
+            # 按需渲染模式下没有需要重绘的内容时，阻塞等待事件
+            events = get()
+            if not events and self.on_demand and is_idle():
+                event = wait(self.on_demand_timeout)
+                if event.type != NOEVENT:
+                    events.append(event)
+                    events.extend(get())
+            if self.coalesce_mousemotion:
+                events = coalesce_mousemotion(events)
+            if hook is not None:
+                hook.record("Idle")
             # 处理事件
-            for event in get():
+            for event in events:
                 handle_event(event)
+            if hook is not None:
+                hook.record("Event")
             # 运行帧函数
             run_framefuncs()
-            # 生成渲染命令
-            pre_render(root_ui)
-            # 渲染窗口
-            render(screen)
-            # 更新窗口显示
-            flip()
+            if hook is not None:
+                hook.record("FrameFunc")
+            # 生成渲染命令并渲染窗口
+            render_frame(hook)
+            if hook is not None:
+                hook.end_frame()
         self.destroy()
 
 
@@ -144,25 +297,65 @@ class MultiWindow:
     多窗口管理类，用于管理多个窗口实例。
     """
 
-    def __init__(self, *windows: Window, fps: int = 60) -> None:
+    def __init__(
+        self,
+        *windows: Window,
+        fps: int = 60,
+        on_demand_timeout: int = 1000,
+        coalesce_mousemotion: bool = False,
+    ) -> None:
         """
         初始化 MultiWindow 实例。
+        所有窗口都启用了按需渲染且都没有需要重绘的内容时，主循环阻塞等待事件。
         Args:
             *windows (Window): 可变数量的 Window 实例，表示要管理的多个窗口。
+            fps (int): 窗口帧率设置。
+            on_demand_timeout (int): 按需渲染时单次等待的最长时间（毫秒）。
+            coalesce_mousemotion (bool): 是否合并一帧内连续的、属于同一窗口的鼠标移动事件。
         """
         self.fps: int = fps  # 窗口帧率设置
+        self.on_demand_timeout: int = (
+            on_demand_timeout  # 按需渲染时单次等待的最长时间（毫秒）
+        )
         self.windows: dict[int, Window] = {
             window.id: window for window in windows
         }  # 管理的窗口字典，键为窗口 ID，值为 Window 实例
         self.running: bool = True  # 多窗口运行状态标志
+        self.coalesce_mousemotion: bool = (
+            coalesce_mousemotion  # 是否合并一帧内连续的鼠标移动事件
+        )
+        self.hooks: list[fantas.FrameHook] = []  # 挂载到所有窗口的帧钩子
 
     def append(self, window: Window) -> None:
         """
-        添加一个窗口到管理列表中。
+        添加一个窗口到管理列表中，并挂载所有窗口共用的帧钩子。
         Args:
             window (Window): 要添加的 Window 实例。
         """
         self.windows[window.id] = window
+        for hook in self.hooks:
+            hook.attach(window)
+
+    def add_hook(self, hook: fantas.FrameHook) -> None:
+        """
+        挂载所有窗口共用的帧钩子，在下一次进入主循环时生效。
+        多窗口主循环中，各个窗口自己的帧钩子与共用的帧钩子一同记录整个循环的各个阶段。
+        Args:
+            hook (fantas.FrameHook): 帧钩子。
+        """
+        self.hooks.append(hook)
+        for window in self.windows.values():
+            hook.attach(window)
+
+    def remove_hook(self, hook: fantas.FrameHook) -> None:
+        """
+        卸载所有窗口共用的帧钩子，在下一次进入主循环时生效。
+        Args:
+            hook (fantas.FrameHook): 帧钩子。
+        """
+        self.hooks.remove(hook)
+        for window in self.windows.values():
+            hook.detach(window)
 
     def pop(self, window: Window) -> Window | None:
         """
@@ -216,18 +409,41 @@ class MultiWindow:
             left += window.size[0] + padding
             bottom = max(bottom, top + window.size[1] + padding)
 
+    def dispatch_event(self, event: fantas.Event) -> None:
+        """
+        分发事件，如果事件关联到特定窗口，则只传递给该窗口，否则传递给所有窗口。
+        Args:
+            event (fantas.Event): 要分发的事件。
+        """
+        window = getattr(event, "window", None)
+        if window is not None:
+            window.event_handler.handle_event(event)
+        else:
+            for window in self.windows.values():
+                window.event_handler.handle_event(event)
+
     def mainloops(self) -> None:
         """
         进入所有管理窗口的主事件循环，直到所有窗口关闭。
         """
         # 简化引用
         tick = fantas.CLOCK.tick
-        get = fantas.event.get
+        get: Callable[[], list[fantas.Event]] = fantas.event.get
+        wait = fantas.event.wait
         windows = self.windows
+        dispatch_event: Callable[[fantas.Event], None] = self.dispatch_event
         run_framefuncs = fantas.run_framefuncs
+        coalesce_mousemotion = fantas.coalesce_mousemotion
+        # 合并共用的与各个窗口的帧钩子，没有帧钩子时 hook 为 None，主循环没有额外开销
+        hook = fantas.chain_hooks(
+            [*self.hooks, *(h for window in windows.values() for h in window.hooks)]
+        )
+        if hook is not None:
+            get = hook.wrap_get_events(get)
+            dispatch_event = hook.wrap_handle_event(dispatch_event)
+            run_framefuncs = hook.wrap_run_framefuncs(run_framefuncs)
         # 清空事件队列
         fantas.event.clear()
-        window: Window | None
         for window in windows.values():
             # 预生成传递路径缓存
             window.root_ui.build_pass_path_cache()
@@ -235,29 +451,36 @@ class MultiWindow:
             window.add_event_listener(
                 fantas.WINDOWCLOSE, window.root_ui, True, self.handle_window_close_event
             )
+        if hook is not None:
+            hook.loop_start()
         # 主循环
         while self.running:
             # 限制帧率
             tick(self.fps)
+            # 所有窗口都没有需要重绘的内容时，阻塞等待事件
+            events = get()
+            if not events and all(
+                window.on_demand and window.is_idle() for window in windows.values()
+            ):
+                event = wait(self.on_demand_timeout)
+                if event.type != NOEVENT:
+                    events.append(event)
+                    events.extend(get())
+            if self.coalesce_mousemotion:
+                events = coalesce_mousemotion(events)
+            if hook is not None:
+                hook.record("Idle")
             # 处理事件
-            for event in get():
-                # 如果事件关联到特定窗口，则只传递给该窗口，否则传递给所有窗口
-                if hasattr(event, "window"):
-                    window = event.window
-                else:
-                    window = None
-                if window is not None:
-                    window.event_handler.handle_event(event)
-                else:
-                    for window in windows.values():
-                        window.event_handler.handle_event(event)
+            for event in events:
+                dispatch_event(event)
+            if hook is not None:
+                hook.record("Event")
             # 运行帧函数
             run_framefuncs()
+            if hook is not None:
+                hook.record("FrameFunc")
             # 渲染所有窗口
             for window in windows.values():
-                # 生成渲染命令
-                window.renderer.pre_render(window.root_ui)
-                # 渲染窗口
-                window.renderer.render(window.screen)
-                # 更新窗口显示
-                window.flip()
+                window.render_frame(hook)
+            if hook is not None:
+                hook.end_frame()
@@ -27,8 +27,30 @@ class _HasRect(Protocol):
 class Layout(fantas.UI, ABC):
     """
     布局器基类。
+    布局结果依赖父元素的尺寸与布局参数，保留模式下父元素尺寸变化或通过设置方法修改布局参数时
+    才会重新布局，原地修改布局参数后需要手动调用 mark_changed()。
     """
 
+    father_size: tuple[float, ...] | None = field(
+        default=None, init=False, repr=False
+    )  # 上一次布局时父元素的尺寸
+
+    def create_retained_render_commands(
+        self, offset: fantas.Point = (0, 0)
+    ) -> tuple[fantas.RenderCommand, ...]:
+        """
+        以保留模式创建渲染命令列表，父元素的尺寸变化时标记自己发生了变化以重新布局。
+        Args:
+            offset (fantas.Point): 当前元素的偏移位置，用于计算子元素的绝对位置。
+        Returns:
+            tuple[RenderCommand, ...]: 渲染命令元组。
+        """
+        size = tuple(cast(_HasRect, self.father).rect.size)
+        if size != self.father_size:
+            # 赋值会增加自己及祖先节点的版本号
+            self.father_size = size
+        return fantas.UI.create_retained_render_commands(self, offset)
+
     def create_render_commands(
         self, offset: fantas.Point = (0, 0)
     ) -> Iterator[fantas.RenderCommand]:
@@ -39,7 +61,15 @@ class Layout(fantas.UI, ABC):
         Yields:
             RenderCommand: 渲染命令对象。
         """
-        self.auto_layout()
+        if fantas.UI.retained:
+            # 布局会原地修改子元素的矩形，需要标记矩形发生变化的子元素
+            rects = [tuple(cast(_HasRect, child).rect) for child in self.children]
+            self.auto_layout()
+            for child, rect in zip(self.children, rects):
+                if tuple(cast(_HasRect, child).rect) != rect:
+                    child.mark_changed()
+        else:
+            self.auto_layout()
         yield from fantas.UI.create_render_commands(self, offset)
 
     @abstractmethod
@@ -97,6 +127,7 @@ class RelativeLayout(Layout):
             margin (list[int | None]): 边距值列表，格式为 [left, top, right, bottom]。
         """
         self.margin_dict[child.ui_id] = margin
+        self.mark_changed()
 
     def set_margin_left(self, child: fantas.UI, left: int) -> None:
         """
@@ -107,6 +138,7 @@ class RelativeLayout(Layout):
         """
         margin = self.margin_dict.setdefault(child.ui_id, [None, None, None, None])
         margin[0] = left
+        self.mark_changed()
 
     def set_margin_top(self, child: fantas.UI, top: int) -> None:
         """
@@ -117,6 +149,7 @@ class RelativeLayout(Layout):
         """
         margin = self.margin_dict.setdefault(child.ui_id, [None, None, None, None])
         margin[1] = top
+        self.mark_changed()
 
     def set_margin_right(self, child: fantas.UI, right: int) -> None:
         """
@@ -127,6 +160,7 @@ class RelativeLayout(Layout):
         """
         margin = self.margin_dict.setdefault(child.ui_id, [None, None, None, None])
         margin[2] = right
+        self.mark_changed()
 
     def set_margin_bottom(self, child: fantas.UI, bottom: int) -> None:
         """
@@ -137,6 +171,7 @@ class RelativeLayout(Layout):
         """
         margin = self.margin_dict.setdefault(child.ui_id, [None, None, None, None])
         margin[3] = bottom
+        self.mark_changed()
 
     def _get_default_margin_left(self) -> int | None:
         """
@@ -153,6 +188,7 @@ class RelativeLayout(Layout):
             value (int | None): 默认左边距值，如果为None则表示不设置默认值。
         """
         self.default_margin[0] = value
+        self.mark_changed()
 
     default_margin_left = property(_get_default_margin_left, _set_default_margin_left)
 
@@ -171,6 +207,7 @@ class RelativeLayout(Layout):
             value (int | None): 默认上边距值，如果为None则表示不设置默认值。
         """
         self.default_margin[1] = value
+        self.mark_changed()
 
     default_margin_top = property(_get_default_margin_top, _set_default_margin_top)
 
@@ -189,6 +226,7 @@ class RelativeLayout(Layout):
             value (int | None): 默认右边距值，如果为None则表示不设置默认值。
         """
         self.default_margin[2] = value
+        self.mark_changed()
 
     default_margin_right = property(
         _get_default_margin_right, _set_default_margin_right
@@ -209,6 +247,7 @@ class RelativeLayout(Layout):
             value (int | None): 默认下边距值，如果为None则表示不设置默认值。
         """
         self.default_margin[3] = value
+        self.mark_changed()
 
     default_margin_bottom = property(
         _get_default_margin_bottom, _set_default_margin_bottom
@@ -262,32 +301,14 @@ class RelativeLayout(Layout):
         if any(margin):
             self.set_margin(node, margin)
 
-    def remove(self, node: fantas.UI) -> None:
+    def on_detach(self, node: fantas.UI) -> None:
         """
-        从自己的子元素中移除 node。
+        子元素被移除后清除它的边距数据。
         Args:
-            node (fantas.UI): 子元素对象。
-        Raises:
-            ValueError: 要移除的子元素不是当前元素的子元素。
-        """
-        fantas.UI.remove(self, node)
-        if node.ui_id in self.margin_dict:
-            del self.margin_dict[node.ui_id]
-
-    def pop(self, index: int) -> fantas.UI:
-        """
-        移除index位置的子元素。
-        Args:
-            index (int): 要移除子元素的位置索引。
-        Returns:
-            node (fantas.UI): 被移除的子元素对象。
-        Raises:
-            IndexError: 索引越界。
+            node (fantas.UI): 被移除的子树的根元素。
         """
-        node = fantas.UI.pop(self, index)
-        if node.ui_id in self.margin_dict:
-            del self.margin_dict[node.ui_id]
-        return node
+        self.margin_dict.pop(node.ui_id, None)
+        fantas.UI.on_detach(self, node)
 
     def clear(self) -> None:
         """
@@ -352,6 +373,7 @@ class RatioLayout(Layout):
             ]
         """
         self.ratio_dict[child.ui_id] = ratio
+        self.mark_changed()
 
     def set_ratio_left(self, child: fantas.UI, left_ratio: float) -> None:
         """
@@ -362,6 +384,7 @@ class RatioLayout(Layout):
         """
         rect_ratio = self.ratio_dict.setdefault(child.ui_id, [None, None, None, None])
         rect_ratio[0] = left_ratio
+        self.mark_changed()
 
     def set_ratio_top(self, child: fantas.UI, top_ratio: float) -> None:
         """
@@ -372,6 +395,7 @@ class RatioLayout(Layout):
         """
         rect_ratio = self.ratio_dict.setdefault(child.ui_id, [None, None, None, None])
         rect_ratio[1] = top_ratio
+        self.mark_changed()
 
     def set_ratio_width(self, child: fantas.UI, width_ratio: float) -> None:
         """
@@ -382,6 +406,7 @@ class RatioLayout(Layout):
         """
         rect_ratio = self.ratio_dict.setdefault(child.ui_id, [None, None, None, None])
         rect_ratio[2] = width_ratio
+        self.mark_changed()
 
     def set_ratio_height(self, child: fantas.UI, height_ratio: float) -> None:
         """
@@ -392,6 +417,7 @@ class RatioLayout(Layout):
         """
         rect_ratio = self.ratio_dict.setdefault(child.ui_id, [None, None, None, None])
         rect_ratio[3] = height_ratio
+        self.mark_changed()
 
     def _get_default_ratio_left(self) -> float | None:
         """
@@ -408,6 +434,7 @@ class RatioLayout(Layout):
             value (float | None): 默认左边距比例值，如果为None则表示不设置默认值。
         """
         self.default_ratio[0] = value
+        self.mark_changed()
 
     default_ratio_left = property(_get_default_ratio_left, _set_default_ratio_left)
 
@@ -426,6 +453,7 @@ class RatioLayout(Layout):
             value (float | None): 默认上边距比例值，如果为None则表示不设置默认值。
         """
         self.default_ratio[1] = value
+        self.mark_changed()
 
     default_ratio_top = property(_get_default_ratio_top, _set_default_ratio_top)
 
@@ -444,6 +472,7 @@ class RatioLayout(Layout):
             value (float | None): 默认宽度比例值，如果为None则表示不设置默认值。
         """
         self.default_ratio[2] = value
+        self.mark_changed()
 
     default_ratio_width = property(_get_default_ratio_width, _set_default_ratio_width)
 
@@ -462,6 +491,7 @@ class RatioLayout(Layout):
             value (float | None): 默认高度比例值，如果为None则表示不设置默认值。
         """
         self.default_ratio[3] = value
+        self.mark_changed()
 
     default_ratio_height = property(
         _get_default_ratio_height, _set_default_ratio_height
@@ -515,32 +545,14 @@ class RatioLayout(Layout):
         if any(ratio):
             self.set_ratio(node, ratio)
 
-    def remove(self, node: fantas.UI) -> None:
+    def on_detach(self, node: fantas.UI) -> None:
         """
-        从自己的子元素中移除 node。
+        子元素被移除后清除它的比例数据。
         Args:
-            node (fantas.UI): 子元素对象。
-        Raises:
-            ValueError: 要移除的子元素不是当前元素的子元素。
+            node (fantas.UI): 被移除的子树的根元素。
         """
-        fantas.UI.remove(self, node)
-        if node.ui_id in self.ratio_dict:
-            del self.ratio_dict[node.ui_id]
-
-    def pop(self, index: int) -> fantas.UI:
-        """
-        移除index位置的子元素。
-        Args:
-            index (int): 要移除子元素的位置索引。
-        Returns:
-            node (fantas.UI): 被移除的子元素对象。
-        Raises:
-            IndexError: 索引越界。
-        """
-        node = fantas.UI.pop(self, index)
-        if node.ui_id in self.ratio_dict:
-            del self.ratio_dict[node.ui_id]
-        return node
+        self.ratio_dict.pop(node.ui_id, None)
+        fantas.UI.on_detach(self, node)
 
     def clear(self) -> None:
         """
@@ -612,6 +624,7 @@ class DockLayout(Layout):
             dock_mode (fantas.DockMode): 停靠模式值。
         """
         self.dock_mode_dict[child.ui_id] = dock_mode
+        self.mark_changed()
 
     def append(
         self, node: fantas.UI, dock_mode: fantas.DockMode = fantas.DockMode.NONE
@@ -645,32 +658,14 @@ class DockLayout(Layout):
         if dock_mode != fantas.DockMode.NONE:
             self.set_dock_mode(node, dock_mode)
 
-    def remove(self, node: fantas.UI) -> None:
+    def on_detach(self, node: fantas.UI) -> None:
         """
-        从自己的子元素中移除 node。
+        子元素被移除后清除它的停靠模式数据。
         Args:
-            node (fantas.UI): 子元素对象。
-        Raises:
-            ValueError: 要移除的子元素不是当前元素的子元素。
+            node (fantas.UI): 被移除的子树的根元素。
         """
-        fantas.UI.remove(self, node)
-        if node.ui_id in self.dock_mode_dict:
-            del self.dock_mode_dict[node.ui_id]
-
-    def pop(self, index: int) -> fantas.UI:
-        """
-        移除index位置的子元素。
-        Args:
-            index (int): 要移除子元素的位置索引。
-        Returns:
-            node (fantas.UI): 被移除的子元素对象。
-        Raises:
-            IndexError: 索引越界。
-        """
-        node = fantas.UI.pop(self, index)
-        if node.ui_id in self.dock_mode_dict:
-            del self.dock_mode_dict[node.ui_id]
-        return node
+        self.dock_mode_dict.pop(node.ui_id, None)
+        fantas.UI.on_detach(self, node)
 
     def clear(self) -> None:
         """
@@ -770,6 +765,7 @@ class GridLayout(Layout):
             column_index (int): 列索引。
         """
         self.cell_dict[child.ui_id] = (row_index, column_index)
+        self.mark_changed()
 
     def set_size(self, row: int, column: int) -> None:
         """
@@ -789,6 +785,7 @@ class GridLayout(Layout):
             height (int | float): 行高度，可以是固定高度或比例高度或自适应高度。
         """
         self.rows[row_index] = height
+        self.mark_changed()
 
     def set_column_width(self, column_index: int, width: int | float) -> None:
         """
@@ -798,6 +795,7 @@ class GridLayout(Layout):
             width (int | float): 列宽度，可以是固定宽度或比例宽度或自适应宽度。
         """
         self.columns[column_index] = width
+        self.mark_changed()
 
     def append(
         self, node: fantas.UI, row_index: int = 0, column_index: int = 0
@@ -828,32 +826,14 @@ class GridLayout(Layout):
         if (row_index, column_index) != (0, 0):
             self.set_cell(node, row_index, column_index)
 
-    def remove(self, node: fantas.UI) -> None:
+    def on_detach(self, node: fantas.UI) -> None:
         """
-        从自己的子元素中移除 node。
+        子元素被移除后清除它的单元格数据。
         Args:
-            node (fantas.UI): 子元素对象。
-        Raises:
-            ValueError: 要移除的子元素不是当前元素的子元素。
+            node (fantas.UI): 被移除的子树的根元素。
         """
-        fantas.UI.remove(self, node)
-        if node.ui_id in self.cell_dict:
-            del self.cell_dict[node.ui_id]
-
-    def pop(self, index: int) -> fantas.UI:
-        """
-        移除index位置的子元素。
-        Args:
-            index (int): 要移除子元素的位置索引。
-        Returns:
-            node (fantas.UI): 被移除的子元素对象。
-        Raises:
-            IndexError: 索引越界。
-        """
-        node = fantas.UI.pop(self, index)
-        if node.ui_id in self.cell_dict:
-            del self.cell_dict[node.ui_id]
-        return node
+        self.cell_dict.pop(node.ui_id, None)
+        fantas.UI.on_detach(self, node)
 
     def clear(self) -> None:
         """
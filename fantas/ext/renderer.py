@@ -2,6 +2,9 @@
 renderer 扩展
 """
 
+import math
+import weakref
+from collections.abc import Hashable, Sequence
 from typing import Callable, cast
 from dataclasses import dataclass, field
 
@@ -9,6 +12,14 @@ import fantas
 from fantas import RenderCommand, FillMode, AlignMode, Quadrant
 from .style import LabelStyle, TextStyle
 
+try:
+    import numpy
+    from fantas._vendor.pygame import surfarray
+
+    HAS_NUMPY = True  # numpy 为可选依赖，可用时使用向量化方式生成渐变
+except ImportError:
+    HAS_NUMPY = False
+
 __all__ = (
     "SurfaceRenderCommand",
     "ColorFillCommand",
@@ -20,6 +31,66 @@ __all__ = (
 )
 
 
+def is_opaque_color(color: fantas.ColorLike | None) -> bool:
+    """
+    判断颜色是否完全不透明。
+    Args:
+        color (fantas.ColorLike | None): 颜色，None 表示不绘制。
+    Returns:
+        bool: 是否完全不透明。
+    """
+    return color is not None and fantas.Color(color).a == 255
+
+
+def get_tile_blits(
+    surface: fantas.Surface, rect: fantas.Rect, clip: bool = True
+) -> list[fantas.BlitArgs]:
+    """
+    计算用 surface 平铺填满 rect 所需的 blit 参数列表。
+    Args:
+        surface (fantas.Surface): 平铺的 Surface。
+        rect (fantas.Rect): 要填满的矩形区域。
+        clip (bool): 是否裁剪超出 rect 的部分，目标本身会裁剪时可以关闭。
+    Returns:
+        list[fantas.BlitArgs]: blit 参数列表。
+    """
+    # 简化引用
+    left, top, width, height = rect
+    w, h = surface.get_size()
+    if not clip:
+        return [
+            (surface, (x, y))
+            for y in range(top, top + height, h)
+            for x in range(left, left + width, w)
+        ]
+    # 计算重复次数
+    row_count, height_remain = divmod(height, h)
+    col_count, width_remain = divmod(width, w)
+    top_row = top + row_count * h
+    left_col = left + col_count * w
+    blits: list[fantas.BlitArgs] = [
+        (surface, (x, y))
+        for y in range(top, top_row, h)
+        for x in range(left, left_col, w)
+    ]
+    # 剩余部分
+    if height_remain > 0:
+        blits.extend(
+            (surface, (x, top_row), (0, 0, w, height_remain))
+            for x in range(left, left_col, w)
+        )
+    if width_remain > 0:
+        blits.extend(
+            (surface, (left_col, y), (0, 0, width_remain, h))
+            for y in range(top, top_row, h)
+        )
+    if height_remain > 0 and width_remain > 0:
+        blits.append(
+            (surface, (left_col, top_row), (0, 0, width_remain, height_remain))
+        )
+    return blits
+
+
 @dataclass(slots=True)
 class SurfaceRenderCommand(RenderCommand):
     """
@@ -34,7 +105,9 @@ class SurfaceRenderCommand(RenderCommand):
     dest_rect: fantas.Rect = field(init=False)
     fill_mode: fantas.FillMode = field(init=False)
 
-    affected_area: fantas.Rect = field(init=False, repr=False)  # 受影响的矩形区域
+    content_version: int = field(
+        default=0, init=False, repr=False
+    )  # Surface 内容的版本号，mark_dirty() 时增加
 
     def render(self, target_surface: fantas.Surface) -> None:
         """
@@ -42,126 +115,207 @@ class SurfaceRenderCommand(RenderCommand):
         Args:
             target_surface (fantas.Surface): 目标 Surface 对象。
         """
-        surface_render_command_render_map[self.fill_mode](self, target_surface)
+        if self.fill_mode is FillMode.REPEAT:
+            target_surface.blits(self.get_repeat_blits(), doreturn=False)
+        else:
+            target_surface.blit(*surface_render_command_blit_map[self.fill_mode](self))
 
     def hit_test(self, point: fantas.IntPoint) -> bool:
         """
-        命中测试。
+        命中测试，与渲染范围矩形相同，不依赖本帧是否执行过渲染（比如被遮挡剔除）。
         Args:
             point (fantas.IntPoint): 坐标点（x, y）。
         Returns:
             bool: 如果点在区域内则返回 True，否则返回 False。
         """
-        return self.affected_area.collidepoint(point)
+        return self.get_bounding_rect().collidepoint(point)
 
-    def render_ignore(self, target_surface: fantas.Surface) -> None:
+    def get_bounding_rect(self) -> fantas.Rect:
         """
-        执行 IGNORE 填充模式的渲染操作。
-        Args:
-            target_surface (fantas.Surface): 目标 Surface 对象。
+        获取渲染范围矩形。
+        Returns:
+            fantas.Rect: 渲染范围矩形。
         """
-        self.affected_area = target_surface.blit(self.surface, self.dest_rect)
+        if self.fill_mode is FillMode.IGNORE:
+            return self.surface.get_rect(topleft=self.dest_rect.topleft)
+        if self.fill_mode is FillMode.FITMIN:
+            return self.get_fitmin_rect()
+        return fantas.Rect(self.dest_rect)
 
-    def render_scale(self, target_surface: fantas.Surface) -> None:
+    def get_render_key(self) -> object:
         """
-        执行 SCALE 填充模式的渲染操作。
-        Args:
-            target_surface (fantas.Surface): 目标 Surface 对象。
+        获取状态快照，Surface 内容的原地修改需要通过 mark_dirty() 告知。
+        Returns:
+            object: 状态快照。
         """
-        rect = self.affected_area = self.dest_rect
-        target_surface.blit(fantas.transform.scale(self.surface, rect.size), rect)
+        return (
+            self.surface,
+            tuple(self.dest_rect),
+            self.fill_mode,
+            self.content_version,
+        )
 
-    def render_smoothscale(self, target_surface: fantas.Surface) -> None:
+    def get_blits(self) -> Sequence[fantas.BlitArgs]:
         """
-        执行 SMOOTHSCALE 填充模式的渲染操作。
-        Args:
-            target_surface (fantas.Surface): 目标 Surface 对象。
+        所有填充模式都可以表示为 blit 参数序列，合并到 blits 批次中。
+        Returns:
+            Sequence[fantas.BlitArgs]: blit 参数序列。
         """
-        rect = self.affected_area = self.dest_rect
-        target_surface.blit(fantas.transform.smoothscale(self.surface, rect.size), rect)
+        if self.fill_mode is FillMode.REPEAT:
+            return self.get_repeat_blits()
+        return (surface_render_command_blit_map[self.fill_mode](self),)
 
-    def render_repeat(self, target_surface: fantas.Surface) -> None:
+    def is_opaque(self) -> bool:
         """
-        执行 REPEAT 填充模式的渲染操作。
-        Args:
-            target_surface (fantas.Surface): 目标 Surface 对象。
+        Surface 没有透明通道、透明色键和整体透明度时完全覆盖范围矩形。
+        Returns:
+            bool: 是否完全覆盖。
         """
-        # 简化引用
-        rect = self.affected_area = self.dest_rect
         surface = self.surface
-        if isinstance(rect, fantas.FRect):
-            rect = fantas.Rect(rect)
-        left, top, width, height = rect
-        w, h = surface.get_size()
-        # 计算重复次数并绘制
-        row_count, height_remain = divmod(height, h)
-        col_count, width_remain = divmod(width, w)
-        for row in range(row_count):
-            for col in range(col_count):
-                target_surface.blit(surface, (left + col * w, top + row * h))
-        top_row = top + row_count * h
-        left_col = left + col_count * w
-        # 绘制剩余部分
-        if height_remain > 0:
-            for col in range(left, left_col, w):
-                target_surface.blit(surface, (col, top_row), (0, 0, w, height_remain))
-        if width_remain > 0:
-            for row in range(top, top_row, h):
-                target_surface.blit(surface, (left_col, row), (0, 0, width_remain, h))
-        if height_remain > 0 and width_remain > 0:
-            target_surface.blit(
-                surface, (left_col, top_row), (0, 0, width_remain, height_remain)
-            )
+        return (
+            not surface.get_flags() & fantas.SRCALPHA
+            and surface.get_colorkey() is None
+            and surface.get_alpha() in (None, 255)
+        )
+
+    def mark_dirty(self) -> None:
+        """
+        标记 Surface 的内容已被原地修改，移除由它生成的缩放缓存并重绘。
+        """
+        surface = self.surface
+        for key in [key for key in scaled_surface_cache.entries if key[0] is surface]:
+            scaled_surface_cache.pop(key)
+        self.content_version += 1
 
-    def render_fitmin(self, target_surface: fantas.Surface) -> None:
+    def get_scaled_surface(self, size: fantas.IntPoint) -> fantas.Surface:
         """
-        执行 FITMIN 填充模式的渲染操作。
+        获取缩放到指定尺寸的 Surface，优先从缓存中获取。
         Args:
-            target_surface (fantas.Surface): 目标 Surface 对象。
+            size (fantas.IntPoint): 目标尺寸。
+        Returns:
+            fantas.Surface: 缩放后的 Surface。
+        """
+        key = (self.surface, size, self.fill_mode)
+        scaled = scaled_surface_cache.get(key)
+        if scaled is None:
+            if self.fill_mode is FillMode.SCALE:
+                scaled = fantas.transform.scale(self.surface, size)
+            else:
+                scaled = fantas.transform.smoothscale(self.surface, size)
+            scaled_surface_cache.set(key, scaled)
+        return scaled
+
+    def get_fitmin_rect(self) -> fantas.Rect:
+        """
+        计算 FITMIN 填充模式下缩放并居中后的矩形区域。
+        Returns:
+            fantas.Rect: 缩放并居中后的矩形区域。
         """
         # 简化引用
         w, h = self.surface.get_size()
         left, top, width, height = self.dest_rect
         scale = min(width / w, height / h)
-        # 计算缩放后尺寸并居中绘制
+        # 计算缩放后尺寸并居中
         w = round(w * scale)
         h = round(h * scale)
-        self.affected_area = target_surface.blit(
-            fantas.transform.smoothscale(self.surface, (w, h)),
-            (left + (width - w) // 2, top + (height - h) // 2),
-        )
+        return fantas.Rect(left + (width - w) // 2, top + (height - h) // 2, w, h)
 
-    def render_fitmax(self, target_surface: fantas.Surface) -> None:
+    def blit_ignore(self) -> fantas.BlitArgs:
+        """
+        计算 IGNORE 填充模式的 blit 参数。
+        Returns:
+            fantas.BlitArgs: blit 参数。
         """
-        执行 FITMAX 填充模式的渲染操作。
+        rect = self.surface.get_rect(topleft=self.dest_rect.topleft)
+        return (self.surface, rect.topleft)
+
+    def blit_scale(self) -> fantas.BlitArgs:
+        """
+        计算 SCALE 与 SMOOTHSCALE 填充模式的 blit 参数。
+        Returns:
+            fantas.BlitArgs: blit 参数。
+        """
+        rect = fantas.Rect(self.dest_rect)
+        return (self.get_scaled_surface(rect.size), rect.topleft)
+
+    def get_repeat_blits(self) -> Sequence[fantas.BlitArgs]:
+        """
+        计算 REPEAT 填充模式的 blit 参数序列。
+        优先使用预先平铺好的缓存，只需要一次 blit。
+        Returns:
+            Sequence[fantas.BlitArgs]: blit 参数序列。
+        """
+        surface = self.surface
+        rect = fantas.Rect(self.dest_rect)
+        if surface.get_colorkey() is None and surface.get_alpha() in (None, 255):
+            return ((self.get_tiled_surface(rect.size), rect.topleft),)
+        # 带有透明色键或整体透明度的 Surface 无法原样拼接，直接逐块绘制
+        return get_tile_blits(surface, rect)
+
+    def get_tiled_surface(self, size: fantas.IntPoint) -> fantas.Surface:
+        """
+        获取平铺到指定尺寸的 Surface，优先从缓存中获取。
         Args:
-            target_surface (fantas.Surface): 目标 Surface 对象。
+            size (fantas.IntPoint): 目标尺寸。
+        Returns:
+            fantas.Surface: 平铺后的 Surface。
+        """
+        key = (self.surface, size, FillMode.REPEAT)
+        tiled = scaled_surface_cache.get(key)
+        if tiled is None:
+            surface = self.surface
+            flags = surface.get_flags() & fantas.SRCALPHA
+            tiled = fantas.Surface(size, flags)
+            # 超出边界的部分会被自动裁剪；透明通道使用 RGBA_MAX 混合原样复制到全透明的底上
+            tiled.fblits(
+                get_tile_blits(surface, fantas.Rect((0, 0), size), False),
+                fantas.BLEND_RGBA_MAX if flags else 0,
+            )
+            scaled_surface_cache.set(key, tiled)
+        return tiled
+
+    def blit_fitmin(self) -> fantas.BlitArgs:
+        """
+        计算 FITMIN 填充模式的 blit 参数。
+        Returns:
+            fantas.BlitArgs: blit 参数。
+        """
+        rect = self.get_fitmin_rect()
+        return (self.get_scaled_surface(rect.size), rect.topleft)
+
+    def blit_fitmax(self) -> fantas.BlitArgs:
+        """
+        计算 FITMAX 填充模式的 blit 参数。
+        Returns:
+            fantas.BlitArgs: blit 参数。
         """
         # 简化引用
         w, h = self.surface.get_size()
-        left, top, width, height = self.affected_area = self.dest_rect
+        rect = fantas.Rect(self.dest_rect)
+        left, top, width, height = rect
         scale = max(width / w, height / h)
-        # 计算缩放后尺寸并居中绘制
+        # 计算缩放后尺寸并居中裁剪
         w = round(w * scale)
         h = round(h * scale)
-        scaled_surface = fantas.transform.smoothscale(self.surface, (w, h))
-        target_surface.blit(
-            scaled_surface,
+        return (
+            self.get_scaled_surface((w, h)),
             (left, top),
             ((w - width) // 2, (h - height) // 2, width, height),
         )
 
 
-# SurfaceRenderCommand 渲染映射表
-surface_render_command_render_map: dict[
-    FillMode, Callable[[SurfaceRenderCommand, fantas.Surface], None]
+# 缩放与平铺结果缓存，键为 (源 Surface, 目标尺寸, 填充模式)
+scaled_surface_cache: fantas.SurfaceCache = fantas.SurfaceCache()
+
+# SurfaceRenderCommand blit 参数映射表，REPEAT 填充模式可能需要多次 blit，单独处理
+surface_render_command_blit_map: dict[
+    FillMode, Callable[[SurfaceRenderCommand], fantas.BlitArgs]
 ] = {
-    FillMode.IGNORE: SurfaceRenderCommand.render_ignore,
-    FillMode.SCALE: SurfaceRenderCommand.render_scale,
-    FillMode.SMOOTHSCALE: SurfaceRenderCommand.render_smoothscale,
-    FillMode.REPEAT: SurfaceRenderCommand.render_repeat,
-    FillMode.FITMIN: SurfaceRenderCommand.render_fitmin,
-    FillMode.FITMAX: SurfaceRenderCommand.render_fitmax,
+    FillMode.IGNORE: SurfaceRenderCommand.blit_ignore,
+    FillMode.SCALE: SurfaceRenderCommand.blit_scale,
+    FillMode.SMOOTHSCALE: SurfaceRenderCommand.blit_scale,
+    FillMode.FITMIN: SurfaceRenderCommand.blit_fitmin,
+    FillMode.FITMAX: SurfaceRenderCommand.blit_fitmax,
 }
 
 
@@ -196,6 +350,34 @@ class ColorFillCommand(RenderCommand):
         """
         return self.dest_rect.collidepoint(point)
 
+    def get_bounding_rect(self) -> fantas.Rect:
+        """
+        获取渲染范围矩形。
+        Returns:
+            fantas.Rect: 渲染范围矩形。
+        """
+        return fantas.Rect(self.dest_rect)
+
+    def get_render_key(self) -> object:
+        """
+        获取状态快照。
+        Returns:
+            object: 状态快照。
+        """
+        return (
+            tuple(self.dest_rect),
+            fantas.get_color_key(self.color),
+            self.blend_flag,
+        )
+
+    def is_opaque(self) -> bool:
+        """
+        不使用混合模式时，填充会直接覆盖范围矩形内原有的像素。
+        Returns:
+            bool: 是否完全覆盖。
+        """
+        return self.blend_flag == 0
+
 
 @dataclass(slots=True)
 class ColorBackgroundFillCommand(RenderCommand):
@@ -225,6 +407,42 @@ class ColorBackgroundFillCommand(RenderCommand):
         """
         return True
 
+    def get_render_key(self) -> object:
+        """
+        获取状态快照。
+        Returns:
+            object: 状态快照。
+        """
+        return fantas.get_color_key(self.color)
+
+    def is_opaque(self) -> bool:
+        """
+        填充会直接覆盖整个目标 Surface。
+        Returns:
+            bool: 始终返回 True。
+        """
+        return True
+
+
+def has_round_corner(style: LabelStyle) -> bool:
+    """
+    判断标签样式是否带有圆角。
+    Args:
+        style (LabelStyle): 标签样式。
+    Returns:
+        bool: 是否带有圆角。
+    """
+    return (
+        max(
+            style.border_radius,
+            style.border_radius_top_left,
+            style.border_radius_top_right,
+            style.border_radius_bottom_left,
+            style.border_radius_bottom_right,
+        )
+        > 0
+    )
+
 
 @dataclass(slots=True)
 class LabelRenderCommand(RenderCommand):
@@ -244,8 +462,20 @@ class LabelRenderCommand(RenderCommand):
         Args:
             target_surface (fantas.Surface): 目标 Surface 对象。
         """
+        blits = self.get_blits()
+        if blits is None:
+            self.draw(target_surface, self.rect)
+        else:
+            target_surface.blit(*blits[0])
+
+    def draw(self, target_surface: fantas.Surface, rect: fantas.Rect) -> None:
+        """
+        直接在目标 Surface 上绘制标签。
+        Args:
+            target_surface (fantas.Surface): 目标 Surface 对象。
+            rect (fantas.Rect): 绘制区域。
+        """
         s = self.style
-        rect = self.rect
         bw = s.border_width
         if bw > 0:
             fantas.draw.aarect(
@@ -298,6 +528,65 @@ class LabelRenderCommand(RenderCommand):
         """
         return self.rect.collidepoint(point)
 
+    def get_bounding_rect(self) -> fantas.Rect:
+        """
+        获取渲染范围矩形。
+        Returns:
+            fantas.Rect: 渲染范围矩形。
+        """
+        return self.rect.copy()
+
+    def get_render_key(self) -> object:
+        """
+        获取状态快照。
+        Returns:
+            object: 状态快照。
+        """
+        return (tuple(self.rect), self.style.get_key())
+
+    def get_blits(self) -> tuple[fantas.BlitArgs, ...] | None:
+        """
+        带边框或圆角的标签使用共享的栅格缓存，只需要一次 blit。
+        Returns:
+            tuple | None: blit 参数序列，纯色直角标签直接填充更快，返回 None。
+        """
+        s = self.style
+        if s.border_width <= 0 and not has_round_corner(s):
+            return None
+        return ((self.get_raster(), self.rect.topleft),)
+
+    def get_raster(self) -> fantas.Surface:
+        """
+        获取标签的栅格化结果，尺寸与样式相同的标签共享同一个缓存。
+        Returns:
+            fantas.Surface: 带透明通道的栅格化结果。
+        """
+        size = self.rect.size
+        key = (size, self.style.get_key())
+        raster = label_surface_cache.get(key)
+        if raster is None:
+            raster = fantas.Surface(size, fantas.SRCALPHA)
+            self.draw(raster, raster.get_rect())
+            label_surface_cache.set(key, raster)
+        return raster
+
+    def is_opaque(self) -> bool:
+        """
+        直角、背景不透明且边框不透明（或没有边框）时完全覆盖范围矩形。
+        Returns:
+            bool: 是否完全覆盖。
+        """
+        s = self.style
+        return (
+            not has_round_corner(s)
+            and is_opaque_color(s.bgcolor)
+            and (s.border_width <= 0 or is_opaque_color(s.fgcolor))
+        )
+
+
+# 标签栅格化结果缓存，键为 (尺寸, 标签样式)
+label_surface_cache: fantas.SurfaceCache = fantas.SurfaceCache()
+
 
 @dataclass(slots=True)
 class TextRenderCommand(RenderCommand):
@@ -319,6 +608,9 @@ class TextRenderCommand(RenderCommand):
     affected_rects: list[fantas.Rect] = field(
         default_factory=list, init=False, repr=False
     )  # 受影响的矩形区域列表
+    cache_key: tuple[object, ...] | None = field(
+        default=None, init=False, repr=False
+    )  # 上次使用的文本块缓存键
 
     def render(self, target_surface: fantas.Surface) -> None:
         """
@@ -330,21 +622,105 @@ class TextRenderCommand(RenderCommand):
         if not self.text:
             return
         # 执行渲染
-        text_render_command_render_map[self.align_mode](self, target_surface)
+        target_surface.blit(*self.get_blits()[0])
+
+    def get_blits(self) -> tuple[fantas.BlitArgs, ...]:
+        """
+        文本块会被栅格化并缓存，只需要一次 blit，可以合并到 blits 批次中。
+        Returns:
+            tuple: blit 参数序列。
+        """
+        if not self.text:
+            return ()
+        bounding = self.get_bounding_rect()
+        raster, rects = self.get_raster(bounding)
+        # 把相对于文本块的受影响矩形转换到目标坐标
+        self.affected_rects = [rect.move(bounding.topleft) for rect in rects]
+        return ((raster, bounding.topleft),)
+
+    def get_raster(
+        self, bounding: fantas.Rect
+    ) -> tuple[fantas.Surface, tuple[fantas.Rect, ...]]:
+        """
+        获取文本块的栅格化结果，内容、样式、尺寸、对齐与偏移都相同的文本块共享同一个缓存。
+        Args:
+            bounding (fantas.Rect): 文本块的渲染范围矩形。
+        Returns:
+            tuple: (带透明通道的栅格化结果, 相对于文本块的受影响矩形)。
+        """
+        key = self.cache_key = (
+            self.text,
+            self.style.get_key(),
+            self.rect.size,
+            self.align_mode,
+            tuple(self.offset),
+        )
+        entry = text_surface_cache.get_entry(key)
+        if entry is not None:
+            return cast(tuple[fantas.Surface, tuple[fantas.Rect, ...]], entry)
+        # 把渲染区域临时移动到文本块内部，直接渲染到全透明的栅格上
+        # 部分可见的行使用 RGBA_MAX 混合原样复制，避免与透明底混合导致边缘变暗
+        raster = fantas.Surface(bounding.size, fantas.SRCALPHA)
+        rect = self.rect
+        self.rect = rect.move(-bounding.left, -bounding.top)
+        try:
+            text_render_command_render_map[self.align_mode](self, raster)
+        finally:
+            self.rect = rect
+        rects = tuple(self.affected_rects)
+        text_surface_cache.set(key, raster, rects)
+        return raster, rects
+
+    def mark_dirty(self) -> None:
+        """
+        移除上次使用的文本块缓存，下次渲染时重新栅格化，比如字体文件被替换之后。
+        """
+        if self.cache_key is not None:
+            text_surface_cache.pop(self.cache_key)
+            self.cache_key = None
 
     def hit_test(self, point: fantas.IntPoint) -> bool:
         """
-        命中测试。
+        命中测试，受影响的矩形取自文本块缓存，不依赖本帧是否执行过渲染（比如被遮挡剔除）。
         Args:
             point (fantas.IntPoint): 坐标点（x, y）。
         Returns:
             bool: 如果点在区域内则返回 True，否则返回 False。
         """
-        for rect in self.affected_rects:
-            if rect.collidepoint(point):
+        if not self.text:
+            return False
+        bounding = self.get_bounding_rect()
+        if not bounding.collidepoint(point):
+            return False
+        _, rects = self.get_raster(bounding)
+        x, y = point[0] - bounding.left, point[1] - bounding.top
+        for rect in rects:
+            if rect.collidepoint(x, y):
                 return True
         return False
 
+    def get_bounding_rect(self) -> fantas.Rect:
+        """
+        获取渲染范围矩形，完全可见的行会在水平方向上随偏移量超出 rect。
+        Returns:
+            fantas.Rect: 渲染范围矩形。
+        """
+        return self.rect.union(self.rect.move(self.offset[0], 0))
+
+    def get_render_key(self) -> object:
+        """
+        获取状态快照。
+        Returns:
+            object: 状态快照。
+        """
+        return (
+            self.text,
+            self.align_mode,
+            self.style.get_key(),
+            tuple(self.rect),
+            tuple(self.offset),
+        )
+
     def render_left(self, target_surface: fantas.Surface) -> None:
         """
         左对齐渲染。
@@ -394,11 +770,13 @@ class TextRenderCommand(RenderCommand):
                 sf, rt = font.render(text, s.fgcolor, style=s.style_flag, size=size)
                 rt.topleft = (origin_x - rt.left, origin_y - rt.top)
                 r = rt.clip(rect)
-                ar_append(
-                    target_surface.blit(
-                        sf, r.topleft, (0, r.top - rt.top, r.width, r.height)
-                    )
+                target_surface.blit(
+                    sf,
+                    r.topleft,
+                    (0, r.top - rt.top, r.width, r.height),
+                    fantas.BLEND_RGBA_MAX,
                 )
+                ar_append(r)
             origin_y += line_height
 
     def render_center(self, target_surface: fantas.Surface) -> None:
@@ -453,11 +831,13 @@ class TextRenderCommand(RenderCommand):
                     origin_y - rt.top,
                 )
                 r = rt.clip(rect)
-                ar_append(
-                    target_surface.blit(
-                        sf, r.topleft, (0, r.top - rt.top, r.width, r.height)
-                    )
+                target_surface.blit(
+                    sf,
+                    r.topleft,
+                    (0, r.top - rt.top, r.width, r.height),
+                    fantas.BLEND_RGBA_MAX,
                 )
+                ar_append(r)
             origin_y += line_height
 
     def render_right(self, target_surface: fantas.Surface) -> None:
@@ -512,11 +892,13 @@ class TextRenderCommand(RenderCommand):
                     origin_y - rt.top,
                 )
                 r = rt.clip(rect)
-                ar_append(
-                    target_surface.blit(
-                        sf, r.topleft, (0, r.top - rt.top, r.width, r.height)
-                    )
+                target_surface.blit(
+                    sf,
+                    r.topleft,
+                    (0, r.top - rt.top, r.width, r.height),
+                    fantas.BLEND_RGBA_MAX,
                 )
+                ar_append(r)
             origin_y += line_height
 
     def render_top(self, target_surface: fantas.Surface) -> None:
@@ -566,11 +948,13 @@ class TextRenderCommand(RenderCommand):
                     origin_y - rt.top,
                 )
                 r = rt.clip(rect)
-                ar_append(
-                    target_surface.blit(
-                        sf, r.topleft, (0, r.top - rt.top, r.width, r.height)
-                    )
+                target_surface.blit(
+                    sf,
+                    r.topleft,
+                    (0, r.top - rt.top, r.width, r.height),
+                    fantas.BLEND_RGBA_MAX,
                 )
+                ar_append(r)
             origin_y += line_height
 
     def render_bottom(self, target_surface: fantas.Surface) -> None:
@@ -626,11 +1010,13 @@ class TextRenderCommand(RenderCommand):
                     origin_y - rt.top,
                 )
                 r = rt.clip(rect)
-                ar_append(
-                    target_surface.blit(
-                        sf, r.topleft, (0, r.top - rt.top, r.width, r.height)
-                    )
+                target_surface.blit(
+                    sf,
+                    r.topleft,
+                    (0, r.top - rt.top, r.width, r.height),
+                    fantas.BLEND_RGBA_MAX,
                 )
+                ar_append(r)
             origin_y += line_height
 
     def render_topleft(self, target_surface: fantas.Surface) -> None:
@@ -677,11 +1063,13 @@ class TextRenderCommand(RenderCommand):
                 sf, rt = font.render(text, s.fgcolor, style=s.style_flag, size=size)
                 rt.topleft = (origin_x - rt.left, origin_y - rt.top)
                 r = rt.clip(rect)
-                ar_append(
-                    target_surface.blit(
-                        sf, r.topleft, (0, r.top - rt.top, r.width, r.height)
-                    )
+                target_surface.blit(
+                    sf,
+                    r.topleft,
+                    (0, r.top - rt.top, r.width, r.height),
+                    fantas.BLEND_RGBA_MAX,
                 )
+                ar_append(r)
             origin_y += line_height
 
     def render_topright(self, target_surface: fantas.Surface) -> None:
@@ -732,11 +1120,13 @@ class TextRenderCommand(RenderCommand):
                     origin_y - rt.top,
                 )
                 r = rt.clip(rect)
-                ar_append(
-                    target_surface.blit(
-                        sf, r.topleft, (0, r.top - rt.top, r.width, r.height)
-                    )
+                target_surface.blit(
+                    sf,
+                    r.topleft,
+                    (0, r.top - rt.top, r.width, r.height),
+                    fantas.BLEND_RGBA_MAX,
                 )
+                ar_append(r)
             origin_y += line_height
 
     def render_bottomleft(self, target_surface: fantas.Surface) -> None:
@@ -789,11 +1179,13 @@ class TextRenderCommand(RenderCommand):
                 sf, rt = font.render(text, s.fgcolor, style=s.style_flag, size=size)
                 rt.topleft = (origin_x - rt.left, origin_y - rt.top)
                 r = rt.clip(rect)
-                ar_append(
-                    target_surface.blit(
-                        sf, r.topleft, (0, r.top - rt.top, r.width, r.height)
-                    )
+                target_surface.blit(
+                    sf,
+                    r.topleft,
+                    (0, r.top - rt.top, r.width, r.height),
+                    fantas.BLEND_RGBA_MAX,
                 )
+                ar_append(r)
             origin_y += line_height
 
     def render_bottomright(self, target_surface: fantas.Surface) -> None:
@@ -849,14 +1241,20 @@ class TextRenderCommand(RenderCommand):
                     origin_y - rt.top,
                 )
                 r = rt.clip(rect)
-                ar_append(
-                    target_surface.blit(
-                        sf, r.topleft, (0, r.top - rt.top, r.width, r.height)
-                    )
+                target_surface.blit(
+                    sf,
+                    r.topleft,
+                    (0, r.top - rt.top, r.width, r.height),
+                    fantas.BLEND_RGBA_MAX,
                 )
+                ar_append(r)
             origin_y += line_height
 
 
+# 文本块栅格化结果缓存，键为 (文本, 文本样式, 尺寸, 对齐模式, 偏移位置)
+# 长列表等界面同时显示的文本块很多，只按总字节数限制，否则每帧都会淘汰全部条目
+text_surface_cache: fantas.SurfaceCache = fantas.SurfaceCache(max_entries=65536)
+
 # TextRenderCommand 渲染映射表
 text_render_command_render_map: dict[
     AlignMode, Callable[[TextRenderCommand, fantas.Surface], None]
@@ -931,11 +1329,36 @@ class QuarterCircleRenderCommand(RenderCommand):
         # 距离测试
         return self.radius * self.radius >= dx * dx + dy * dy >= self.width * self.width
 
+    def get_bounding_rect(self) -> fantas.Rect:
+        """
+        获取渲染范围矩形，即完整圆的外接正方形。
+        Returns:
+            fantas.Rect: 渲染范围矩形。
+        """
+        r = int(self.radius) + 1
+        x, y = self.center
+        return fantas.Rect(int(x) - r, int(y) - r, 2 * r + 1, 2 * r + 1)
 
-@dataclass(slots=True)
+    def get_render_key(self) -> object:
+        """
+        获取状态快照。
+        Returns:
+            object: 状态快照。
+        """
+        return (
+            fantas.get_color_key(self.color),
+            tuple(self.center),
+            self.radius,
+            self.width,
+            self.quadrant,
+        )
+
+
+@dataclass(slots=True, weakref_slot=True)
 class LinearGradientRenderCommand(RenderCommand):
     """
     线性渐变渲染命令类。
+    相同尺寸、颜色与相对方向的渐变共享 gradient_surface_cache 中的同一个缓存表面。
     Args:
         rect       : 渲染区域。
         start_color: 起始颜色。
@@ -954,7 +1377,12 @@ class LinearGradientRenderCommand(RenderCommand):
     surface_cache: fantas.Surface = field(
         default=None, init=False, repr=False
     )  # type: ignore[assignment]  # 表面缓存
-    last_pix: int = field(default=0, init=False, repr=False)  # 上次渲染的坐标
+    cache_key: Hashable | None = field(
+        default=None, init=False, repr=False
+    )  # 当前引用的共享缓存键
+    cache_finalizer: weakref.finalize | None = field(
+        default=None, init=False, repr=False
+    )  # 释放共享缓存引用的终结器，命令被回收时也会自动调用
 
     def render(self, target_surface: fantas.Surface) -> None:
         """
@@ -962,33 +1390,90 @@ class LinearGradientRenderCommand(RenderCommand):
         Args:
             target_surface (fantas.Surface): 目标 Surface 对象。
         """
-        start_color = cast(fantas.Color, self.start_color)
-        end_color = cast(fantas.Color, self.end_color)
         # 检查缓存是否脏
         if self.cache_dirty:
-            # 重新生成缓存
             self.cache_dirty = False
-            if (
-                self.surface_cache is None
-                or self.surface_cache.get_size() != self.rect.size
-            ):
-                if start_color.a == 255 and end_color.a == 255:
-                    self.surface_cache = fantas.Surface(self.rect.size)
-                else:
-                    self.surface_cache = fantas.Surface(
-                        self.rect.size, flags=fantas.SRCALPHA
-                    )
             if not isinstance(self.start_pos, fantas.Vector2):
                 self.start_pos = fantas.Vector2(self.start_pos)
             if not isinstance(self.end_pos, fantas.Vector2):
                 self.end_pos = fantas.Vector2(self.end_pos)
+            key = self.get_cache_key()
+            if key != self.cache_key:
+                self.release_cache()
+                self.acquire_cache(key)
+        # 绘制缓存到目标表面
+        target_surface.blit(self.surface_cache, self.rect)
+
+    def get_cache_key(self) -> Hashable:
+        """
+        获取共享缓存键，起止位置使用相对于渲染区域左上角的坐标。
+        Returns:
+            Hashable: 缓存键。
+        """
+        topleft = self.rect.topleft
+        return (
+            self.rect.size,
+            fantas.get_color_key(self.start_color),
+            fantas.get_color_key(self.end_color),
+            tuple(self.start_pos - topleft),
+            tuple(self.end_pos - topleft),
+        )
+
+    def acquire_cache(self, key: Hashable) -> None:
+        """
+        从共享缓存中获取渐变表面，未命中时生成并放入缓存。
+        Args:
+            key (Hashable): 缓存键。
+        """
+        surface = gradient_surface_cache.acquire(key)
+        if surface is None:
+            if self.is_opaque():
+                self.surface_cache = fantas.Surface(self.rect.size)
+            else:
+                self.surface_cache = fantas.Surface(
+                    self.rect.size, flags=fantas.SRCALPHA
+                )
             # 选择渲染方法
             linear_gradient_render_command_render_map[
                 ((self.start_pos.y == self.end_pos.y) << 1)
                 | (self.start_pos.x == self.end_pos.x)
             ](self)
-        # 绘制缓存到目标表面
-        target_surface.blit(self.surface_cache, self.rect)
+            gradient_surface_cache.set(key, self.surface_cache)
+            # 超出缓存上限时不会被缓存，此时由命令自己持有表面
+            if gradient_surface_cache.acquire(key) is None:
+                return
+        else:
+            self.surface_cache = surface
+        self.cache_key = key
+        self.cache_finalizer = weakref.finalize(
+            self, gradient_surface_cache.release, key
+        )
+
+    def release_cache(self) -> None:
+        """
+        释放对共享缓存的引用，缓存表面本身保留在缓存中等待复用或淘汰。
+        """
+        if self.cache_finalizer is not None:
+            self.cache_finalizer()
+            self.cache_finalizer = None
+        self.cache_key = None
+
+    def mark_dirty(self) -> None:
+        """
+        标记缓存为脏，只释放共享缓存引用，下一次渲染时按新的缓存键重新获取。
+        """
+        self.release_cache()
+        self.cache_dirty = True
+
+    def get_blits(self) -> tuple[tuple[fantas.Surface, fantas.IntPoint], ...] | None:
+        """
+        缓存已生成完毕时只需要一次 blit，可以合并到 blits 批次中。
+        Returns:
+            tuple | None: blit 参数序列，缓存需要重新生成时返回 None。
+        """
+        if self.cache_dirty:
+            return None
+        return ((self.surface_cache, self.rect.topleft),)
 
     def hit_test(self, point: fantas.IntPoint) -> bool:
         """
@@ -1000,80 +1485,194 @@ class LinearGradientRenderCommand(RenderCommand):
         """
         return self.rect.collidepoint(point)
 
+    def get_bounding_rect(self) -> fantas.Rect:
+        """
+        获取渲染范围矩形。
+        Returns:
+            fantas.Rect: 渲染范围矩形。
+        """
+        return self.rect.copy()
+
+    def get_render_key(self) -> object:
+        """
+        获取状态快照，缓存未生成完毕时每一帧都视为发生了变化。
+        Returns:
+            object: 状态快照。
+        """
+        if self.cache_dirty:
+            return None
+        return (
+            tuple(self.rect),
+            fantas.get_color_key(self.start_color),
+            fantas.get_color_key(self.end_color),
+            tuple(self.start_pos),
+            tuple(self.end_pos),
+        )
+
+    def is_opaque(self) -> bool:
+        """
+        起始颜色与结束颜色都不透明时完全覆盖范围矩形。
+        Returns:
+            bool: 是否完全覆盖。
+        """
+        return is_opaque_color(self.start_color) and is_opaque_color(self.end_color)
+
     def render_horizontal(self) -> None:
         """
-        执行水平线性渐变渲染操作。
+        执行水平线性渐变渲染操作，将一维色带拉伸到整个区域。
         """
-        start_color = cast(fantas.Color, self.start_color)
-        end_color = cast(fantas.Color, self.end_color)
-        left_x = self.rect.left - self.start_pos.x
         x2_x1 = self.end_pos.x - self.start_pos.x
-        with fantas.PixelArray(self.surface_cache) as pix:
-            for x in range(self.rect.width):
-                col = start_color.lerp(
-                    end_color, fantas.math.clamp((x + left_x) / x2_x1, 0, 1)
-                )
-                pix[x, :] = col  # type: ignore[index]
+        strip = create_gradient_strip(
+            (self.rect.width, 1),
+            self.start_color,
+            self.end_color,
+            (self.rect.left - self.start_pos.x) / x2_x1,
+            1 / x2_x1,
+            self.surface_cache.get_flags() & fantas.SRCALPHA,
+        )
+        fantas.transform.scale(strip, self.rect.size, self.surface_cache)
 
     def render_vertical(self) -> None:
         """
-        执行垂直线性渐变渲染操作。
+        执行垂直线性渐变渲染操作，将一维色带拉伸到整个区域。
         """
-        start_color = cast(fantas.Color, self.start_color)
-        end_color = cast(fantas.Color, self.end_color)
-        top_y = self.rect.top - self.start_pos.y
         y2_y1 = self.end_pos.y - self.start_pos.y
-        with fantas.PixelArray(self.surface_cache) as pix:
-            for y in range(self.rect.height):
-                col = start_color.lerp(
-                    end_color, fantas.math.clamp((y + top_y) / y2_y1, 0, 1)
-                )
-                pix[:, y] = col  # type: ignore[index]
+        strip = create_gradient_strip(
+            (1, self.rect.height),
+            self.start_color,
+            self.end_color,
+            (self.rect.top - self.start_pos.y) / y2_y1,
+            1 / y2_y1,
+            self.surface_cache.get_flags() & fantas.SRCALPHA,
+        )
+        fantas.transform.scale(strip, self.rect.size, self.surface_cache)
 
     def render_any_angle(self) -> None:
         """
         执行任意角度线性渐变渲染操作。
+        numpy 可用时一次性计算所有像素，否则将一维色带逐行（或逐列）错位绘制。
         """
-        start_color = cast(fantas.Color, self.start_color)
-        end_color = cast(fantas.Color, self.end_color)
-        # 分步绘制时间点
-        t = fantas.get_time_ns()
-        # 计算xy方向的步长
+        if HAS_NUMPY:
+            self.render_any_angle_numpy()
+            return
+        # 简化引用
+        surface = self.surface_cache
+        flags = surface.get_flags() & fantas.SRCALPHA
+        width, height = self.rect.size
         v: fantas.Vector2 = self.end_pos - self.start_pos
-        v_length = v.length()
-        x_step = fantas.Vector2(1, 0).dot(v) / v_length
-        y_step = fantas.Vector2(0, 1).dot(v) / v_length
-        # 执行渲染
-        with fantas.PixelArray(self.surface_cache) as pix:
-            for x in range(self.last_pix, self.rect.width):
-                for y in range(self.rect.height):
-                    pix[x, y] = start_color.lerp(  # type: ignore[index]
-                        end_color,
-                        fantas.math.clamp(
-                            (
-                                (x + self.rect.left - self.start_pos.x) * x_step
-                                + (y + self.rect.top - self.start_pos.y) * y_step
-                            )
-                            / v_length,
-                            0,
-                            1,
-                        ),
-                    )
-                    # 单次绘制时间超过 10 毫秒，则标记缓存为脏并记录当前位置，退出绘制
-                    if fantas.get_time_ns() - t > 10_000_000:
-                        self.cache_dirty = True
-                        self.last_pix = x
-                        return
-        self.last_pix = 0
+        v_length_2 = v.length_squared()
+        x0 = self.rect.left - self.start_pos.x
+        y0 = self.rect.top - self.start_pos.y
+        # 插值比例 t = (x * v.x + y * v.y) / |v|²，沿主方向展开为一维色带，
+        # 每行（列）的色带只相差一个偏移量，错位不超过 0.5 像素
+        if abs(v.x) >= abs(v.y):
+            k = v.y / v.x
+            s_min = x0 + min(y0 * k, (y0 + height - 1) * k)
+            strip = create_gradient_strip(
+                (width + math.ceil(abs(k) * (height - 1)) + 1, 1),
+                self.start_color,
+                self.end_color,
+                s_min * v.x / v_length_2,
+                v.x / v_length_2,
+                flags,
+            )
+            blits = [
+                (strip, (-round(x0 + (y0 + y) * k - s_min), y)) for y in range(height)
+            ]
+        else:
+            k = v.x / v.y
+            s_min = y0 + min(x0 * k, (x0 + width - 1) * k)
+            strip = create_gradient_strip(
+                (1, height + math.ceil(abs(k) * (width - 1)) + 1),
+                self.start_color,
+                self.end_color,
+                s_min * v.y / v_length_2,
+                v.y / v_length_2,
+                flags,
+            )
+            blits = [
+                (strip, (x, -round(y0 + (x0 + x) * k - s_min))) for x in range(width)
+            ]
+        if flags:
+            # 透明表面需要直接写入颜色值而不是混合
+            surface.fill((0, 0, 0, 0))
+            surface.fblits(blits, fantas.BLEND_RGBA_MAX)
+        else:
+            surface.fblits(blits)
+
+    def render_any_angle_numpy(self) -> None:
+        """
+        使用 numpy 一次性计算任意角度线性渐变的所有像素。
+        """
+        # 简化引用
+        surface = self.surface_cache
+        width, height = self.rect.size
+        v: fantas.Vector2 = self.end_pos - self.start_pos
+        v_length_2 = v.length_squared()
+        # 计算每个像素的插值比例，形状为 (width, height, 1)
+        xs = (numpy.arange(width) + self.rect.left - self.start_pos.x) * (
+            v.x / v_length_2
+        )
+        ys = (numpy.arange(height) + self.rect.top - self.start_pos.y) * (
+            v.y / v_length_2
+        )
+        t = numpy.clip(numpy.add.outer(xs, ys), 0, 1)[..., None]
+        # 插值计算颜色
+        start_color = numpy.array(fantas.Color(self.start_color), dtype=numpy.float64)
+        end_color = numpy.array(fantas.Color(self.end_color), dtype=numpy.float64)
+        colors = numpy.rint(start_color + (end_color - start_color) * t).astype(
+            numpy.uint8
+        )
+        # 写入像素，像素数组会锁定表面，用完立即释放
+        pixels = surfarray.pixels3d(surface)
+        pixels[...] = colors[..., :3]
+        del pixels
+        if surface.get_flags() & fantas.SRCALPHA:
+            alpha = surfarray.pixels_alpha(surface)
+            alpha[...] = colors[..., 3]
+            del alpha
 
     def render_coinside(self) -> None:
         """
         执行起点和终点重合的线性渐变渲染操作。
         """
-        start_color = cast(fantas.Color, self.start_color)
-        end_color = cast(fantas.Color, self.end_color)
-        self.surface_cache.fill(start_color.lerp(end_color, 0.5), self.rect)
+        start_color = fantas.Color(self.start_color)
+        self.surface_cache.fill(start_color.lerp(self.end_color, 0.5))
+
 
+def create_gradient_strip(
+    size: fantas.IntPoint,
+    start_color: fantas.ColorLike,
+    end_color: fantas.ColorLike,
+    t0: float,
+    dt: float,
+    flags: int = 0,
+) -> fantas.Surface:
+    """
+    创建一条宽或高为 1 的渐变色带，第 i 个像素的插值比例为 clamp(t0 + i * dt, 0, 1)。
+    Args:
+        size (fantas.IntPoint): 色带尺寸，宽或高必须为 1。
+        start_color (fantas.ColorLike): 起始颜色。
+        end_color (fantas.ColorLike): 结束颜色。
+        t0 (float): 第一个像素的插值比例。
+        dt (float): 相邻像素插值比例的差值。
+        flags (int): 创建 Surface 的标志。
+    Returns:
+        fantas.Surface: 渐变色带。
+    """
+    strip = fantas.Surface(size, flags)
+    start_color = fantas.Color(start_color)
+    clamp = fantas.math.clamp
+    if size[1] == 1:
+        for i in range(size[0]):
+            strip.set_at((i, 0), start_color.lerp(end_color, clamp(t0 + i * dt, 0, 1)))
+    else:
+        for i in range(size[1]):
+            strip.set_at((0, i), start_color.lerp(end_color, clamp(t0 + i * dt, 0, 1)))
+    return strip
+
+
+gradient_surface_cache: fantas.SurfaceCache = fantas.SurfaceCache()
 
 linear_gradient_render_command_render_map: dict[
     int, Callable[[LinearGradientRenderCommand], None]
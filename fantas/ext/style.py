@@ -38,6 +38,16 @@ class TextStyle:
         """创建并返回当前 TextStyle 实例的副本"""
         return copy(self)
 
+    def get_key(self) -> tuple[object, ...]:
+        """获取由样式字段组成的可哈希元组，可用作缓存键或状态快照"""
+        return (
+            self.font,
+            self.size,
+            fantas.get_color_key(self.fgcolor),
+            self.style_flag,
+            self.line_spacing,
+        )
+
     def get_lineheight(self) -> float:
         """获取文本行高（包含行间距）"""
         return self.font.get_sized_height(self.size) + self.line_spacing
@@ -80,5 +90,18 @@ class LabelStyle:
         """创建并返回当前 LabelStyle 实例的副本"""
         return copy(self)
 
+    def get_key(self) -> tuple[object, ...]:
+        """获取由样式字段组成的可哈希元组，可用作缓存键或状态快照"""
+        return (
+            fantas.get_color_key(self.bgcolor),
+            fantas.get_color_key(self.fgcolor),
+            self.border_width,
+            self.border_radius,
+            self.border_radius_top_left,
+            self.border_radius_top_right,
+            self.border_radius_bottom_left,
+            self.border_radius_bottom_right,
+        )
+
 
 DEFAULTLABELSTYLE: LabelStyle = LabelStyle()  # 默认 Label 样式
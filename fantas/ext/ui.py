@@ -157,6 +157,10 @@ class Image(UI):
         # 生成子元素的渲染命令
         yield from UI.create_render_commands(self, c.dest_rect.topleft)
 
+    def mark_dirty(self) -> None:
+        """标记 Surface 的内容已被原地修改，清除缩放缓存并重绘"""
+        self.command.mark_dirty()
+
 
 @dataclass(slots=True)
 class Text(UI):
@@ -217,6 +221,10 @@ class Text(UI):
         # 生成渲染命令
         yield rc
 
+    def mark_dirty(self) -> None:
+        """清除文本块缓存，下次渲染时重新栅格化"""
+        self.command.mark_dirty()
+
     def _get_lineheight(self) -> int:
         """获取文本行高（包含行间距）"""
         return (
@@ -307,6 +315,10 @@ class TextLabel(UI):
         # 生成子元素的渲染命令
         yield from UI.create_render_commands(self, offset)
 
+    def mark_dirty(self) -> None:
+        """清除文本块缓存，下次渲染时重新栅格化"""
+        self.text_command.mark_dirty()
+
 
 @dataclass(slots=True)
 class LinearGradientLabel(UI):
@@ -365,9 +377,8 @@ class LinearGradientLabel(UI):
         yield from UI.create_render_commands(self, offset)
 
     def mark_dirty(self) -> None:
-        """标记渲染缓存为脏"""
-        self.command.cache_dirty = True
-        self.command.last_pix = 0
+        """标记渲染缓存为脏，只释放对共享渐变缓存的引用"""
+        self.command.mark_dirty()
 
 
 @dataclass(slots=True)
@@ -448,6 +459,7 @@ class Animation(UI):
                         self.current_frame_index = len(self.animation_helper.frames) - 1
                         # 停止动画播放
                         self.started = False
+                        self.set_animating(False)
                         break
         # 设置渲染命令属性
         c.surface = self.animation_helper.frames[self.current_frame_index]
@@ -458,14 +470,24 @@ class Animation(UI):
         # 生成子元素的渲染命令
         yield from UI.create_render_commands(self, offset)
 
+    def is_retainable(self) -> bool:
+        """
+        播放中的动画每帧都可能切换画面，不能复用渲染命令。
+        Returns:
+            bool: 动画未在播放时返回 True。
+        """
+        return not self.started
+
     def play(self) -> None:
         """开始播放动画"""
         self.started = True
+        self.set_animating(True)
         self.last_time = fantas.get_time_ns()
 
     def pause(self) -> None:
         """暂停动画播放"""
         self.started = False
+        self.set_animating(False)
         self.cumulative_time += fantas.get_time_ns() - self.last_time
 
     def set_frame(self, frame_index: int) -> None:
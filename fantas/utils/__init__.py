@@ -7,3 +7,8 @@ from .curve import *
 from .color import *
 from .font import *
 from .resource import *
+from .cache import *
+from .profiler import *
+from .frametime import *
+from .tracer import *
+from .replay import *
@@ -0,0 +1,165 @@
+"""
+提供渲染结果的缓存工具。
+"""
+
+from __future__ import annotations
+from collections import OrderedDict
+from collections.abc import Hashable
+from dataclasses import dataclass, field
+
+import fantas
+
+__all__ = (
+    "get_surface_bytes",
+    "SurfaceCache",
+)
+
+
+def get_surface_bytes(surface: fantas.Surface) -> int:
+    """
+    估算 Surface 占用的像素内存字节数。
+    Args:
+        surface (fantas.Surface): Surface 对象。
+    Returns:
+        int: 字节数。
+    """
+    return surface.get_pitch() * surface.get_height()
+
+
+@dataclass(slots=True)
+class SurfaceCache:
+    """
+    Surface 缓存，同时限制总字节数与条目数量，超出时按最近最少使用的顺序淘汰。
+    键中包含的 Surface 对象会被缓存持有，因此不会出现 id 复用导致的误命中。
+    每个条目还可以附带一份数据，与 Surface 一同被淘汰。
+    通过 acquire 获取的条目会被引用计数，在全部 release 之前不会被淘汰。
+    Args:
+        max_bytes  : 缓存的最大总字节数。
+        max_entries: 缓存的最大条目数量。
+    """
+
+    max_bytes: int = 64 * 1024 * 1024
+    max_entries: int = 256
+
+    entries: OrderedDict[Hashable, tuple[fantas.Surface, object]] = field(
+        default_factory=OrderedDict, init=False, repr=False
+    )  # 缓存条目，值为 (Surface, 附带数据)，按使用时间升序排列
+    total_bytes: int = field(default=0, init=False)  # 当前缓存的总字节数
+    refcounts: dict[Hashable, int] = field(
+        default_factory=dict, init=False, repr=False
+    )  # 被引用条目的引用计数
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.entries
+
+    def get(self, key: Hashable) -> fantas.Surface | None:
+        """
+        获取缓存的 Surface，并将其标记为最近使用。
+        Args:
+            key (Hashable): 缓存键。
+        Returns:
+            fantas.Surface | None: 缓存的 Surface，未命中时返回 None。
+        """
+        entry = self.get_entry(key)
+        return None if entry is None else entry[0]
+
+    def get_entry(self, key: Hashable) -> tuple[fantas.Surface, object] | None:
+        """
+        获取缓存的 Surface 及其附带数据，并将其标记为最近使用。
+        Args:
+            key (Hashable): 缓存键。
+        Returns:
+            tuple[fantas.Surface, object] | None: (Surface, 附带数据)，未命中时返回 None。
+        """
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def set(self, key: Hashable, surface: fantas.Surface, data: object = None) -> None:
+        """
+        缓存一个 Surface，超出限制时淘汰最近最少使用的条目。
+        单个 Surface 超过字节数上限时不会被缓存。
+        Args:
+            key (Hashable): 缓存键。
+            surface (fantas.Surface): 要缓存的 Surface。
+            data (object): 附带数据。
+        """
+        # 替换已有条目时保留其引用计数
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.total_bytes -= get_surface_bytes(old[0])
+        size = get_surface_bytes(surface)
+        if size > self.max_bytes:
+            return
+        self.entries[key] = (surface, data)
+        self.total_bytes += size
+        self.evict()
+
+    def evict(self) -> None:
+        """
+        按最近最少使用的顺序淘汰未被引用的条目，直到满足限制。
+        被引用的条目总是保留，因此总量可能暂时超出限制。
+        """
+        if self.total_bytes <= self.max_bytes and len(self.entries) <= self.max_entries:
+            return
+        for key in list(self.entries):
+            if key in self.refcounts:
+                continue
+            evicted, _ = self.entries.pop(key)
+            self.total_bytes -= get_surface_bytes(evicted)
+            if (
+                self.total_bytes <= self.max_bytes
+                and len(self.entries) <= self.max_entries
+            ):
+                return
+
+    def acquire(self, key: Hashable) -> fantas.Surface | None:
+        """
+        获取缓存的 Surface 并增加其引用计数，命中时需要与 release 成对调用。
+        Args:
+            key (Hashable): 缓存键。
+        Returns:
+            fantas.Surface | None: 缓存的 Surface，未命中时返回 None。
+        """
+        surface = self.get(key)
+        if surface is not None:
+            self.refcounts[key] = self.refcounts.get(key, 0) + 1
+        return surface
+
+    def release(self, key: Hashable) -> None:
+        """
+        减少条目的引用计数，归零后条目可以被淘汰。
+        Args:
+            key (Hashable): 缓存键。
+        """
+        count = self.refcounts.get(key, 0) - 1
+        if count > 0:
+            self.refcounts[key] = count
+            return
+        self.refcounts.pop(key, None)
+        self.evict()
+
+    def pop(self, key: Hashable) -> fantas.Surface | None:
+        """
+        移除一个缓存条目。
+        Args:
+            key (Hashable): 缓存键。
+        Returns:
+            fantas.Surface | None: 被移除的 Surface，不存在时返回 None。
+        """
+        self.refcounts.pop(key, None)
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return None
+        self.total_bytes -= get_surface_bytes(entry[0])
+        return entry[0]
+
+    def clear(self) -> None:
+        """清空缓存。"""
+        self.entries.clear()
+        self.refcounts.clear()
+        self.total_bytes = 0
@@ -6,7 +6,10 @@ from __future__ import annotations
 
 import fantas
 
-__all__ = ("get_distinct_blackorwhite",)
+__all__ = (
+    "get_distinct_blackorwhite",
+    "get_color_key",
+)
 
 
 def get_distinct_blackorwhite(color: fantas.Color) -> fantas.Color:
@@ -20,3 +23,20 @@ def get_distinct_blackorwhite(color: fantas.Color) -> fantas.Color:
     """
     h, s, l, a = color.hsla
     return fantas.Color.from_hsla(h, s, 100 if l < 50 else 0, a)
+
+
+def get_color_key(
+    color: fantas.ColorLike | None,
+) -> str | int | tuple[int, ...] | None:
+    """
+    把颜色转换为可哈希、可比较的值，用作缓存键或状态快照。
+    fantas.Color 是可变且不可哈希的，会被转换为元组。
+
+    :param color: 输入颜色
+    :type color: fantas.ColorLike | None
+    :return: 可哈希的颜色值
+    :rtype: str | int | tuple[int, ...] | None
+    """
+    if color is None or isinstance(color, (str, int)):
+        return color
+    return tuple(color)
@@ -6,20 +6,25 @@ import sys
 import atexit
 import pickle
 import socket
+import struct
 import threading
 import subprocess
 from enum import Flag
+from operator import itemgetter
 from queue import Queue
 from typing import Callable
 from dataclasses import dataclass, field
 
 import fantas
 from .udp import *
+from .shm import *
 
 __all__ = (
     "Debug",
     "DebugFlag",
     "DebugTimer",
+    "DebugHook",
+    "PROFILE_TOP_COUNT",
     "window_mainloop_debug",
     "multiwindow_mainloop_debug",
 )
@@ -34,8 +39,10 @@ class DebugFlag(Flag):
     """ 时间记录 """
     MOUSEMAGNIFY = 4
     """ 鼠标放大镜 """
+    RENDERPROFILE = 8
+    """ 渲染性能分析 """
 
-    ALL = EVENTLOG | TIMERECORD | MOUSEMAGNIFY
+    ALL = EVENTLOG | TIMERECORD | MOUSEMAGNIFY | RENDERPROFILE
     """ 全部调试选项 """
     NONE = 0
     """ 无调试选项 """
@@ -43,6 +50,39 @@ class DebugFlag(Flag):
 
 debug_received_event: fantas.Event = fantas.Event(fantas.DEBUGRECEIVED)
 
+# 共享内存中调试数据的消息类型，为消息的第一个字节
+MESSAGE_PICKLE = 0  # pickle 序列化的 (提示, *数据)
+MESSAGE_EVENTLOG = 1  # UTF-8 编码的事件信息
+MESSAGE_TIMERECORD = 2  # 若干个 TIME_RECORD_ITEM
+# 计时记录中的一项，(标签, 耗时（纳秒）)
+TIME_RECORD_ITEM = struct.Struct("<16sq")
+# 鼠标放大镜截图的最大边长（像素）
+MOUSE_SHOT_SIZE = 256
+# 共享内存中没有新数据时，读取线程的等待时间（毫秒）
+SHARED_POLL_INTERVAL = 5
+
+
+def decode_debug_data(message: bytes) -> tuple:  # type: ignore[type-arg]
+    """
+    解码共享内存环形缓冲区中的一条调试数据。
+    Args:
+        message (bytes): 消息数据。
+    Returns:
+        tuple: (提示, *数据)，与 Debug.send_debug_data 的参数一致。
+    """
+    kind = message[0]
+    if kind == MESSAGE_EVENTLOG:
+        return ("EventLog", message[1:].decode("utf-8"))
+    if kind == MESSAGE_TIMERECORD:
+        return (
+            "TimeRecord",
+            {
+                label.rstrip(b"\0").decode("utf-8"): time
+                for label, time in TIME_RECORD_ITEM.iter_unpack(message[1:])
+            },
+        )
+    return pickle.loads(message[1:])  # type: ignore[no-any-return]
+
 
 class Debug:
     """
@@ -61,6 +101,10 @@ class Debug:
     """ 是否正在读取子进程输出 """
     debug_port: int = 0
     """ 调试窗口子进程的接收端口号 """
+    ring: SharedRingBuffer | None = None
+    """ 向调试窗口子进程发送调试数据的共享内存环形缓冲区，为 None 时使用 UDP """
+    frame_buffer: SharedFrameBuffer | None = None
+    """ 向调试窗口子进程发送鼠标放大镜截图的共享内存帧缓冲区，为 None 时使用 UDP """
 
     @staticmethod
     def start_debug(
@@ -78,6 +122,8 @@ class Debug:
         Debug.close_debug()
         # 启动后台线程读取子进程输出
         Debug.start_read_thread()
+        # 创建发送调试数据的共享内存
+        Debug.create_shared_memory()
 
         cmd = [
             sys.executable,
@@ -86,6 +132,8 @@ class Debug:
             str(flag.value),
             windows_title,
             str(get_socket_port(Debug.udp_socket)),
+            Debug.ring.name if Debug.ring is not None else "",
+            Debug.frame_buffer.name if Debug.frame_buffer is not None else "",
         ]
 
         # 启动子进程
@@ -115,6 +163,30 @@ class Debug:
             Debug.process.kill()
             Debug.process.wait()
             Debug.reading = False
+        Debug.close_shared_memory()
+
+    @staticmethod
+    def close_shared_memory() -> None:
+        """关闭并释放发送调试数据的共享内存。"""
+        if Debug.ring is not None:
+            Debug.ring.close()
+            Debug.ring = None
+        if Debug.frame_buffer is not None:
+            Debug.frame_buffer.close()
+            Debug.frame_buffer = None
+
+    @staticmethod
+    def create_shared_memory() -> None:
+        """
+        创建向调试窗口子进程发送调试数据的共享内存，创建失败时使用 UDP 发送。
+        """
+        try:
+            Debug.ring = SharedRingBuffer.create()
+            Debug.frame_buffer = SharedFrameBuffer.create(
+                (MOUSE_SHOT_SIZE, MOUSE_SHOT_SIZE)
+            )
+        except OSError:
+            Debug.close_shared_memory()
 
     @staticmethod
     def set_sendto_port(port: int) -> None:
@@ -136,12 +208,82 @@ class Debug:
         :param prompt: 调试提示信息。
         :type prompt: str
         """
+        if Debug.ring is not None:
+            Debug.ring.write(bytes((MESSAGE_PICKLE,)) + pickle.dumps((prompt, *data)))
+            return
         udp_send_data(
             Debug.udp_socket,
             pickle.dumps((prompt, *data)),
             ("127.0.0.1", Debug.debug_port),
         )
 
+    @staticmethod
+    def send_event_log(event_str: str) -> None:
+        """
+        发送事件信息到调试窗口子进程，使用共享内存时不经过 pickle。
+
+        :param event_str: 事件信息。
+        :type event_str: str
+        """
+        if Debug.ring is None:
+            Debug.send_debug_data(event_str, prompt="EventLog")
+            return
+        Debug.ring.write(bytes((MESSAGE_EVENTLOG,)) + event_str.encode("utf-8"))
+
+    @staticmethod
+    def send_time_records(time_records: dict[str, int]) -> None:
+        """
+        发送计时记录到调试窗口子进程，使用共享内存时不经过 pickle。
+
+        :param time_records: 标签到耗时（纳秒）的映射，标签不超过 16 字节。
+        :type time_records: dict[str, int]
+        """
+        if Debug.ring is None:
+            Debug.send_debug_data(time_records, prompt="TimeRecord")
+            return
+        pack = TIME_RECORD_ITEM.pack
+        items = [pack(label.encode(), time) for label, time in time_records.items()]
+        Debug.ring.write(b"".join([bytes((MESSAGE_TIMERECORD,)), *items]))
+
+    @staticmethod
+    def send_mouse_shot(
+        surface: fantas.Surface, rect: fantas.Rect, point: tuple[int, int]
+    ) -> None:
+        """
+        发送鼠标放大镜截图到调试窗口子进程，使用共享内存时直接绘制进共享内存。
+
+        :param surface: 截图的源 Surface。
+        :type surface: fantas.Surface
+        :param rect: 截图区域。
+        :type rect: fantas.Rect
+        :param point: 鼠标在截图中的位置。
+        :type point: tuple[int, int]
+        """
+        if Debug.frame_buffer is not None:
+            Debug.frame_buffer.write(surface, rect, point)
+            return
+        Debug.send_debug_data(
+            point[0],
+            point[1],
+            rect.size,
+            fantas.image.tobytes(surface.subsurface(rect), "RGBA"),
+            prompt="MouseMagnify",
+        )
+
+    @staticmethod
+    def put_debug_data(data: tuple) -> None:  # type: ignore[type-arg]
+        """
+        将收到的调试数据放入队列，队列原本为空时发出 DEBUGRECEIVED 事件。
+
+        :param data: (提示, *数据)。
+        :type data: tuple
+        """
+        if Debug.queue.empty():
+            Debug.queue.put(data)
+            fantas.event.post(debug_received_event)
+        else:
+            Debug.queue.put(data)
+
     @staticmethod
     def read_debug_data() -> None:
         """
@@ -150,15 +292,39 @@ class Debug:
         while Debug.reading:
             recv, _ = udp_receive_data(Debug.udp_socket)
             if recv is not None:
-                if Debug.queue.empty():
-                    Debug.queue.put(pickle.loads(recv))
-                    fantas.event.post(debug_received_event)
-                else:
-                    Debug.queue.put(pickle.loads(recv))
+                Debug.put_debug_data(pickle.loads(recv))
             else:
                 # 避免忙等待
                 fantas.time.delay(100)
 
+    @staticmethod
+    def read_shared_debug_data(ring_name: str, frame_buffer_name: str) -> None:
+        """
+        在调试窗口子进程中，从主程序创建的共享内存读取调试数据并放入队列。
+
+        :param ring_name: 共享内存环形缓冲区的名称。
+        :type ring_name: str
+        :param frame_buffer_name: 共享内存帧缓冲区的名称。
+        :type frame_buffer_name: str
+        """
+        ring = SharedRingBuffer.open(ring_name)
+        frame_buffer = SharedFrameBuffer.open(frame_buffer_name)
+        while Debug.reading:
+            received = False
+            message = ring.read()
+            while message is not None:
+                Debug.put_debug_data(decode_debug_data(message))
+                received = True
+                message = ring.read()
+            shot = frame_buffer.read()
+            if shot is not None:
+                (x, y), size, pixels = shot
+                Debug.put_debug_data(("MouseMagnify", x, y, size, pixels))
+                received = True
+            if not received:
+                # 避免忙等待
+                fantas.time.delay(SHARED_POLL_INTERVAL)
+
     @staticmethod
     def start_read_thread() -> None:
         """
@@ -167,6 +333,23 @@ class Debug:
         Debug.reading = True
         threading.Thread(target=Debug.read_debug_data, daemon=True).start()
 
+    @staticmethod
+    def start_shared_read_thread(ring_name: str, frame_buffer_name: str) -> None:
+        """
+        启动从共享内存读取调试数据的后台线程，在调试窗口子进程中使用。
+
+        :param ring_name: 共享内存环形缓冲区的名称。
+        :type ring_name: str
+        :param frame_buffer_name: 共享内存帧缓冲区的名称。
+        :type frame_buffer_name: str
+        """
+        Debug.reading = True
+        threading.Thread(
+            target=Debug.read_shared_debug_data,
+            args=(ring_name, frame_buffer_name),
+            daemon=True,
+        ).start()
+
     @staticmethod
     def add_debug_flag(flag: DebugFlag) -> None:
         """
@@ -190,6 +373,9 @@ class Debug:
 
 atexit.register(Debug.close_debug)
 
+# 每种排序方式下发送到调试窗口的性能统计行数量
+PROFILE_TOP_COUNT = 50
+
 
 @dataclass(slots=True)
 class DebugTimer:
@@ -230,231 +416,127 @@ class DebugTimer:
         self.time_records.clear()
 
 
-def window_mainloop_debug(window: fantas.Window) -> None:
+@dataclass(slots=True)
+class DebugHook(fantas.FrameHook):
     """
-    以调试模式进入窗口的主事件循环，直到窗口关闭。
+    调试帧钩子，将事件日志、计时记录、鼠标放大镜截图与渲染性能统计发送到调试窗口。
     """
-    # 简化引用
-    tick = fantas.CLOCK.tick
-    get = fantas.event.get
-    handle_event = window.event_handler.handle_event
-    run_framefuncs = fantas.run_framefuncs
-    pre_render = window.renderer.pre_render
-    render = window.renderer.render
-    root_ui = window.root_ui
-    screen = window.screen
-    flip = window.flip
-    EVENTLOG = DebugFlag.EVENTLOG  # pylint: disable=invalid-name
-    TIMERECORD = DebugFlag.TIMERECORD  # pylint: disable=invalid-name
-    DEBUGRECEIVED = fantas.DEBUGRECEIVED  # pylint: disable=invalid-name
-    # 清空事件队列
-    fantas.event.clear()
-    # 预生成传递路径缓存
-    root_ui.build_pass_path_cache()
-
-    # === 调试 ===
-    # 监听调试输出事件
-    window.add_event_listener(
-        fantas.DEBUGRECEIVED,
-        root_ui,
-        True,
-        create_window_debug_listener(window, handle_debug_received_event),
-    )
-    # 监听鼠标移动事件
-    if DebugFlag.MOUSEMAGNIFY in Debug.debug_flag:
-        window.mouse_magnify_ratio = 8
-        window.add_event_listener(
-            fantas.MOUSEMOTION,
-            root_ui,
-            True,
-            create_window_debug_listener(window, debug_send_mouse_surface),
+
+    debug_timer: DebugTimer = field(default_factory=DebugTimer)  # 调试计时器
+    listeners: dict[int, list[tuple[fantas.EventType, fantas.ListenerFunc]]] = field(
+        default_factory=dict, init=False, repr=False
+    )  # 窗口 ID 到注册的 (事件类型, 监听器) 列表的映射
+    profilers: dict[int, fantas.RenderProfiler] = field(
+        default_factory=dict, init=False, repr=False
+    )  # 窗口 ID 到渲染性能分析器的映射
+
+    def attach(self, window: fantas.Window) -> None:
+        """
+        挂载到窗口时注册调试用的事件监听器，并按调试选项启用渲染性能分析。
+        Args:
+            window (fantas.Window): 窗口对象。
+        """
+        # 共用计时器
+        window.debug_timer = self.debug_timer  # type: ignore[attr-defined]
+        listeners = self.listeners.setdefault(window.id, [])
+        # 监听调试输出事件
+        listeners.append(
+            (
+                fantas.DEBUGRECEIVED,
+                create_window_debug_listener(window, handle_debug_received_event),
+            )
         )
-    # 创建调试计时器
-    window.debug_timer = debug_timer = DebugTimer()  # type: ignore[attr-defined]
-    record = debug_timer.record
-    # === 调试 ===
+        # 监听鼠标移动事件
+        if DebugFlag.MOUSEMAGNIFY in Debug.debug_flag:
+            window.mouse_magnify_ratio = 8
+            listeners.append(
+                (
+                    fantas.MOUSEMOTION,
+                    create_window_debug_listener(window, debug_send_mouse_surface),
+                )
+            )
+        for event_type, listener in listeners:
+            window.add_event_listener(event_type, window.root_ui, True, listener)
+        # 启用渲染性能分析
+        if DebugFlag.RENDERPROFILE in Debug.debug_flag:
+            profiler = fantas.RenderProfiler(on_report=send_render_profile)
+            self.profilers[window.id] = profiler
+            window.add_hook(profiler)
+
+    def detach(self, window: fantas.Window) -> None:
+        """
+        从窗口卸载时移除调试用的事件监听器与渲染性能分析器。
+        Args:
+            window (fantas.Window): 窗口对象。
+        """
+        for event_type, listener in self.listeners.pop(window.id, []):
+            window.remove_event_listener(event_type, window.root_ui, True, listener)
+        profiler = self.profilers.pop(window.id, None)
+        if profiler is not None:
+            window.remove_hook(profiler)
 
-    # 主循环
-    while window.running:
-        # 限制帧率
-        tick(window.fps)
+    def loop_start(self) -> None:
+        """
+        进入主循环时重置调试计时器。
+        """
+        self.debug_timer.reset()
 
-        # === 调试 ===
-        record("Idle")
-        # === 调试 ===
+    def record(self, phase: str) -> None:
+        """
+        记录一个阶段的耗时。
+        Args:
+            phase (str): 阶段名称。
+        """
+        self.debug_timer.record(phase)
 
-        # 处理事件
-        for event in get():
+    def end_frame(self) -> None:
+        """
+        发送计时记录到调试窗口并清空计时记录。
+        """
+        if DebugFlag.TIMERECORD in Debug.debug_flag:
+            Debug.send_time_records(self.debug_timer.time_records)
+        self.debug_timer.clear()
 
-            # === 调试 ===
-            # 发送事件信息到调试窗口
+    def wrap_handle_event(
+        self, handle_event: Callable[[fantas.Event], None]
+    ) -> Callable[[fantas.Event], None]:
+        """
+        包装事件处理函数，发送事件信息到调试窗口，发送的耗时记为 Debug 阶段。
+        Args:
+            handle_event (Callable[[fantas.Event], None]): 事件处理函数。
+        Returns:
+            Callable[[fantas.Event], None]: 包装后的事件处理函数。
+        """
+        record = self.debug_timer.record
+        EVENTLOG = DebugFlag.EVENTLOG  # pylint: disable=invalid-name
+        DEBUGRECEIVED = fantas.DEBUGRECEIVED  # pylint: disable=invalid-name
+
+        def debug_handle_event(event: fantas.Event) -> None:
             record("Event")
             if EVENTLOG in Debug.debug_flag and event.type != DEBUGRECEIVED:
-                Debug.send_debug_data(str(event), prompt="EventLog")
+                Debug.send_event_log(str(event))
             record("Debug")
-            # === 调试 ===
-
             handle_event(event)
 
-        # === 调试 ===
-        record("Event")
-        # === 调试 ===
+        return debug_handle_event
 
-        # 运行帧函数
-        run_framefuncs()
 
-        # === 调试 ===
-        record("FrameFunc")
-        # === 调试 ===
-
-        # 生成渲染命令
-        pre_render(root_ui)
-
-        # === 调试 ===
-        record("PreRender")
-        # === 调试 ===
-
-        # 渲染窗口
-        render(screen)
-        # 更新窗口显示
-        flip()
-
-        # === 调试 ===
-        record("Render")
-        # 发送计时记录到调试窗口
-        if TIMERECORD in Debug.debug_flag:
-            Debug.send_debug_data(debug_timer.time_records, prompt="TimeRecord")
-        # 清空计时记录
-        debug_timer.clear()
-        # === 调试 ===
-
-    window.destroy()
+def window_mainloop_debug(window: fantas.Window) -> None:
+    """
+    以调试模式进入窗口的主事件循环，直到窗口关闭。
+    即挂载 DebugHook 后进入 Window.mainloop。
+    """
+    window.add_hook(DebugHook())
+    window.mainloop()
 
 
 def multiwindow_mainloop_debug(multiwindow: fantas.MultiWindow) -> None:
     """
     以调试模式进入所有管理窗口的主事件循环，直到所有窗口关闭。
+    即挂载 DebugHook 后进入 MultiWindow.mainloops。
     """
-    # === 调试 ===
-    # 创建调试计时器
-    debug_timer = DebugTimer()
-    # === 调试 ===
-
-    # 简化引用
-    tick = fantas.CLOCK.tick
-    get = fantas.event.get
-    windows = multiwindow.windows
-    run_framefuncs = fantas.run_framefuncs
-    record = debug_timer.record
-    EVENTLOG = DebugFlag.EVENTLOG  # pylint: disable=invalid-name
-    TIMERECORD = DebugFlag.TIMERECORD  # pylint: disable=invalid-name
-    DEBUGRECEIVED = fantas.DEBUGRECEIVED  # pylint: disable=invalid-name
-    send_debug_data = Debug.send_debug_data
-    # 清空事件队列
-    fantas.event.clear()
-    window: fantas.Window | None
-    for window in windows.values():
-        # 预生成传递路径缓存
-        window.root_ui.build_pass_path_cache()
-        # 注册关闭事件监听器
-        window.add_event_listener(
-            fantas.WINDOWCLOSE,
-            window.root_ui,
-            True,
-            multiwindow.handle_window_close_event,
-        )
-
-        # === 调试 ===
-        # 共用计时器
-        window.debug_timer = debug_timer  # type: ignore[attr-defined]
-        # 监听调试输出事件
-        window.add_event_listener(
-            fantas.DEBUGRECEIVED,
-            window.root_ui,
-            True,
-            create_window_debug_listener(window, handle_debug_received_event),
-        )
-        # 监听鼠标移动事件
-        if DebugFlag.MOUSEMAGNIFY in Debug.debug_flag:
-            window.add_event_listener(
-                fantas.MOUSEMOTION,
-                window.root_ui,
-                True,
-                create_window_debug_listener(window, debug_send_mouse_surface),
-            )
-        # === 调试 ===
-    # === 调试 ===
-    # 重置调试计时器
-    debug_timer.reset()
-    # === 调试 ===
-
-    # 主循环
-    while windows:
-        # 限制帧率
-        tick(multiwindow.fps)
-
-        # === 调试 ===
-        record("Idle")
-        # === 调试 ===
-
-        # 处理事件
-        for event in get():
-
-            # === 调试 ===
-            # 发送事件信息到调试窗口
-            record("Event")
-            if EVENTLOG in Debug.debug_flag and event.type != DEBUGRECEIVED:
-                send_debug_data(str(event), "EventLog")
-            record("Debug")
-            # === 调试 ===
-
-            # 如果事件关联到特定窗口，则只传递给该窗口，否则传递给所有窗口
-            if hasattr(event, "window"):
-                window = event.window
-            else:
-                window = None
-            if window is not None:
-                window.event_handler.handle_event(event)
-            else:
-                for window in windows.values():
-                    window.event_handler.handle_event(event)
-
-        # === 调试 ===
-        record("Event")
-        # === 调试 ===
-
-        # 运行帧函数
-        run_framefuncs()
-
-        # === 调试 ===
-        record("FrameFunc")
-        # === 调试 ===
-
-        # 渲染所有窗口
-        for window in windows.values():
-            # 生成渲染命令
-            window.renderer.pre_render(window.root_ui)
-
-            # === 调试 ===
-            record("PreRender")
-            # === 调试 ===
-
-            # 渲染窗口
-            window.renderer.render(window.screen)
-            # 更新窗口显示
-            window.flip()
-
-            # === 调试 ===
-            record("Render")
-            # === 调试 ===
-
-        # === 调试 ===
-        # 发送计时记录到调试窗口
-        if TIMERECORD in Debug.debug_flag:
-            send_debug_data(debug_timer.time_records, "TimeRecord")
-        # 清空计时记录
-        debug_timer.clear()
-        # === 调试 ===
+    multiwindow.add_hook(DebugHook())
+    multiwindow.mainloops()
 
 
 def create_window_debug_listener(
@@ -510,10 +592,21 @@ def debug_send_mouse_surface(window: fantas.Window, event: fantas.Event) -> None
     rect.right = min(rect.right, window.size[0])
     rect.bottom = min(rect.bottom, window.size[1])
     # 发送到调试窗口
-    Debug.send_debug_data(
-        pos[0] - rect.left,
-        pos[1] - rect.top,
-        window.screen.subsurface(rect).convert_alpha().get_buffer().raw,
-        prompt="MouseMagnify",
-    )
+    Debug.send_mouse_shot(window.screen, rect, (pos[0] - rect.left, pos[1] - rect.top))
     debug_timer.record("Debug")
+
+
+def send_render_profile(rows: list[fantas.ProfileRow]) -> None:
+    """
+    发送渲染性能统计到调试窗口。
+    只发送按生成耗时、渲染耗时和总耗时排序的前 PROFILE_TOP_COUNT 行，避免数据包过大。
+    Args:
+        rows (list[fantas.ProfileRow]): 按总耗时降序排列的统计行。
+    """
+    if DebugFlag.RENDERPROFILE not in Debug.debug_flag:
+        return
+    top = dict.fromkeys(rows[:PROFILE_TOP_COUNT])
+    for index in (2, 3):
+        ranked = sorted(rows, key=itemgetter(index), reverse=True)
+        top.update(dict.fromkeys(ranked[:PROFILE_TOP_COUNT]))
+    Debug.send_debug_data(list(top), prompt="RenderProfile")
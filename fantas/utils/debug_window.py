@@ -214,7 +214,7 @@ class TimeRecordWindow(fantas.Window):
         )
 
         self.background = fantas.ColorBackground(fantas.colors.get("debug_bg"))
-        self.root_ui.append(self.background)
+        self.append(self.background)
 
         self.fps_text = fantas.Text("FPS: 0.0", fantas.Rect(8, 6, 110, 30))
         self.background.append(self.fps_text)
@@ -373,7 +373,7 @@ class MouseMagnifyWindow(fantas.Window):
         )
 
         self.background = fantas.ColorBackground(fantas.colors.get("debug_bg"))
-        self.root_ui.append(self.background)
+        self.append(self.background)
 
         self.ratio: int = 8
         self.cursor_color: fantas.Color = fantas.colors.get("debug_fg")
@@ -423,15 +423,21 @@ class MouseMagnifyWindow(fantas.Window):
             f"放大倍数: {self.ratio}x\n鼠标颜色：{self.cursor_color.hex[:-2].upper()}"
         )
 
-    def update_mouse_shot(self, x: int, y: int, surface_bytes: bytes) -> None:
+    def update_mouse_shot(
+        self, x: int, y: int, size: tuple[int, int], surface_bytes: bytes
+    ) -> None:
         """
         更新鼠标截图 Surface。
         Args:
             x (int): 鼠标截图的 X 坐标。
             y (int): 鼠标截图的 Y 坐标.
-            surface_bytes (bytes): 鼠标截图的 Surface 字节数据。
+            size (tuple[int, int]): 鼠标截图的尺寸。
+            surface_bytes (bytes): 鼠标截图的 RGBA 像素数据。
         """
-        self.mouse_shot_img.surface.get_buffer().write(surface_bytes)
+        self.mouse_shot_img.surface.blit(
+            fantas.image.frombuffer(surface_bytes, size, "RGBA"), (0, 0)
+        )
+        self.mouse_shot_img.mark_dirty()
         self.cursor.rect.left = x * self.ratio
         self.cursor.rect.top = y * self.ratio
         self.cursor_color = self.mouse_shot_img.surface.get_at((x, y))
@@ -470,6 +476,148 @@ class MouseMagnifyWindow(fantas.Window):
         return False
 
 
+class RenderProfileWindow(fantas.Window):
+    """渲染性能分析窗口类，显示耗时最多的 UI 元素，点击表头切换排序方式。"""
+
+    size: tuple[int, int]
+    # 表头，(标题, 左端坐标, 宽度, 排序方式)，排序方式为统计行的下标，4 表示总耗时
+    headers: ClassVar[tuple[tuple[str, int, int, int], ...]] = (
+        ("元素", 10, 290, 0),
+        ("生成 ms", 300, 90, 2),
+        ("渲染 ms", 390, 90, 3),
+        ("总计 ms", 480, 90, 4),
+    )
+    row_count: ClassVar[int] = 16
+    line_height: ClassVar[int] = 24
+
+    def __init__(self) -> None:
+        super().__init__(
+            fantas.WindowConfig(
+                title=f"{windows_title} | 渲染性能",
+                window_size=(580, 50 + RenderProfileWindow.row_count * 24),
+                window_position=(0, 0),
+                mouse_focus=False,
+                input_focus=False,
+                allow_high_dpi=True,
+            )
+        )
+
+        self.background = fantas.ColorBackground(fantas.colors.get("debug_bg"))
+        self.append(self.background)
+
+        self.rows: list[fantas.ProfileRow] = []  # 最近一次收到的统计行
+        self.sort_index: int = 4  # 当前的排序方式
+        self.by_class: bool = False  # 是否按类名汇总
+        self.header_texts: list[fantas.Text] = []
+        self.column_texts: list[fantas.Text] = []
+        for title, left, width, sort_index in RenderProfileWindow.headers:
+            header = fantas.Label(fantas.Rect(left, 8, width - 4, 28))
+            header.label_style.bgcolor = fantas.colors.get("debug_bg")
+            header.label_style.fgcolor = fantas.colors.get("debug_fg")
+            header.label_style.border_width = 1
+            self.background.append(header)
+            header_text = fantas.Text(
+                title,
+                fantas.Rect(0, 0, width - 4, 28),
+                align_mode=fantas.AlignMode.CENTER,
+            )
+            header.append(header_text)
+            self.header_texts.append(header_text)
+            self.add_event_listener(
+                fantas.MOUSECLICKED,
+                header,
+                False,
+                self.create_header_listener(sort_index),
+            )
+            column_text = fantas.Text(
+                "",
+                fantas.Rect(
+                    left + 4,
+                    44,
+                    width - 8,
+                    RenderProfileWindow.row_count * RenderProfileWindow.line_height,
+                ),
+            )
+            column_text.text_style.line_height = RenderProfileWindow.line_height
+            if fantas.platform.system() == "Linux":
+                column_text.offset = (column_text.offset[0], column_text.offset[1] - 3)
+            self.background.append(column_text)
+            self.column_texts.append(column_text)
+        self.update_headers()
+
+        self.add_event_listener(
+            fantas.WINDOWCLOSE, self.root_ui, True, self.handle_windowclose_event
+        )
+
+    def create_header_listener(self, sort_index: int) -> fantas.ListenerFunc:
+        """
+        创建表头的点击监听器。
+        点击“元素”表头切换是否按类名汇总，点击其他表头按该列降序排列。
+        Args:
+            sort_index (int): 表头对应的排序方式。
+        """
+
+        def header_listener(_: fantas.Event) -> bool:
+            if sort_index == 0:
+                self.by_class = not self.by_class
+            else:
+                self.sort_index = sort_index
+            self.update_headers()
+            self.update_table()
+            return True
+
+        return header_listener
+
+    def update_headers(self) -> None:
+        """
+        更新表头文本，标记当前的排序方式。
+        """
+        for text, (title, _, _, sort_index) in zip(
+            self.header_texts, RenderProfileWindow.headers
+        ):
+            if sort_index == 0:
+                text.text = "类（数量）" if self.by_class else title
+            elif sort_index == self.sort_index:
+                text.text = f"{title} ▼"
+            else:
+                text.text = title
+
+    def update_render_profile(self, rows: list[fantas.ProfileRow]) -> None:
+        """
+        更新渲染性能统计。
+        Args:
+            rows (list[fantas.ProfileRow]): 统计行。
+        """
+        self.rows = rows
+        self.update_table()
+
+    def update_table(self) -> None:
+        """
+        按当前的排序方式刷新表格。
+        """
+        rows = fantas.summarize_by_class(self.rows) if self.by_class else self.rows
+        if self.sort_index == 4:
+            rows = sorted(rows, key=lambda row: row[2] + row[3], reverse=True)
+        else:
+            rows = sorted(rows, key=lambda row: row[self.sort_index], reverse=True)
+        rows = rows[: RenderProfileWindow.row_count]
+        if self.by_class:
+            names = [f"{row[0]} ({row[1]})" for row in rows]
+        else:
+            names = [f"{row[0]} #{row[1]}" for row in rows]
+        self.column_texts[0].text = "\n".join(names)
+        self.column_texts[1].text = "\n".join(f"{row[2]:.3f}" for row in rows)
+        self.column_texts[2].text = "\n".join(f"{row[3]:.3f}" for row in rows)
+        self.column_texts[3].text = "\n".join(f"{row[2] + row[3]:.3f}" for row in rows)
+
+    def handle_windowclose_event(self, _: fantas.Event) -> bool:
+        """
+        处理窗口关闭事件。
+        """
+        Debug.send_debug_data(DebugFlag.RENDERPROFILE, prompt="CloseDebugWindow")
+        return False
+
+
 def handle_debugreceived_event(_: fantas.Event) -> bool:
     """
     处理接收到的调试命令事件。
@@ -482,7 +630,9 @@ def handle_debugreceived_event(_: fantas.Event) -> bool:
         elif prompt == "TimeRecord" and time_record_window is not None:
             time_record_window.update_time_records(data[1])
         elif prompt == "MouseMagnify" and mouse_magnify_window is not None:
-            mouse_magnify_window.update_mouse_shot(data[1], data[2], data[3])
+            mouse_magnify_window.update_mouse_shot(data[1], data[2], data[3], data[4])
+        elif prompt == "RenderProfile" and render_profile_window is not None:
+            render_profile_window.update_render_profile(data[1])
     return True
 
 
@@ -494,6 +644,7 @@ windows_title = sys.argv[2]
 event_log_window: EventLogWindow | None = None
 time_record_window: TimeRecordWindow | None = None
 mouse_magnify_window: MouseMagnifyWindow | None = None
+render_profile_window: RenderProfileWindow | None = None
 
 # 如果启用了事件日志调试标志，则创建事件日志窗口
 if DebugFlag.EVENTLOG in debug_flags:
@@ -507,6 +658,10 @@ if DebugFlag.TIMERECORD in debug_flags:
 if DebugFlag.MOUSEMAGNIFY in debug_flags:
     mouse_magnify_window = MouseMagnifyWindow()
     windows.append(mouse_magnify_window)
+# 如果启用了渲染性能分析调试标志，则创建渲染性能分析窗口
+if DebugFlag.RENDERPROFILE in debug_flags:
+    render_profile_window = RenderProfileWindow()
+    windows.append(render_profile_window)
 # 注册接收调试命令事件的处理器
 for window in windows:
     window.add_event_listener(
@@ -518,8 +673,11 @@ debug_windows.auto_place_windows(10)
 
 # 设置主程序端口号
 Debug.set_sendto_port(int(sys.argv[3]))
-# 启动读取调试命令的后台线程
-Debug.start_read_thread()
+# 启动读取调试命令的后台线程，主程序创建了共享内存时从共享内存读取
+if sys.argv[4]:
+    Debug.start_shared_read_thread(sys.argv[4], sys.argv[5])
+else:
+    Debug.start_read_thread()
 # 返回调试窗口的 UDP 端口号给主程序
 print(get_socket_port(Debug.udp_socket), flush=True)
 
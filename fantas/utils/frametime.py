@@ -0,0 +1,306 @@
+"""
+提供帧耗时记录工具。
+"""
+
+from __future__ import annotations
+import csv
+import json
+import math
+import atexit
+from pathlib import Path
+from collections import deque
+from dataclasses import asdict, dataclass, field
+
+import fantas
+
+__all__ = (
+    "percentile",
+    "get_budget_ms",
+    "FrameTimeStats",
+    "FrameTimeRecorder",
+)
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """
+    按最近秩法计算百分位数。
+    Args:
+        sorted_values (list[float]): 升序排列的数据。
+        q (float): 百分位，取值范围为 [0, 1]。
+    Returns:
+        float: 百分位数，数据为空时返回 0.0。
+    """
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(q * len(sorted_values)) - 1)
+    return sorted_values[min(index, len(sorted_values) - 1)]
+
+
+def get_budget_ms(fps: float) -> float:
+    """
+    计算帧率对应的帧预算。
+    Args:
+        fps (float): 帧率，不大于 0 表示不限制帧率。
+    Returns:
+        float: 帧预算（毫秒），不限制帧率时为 math.inf，即不统计卡顿帧。
+    """
+    if fps <= 0:
+        return math.inf
+    return 1000 / fps
+
+
+@dataclass(slots=True)
+class FrameTimeStats:
+    """
+    一个阶段的帧耗时统计，耗时单位均为毫秒。
+    Args:
+        count: 统计的帧数。
+        mean : 平均耗时。
+        p50  : 50 百分位耗时。
+        p95  : 95 百分位耗时。
+        p99  : 99 百分位耗时。
+        max  : 最大耗时。
+        jank : 耗时超过帧预算的帧数。
+    """
+
+    count: int = 0
+    mean: float = 0.0
+    p50: float = 0.0
+    p95: float = 0.0
+    p99: float = 0.0
+    max: float = 0.0
+    jank: int = 0
+
+
+@dataclass(slots=True)
+class FrameTimeRecorder(fantas.FrameHook):
+    """
+    帧耗时记录器，用环形缓冲区保存最近若干帧各个阶段的耗时。
+    作为帧钩子挂载到窗口后自动记录，也可以在每帧中用 record 记录各个阶段，
+    再用 end_frame 结束这一帧。
+    除各个阶段外还会记录 "Frame" 阶段，即除 "Idle" 外所有阶段的耗时之和，
+    超过帧预算的帧计为卡顿帧。挂载到窗口后每帧结束时按窗口当前的帧率更新帧预算，
+    不限制帧率时帧预算为 math.inf，不统计卡顿帧。
+    Args:
+        budget_ms: 帧预算（毫秒），通常为 1000 / fps。
+        history  : 保存的最大帧数。
+    """
+
+    budget_ms: float = 1000 / 60
+    history: int = 1024
+
+    frames: deque[dict[str, float]] = field(
+        init=False, repr=False
+    )  # 最近若干帧各个阶段的耗时（毫秒）
+    frame_count: int = field(default=0, init=False)  # 记录过的总帧数
+    jank_count: int = field(default=0, init=False)  # 记录过的总卡顿帧数
+    current: dict[str, int] = field(
+        default_factory=dict, init=False, repr=False
+    )  # 当前帧各个阶段的累计耗时（纳秒）
+    last_time: int = field(
+        default_factory=fantas.get_time_ns, init=False, repr=False
+    )  # 上一次记录的时间点（纳秒）
+    window: fantas.Window | None = field(
+        default=None, init=False, repr=False
+    )  # 挂载的窗口，帧预算随它的帧率更新
+
+    def __post_init__(self) -> None:
+        self.frames = deque(maxlen=self.history)
+
+    def attach(self, window: fantas.Window) -> None:
+        """
+        挂载到窗口时按窗口的帧率设置帧预算。
+        Args:
+            window (fantas.Window): 窗口对象。
+        """
+        self.window = window
+        self.budget_ms = get_budget_ms(window.fps)
+
+    def detach(self, window: fantas.Window) -> None:
+        """
+        从窗口卸载后不再跟随它的帧率。
+        Args:
+            window (fantas.Window): 窗口对象。
+        """
+        if self.window is window:
+            self.window = None
+
+    def loop_start(self) -> None:
+        """
+        进入主循环时更新上一次记录的时间点为当前时间。
+        """
+        self.current.clear()
+        self.last_time = fantas.get_time_ns()
+
+    def record(self, phase: str) -> None:
+        """
+        记录从上一次调用 record 方法到当前的时间差，并累计到当前帧的指定阶段中。
+        Args:
+            phase (str): 阶段名称。
+        """
+        current_time = fantas.get_time_ns()
+        self.current[phase] = self.current.get(phase, 0) + current_time - self.last_time
+        self.last_time = current_time
+
+    def end_frame(self) -> None:
+        """
+        结束当前帧，将其各个阶段的耗时存入环形缓冲区。
+        """
+        if self.window is not None:
+            # 帧率可能在运行时被修改，比如全速回放时取消帧率限制
+            self.budget_ms = get_budget_ms(self.window.fps)
+        self.add_frame(
+            {phase: time / 1_000_000 for phase, time in self.current.items()}
+        )
+        self.current.clear()
+
+    def add_frame(self, phases: dict[str, float]) -> None:
+        """
+        添加一帧的耗时数据。
+        Args:
+            phases (dict[str, float]): 阶段名称到耗时（毫秒）的映射。
+        """
+        frame = dict(phases)
+        frame["Frame"] = sum(
+            time for phase, time in phases.items() if phase not in ("Idle", "Frame")
+        )
+        self.frames.append(frame)
+        self.frame_count += 1
+        if frame["Frame"] > self.budget_ms:
+            self.jank_count += 1
+
+    def get_phases(self) -> list[str]:
+        """
+        获取缓冲区中出现过的所有阶段名称。
+        Returns:
+            list[str]: 按首次出现顺序排列的阶段名称，"Frame" 总在最后。
+        """
+        phases: dict[str, None] = {}
+        for frame in self.frames:
+            phases.update(dict.fromkeys(frame))
+        phases.pop("Frame", None)
+        return [*phases, "Frame"]
+
+    def get_times(self, phase: str = "Frame") -> list[float]:
+        """
+        获取缓冲区中每一帧指定阶段的耗时，没有该阶段的帧记为 0。
+        Args:
+            phase (str): 阶段名称。
+        Returns:
+            list[float]: 按时间顺序排列的耗时（毫秒）。
+        """
+        return [frame.get(phase, 0.0) for frame in self.frames]
+
+    def stats(self, phase: str = "Frame") -> FrameTimeStats:
+        """
+        统计缓冲区中指定阶段的耗时。
+        Args:
+            phase (str): 阶段名称。
+        Returns:
+            FrameTimeStats: 统计结果。
+        """
+        times = sorted(self.get_times(phase))
+        if not times:
+            return FrameTimeStats()
+        budget_ms = self.budget_ms
+        return FrameTimeStats(
+            count=len(times),
+            mean=sum(times) / len(times),
+            p50=percentile(times, 0.5),
+            p95=percentile(times, 0.95),
+            p99=percentile(times, 0.99),
+            max=times[-1],
+            jank=sum(1 for time in times if time > budget_ms),
+        )
+
+    def summary(self) -> dict[str, FrameTimeStats]:
+        """
+        统计缓冲区中所有阶段的耗时。
+        Returns:
+            dict[str, FrameTimeStats]: 阶段名称到统计结果的映射。
+        """
+        return {phase: self.stats(phase) for phase in self.get_phases()}
+
+    def histogram(self, phase: str = "Frame", bin_ms: float = 1.0) -> list[int]:
+        """
+        统计缓冲区中指定阶段耗时的直方图。
+        Args:
+            phase (str): 阶段名称。
+            bin_ms (float): 每个区间的宽度（毫秒）。
+        Returns:
+            list[int]: 第 i 项为耗时在 [i * bin_ms, (i + 1) * bin_ms) 内的帧数。
+        """
+        counts: list[int] = []
+        for time in self.get_times(phase):
+            index = int(time // bin_ms)
+            if index >= len(counts):
+                counts.extend([0] * (index + 1 - len(counts)))
+            counts[index] += 1
+        return counts
+
+    def to_dict(self) -> dict[str, object]:
+        """
+        将记录的数据转换为可以序列化为 JSON 的字典。
+        Returns:
+            dict[str, object]: 包含帧预算、总帧数、各阶段统计、帧耗时直方图与每帧耗时。
+        """
+        return {
+            # JSON 不支持无穷大，不限制帧率时保存为 null
+            "budget_ms": self.budget_ms if math.isfinite(self.budget_ms) else None,
+            "frame_count": self.frame_count,
+            "jank_count": self.jank_count,
+            "stats": {phase: asdict(stats) for phase, stats in self.summary().items()},
+            "histogram": {"bin_ms": 1.0, "counts": self.histogram()},
+            "frames": list(self.frames),
+        }
+
+    def dump_json(self, path: str | Path) -> None:
+        """
+        将记录的数据保存为 JSON 文件。
+        Args:
+            path (str | Path): 文件路径。
+        """
+        Path(path).write_text(json.dumps(self.to_dict(), indent=4), encoding="utf-8")
+
+    def dump_csv(self, path: str | Path) -> None:
+        """
+        将缓冲区中每一帧的耗时保存为 CSV 文件，每行一帧，每列一个阶段。
+        Args:
+            path (str | Path): 文件路径。
+        """
+        phases = self.get_phases()
+        first = self.frame_count - len(self.frames)
+        with open(path, "w", encoding="utf-8", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["frame", *phases])
+            for index, frame in enumerate(self.frames, first):
+                writer.writerow([index, *(frame.get(phase, 0.0) for phase in phases)])
+
+    def dump(self, path: str | Path) -> None:
+        """
+        根据文件后缀将记录的数据保存为 CSV 或 JSON 文件。
+        Args:
+            path (str | Path): 文件路径，后缀为 .csv 时保存为 CSV，否则保存为 JSON。
+        """
+        if Path(path).suffix.lower() == ".csv":
+            self.dump_csv(path)
+        else:
+            self.dump_json(path)
+
+    def dump_at_exit(self, path: str | Path) -> None:
+        """
+        在程序退出时将记录的数据保存到文件。
+        Args:
+            path (str | Path): 文件路径，格式同 dump。
+        """
+        atexit.register(self.dump, path)
+
+    def reset(self) -> None:
+        """
+        清空所有记录并更新上一次记录的时间点为当前时间。
+        """
+        self.frames.clear()
+        self.current.clear()
+        self.frame_count = 0
+        self.jank_count = 0
+        self.last_time = fantas.get_time_ns()
@@ -0,0 +1,185 @@
+"""
+提供渲染性能分析工具。
+"""
+
+from __future__ import annotations
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from typing import TypeAlias
+
+import fantas
+
+__all__ = (
+    "ProfileRow",
+    "RenderProfiler",
+    "summarize_by_class",
+)
+
+# 性能统计行，(类名, UI 元素 ID, 生成渲染命令耗时, 执行渲染命令耗时)，耗时为每帧平均毫秒数
+ProfileRow: TypeAlias = tuple[str, int, float, float]
+
+
+def summarize_by_class(rows: Iterable[ProfileRow]) -> list[ProfileRow]:
+    """
+    按类名汇总性能统计行。
+    Args:
+        rows (Iterable[ProfileRow]): 按 UI 元素统计的性能统计行。
+    Returns:
+        list[ProfileRow]: 按总耗时降序排列的统计行，第二项为该类 UI 元素的数量。
+    """
+    summary: dict[str, list[float]] = {}
+    for class_name, _, create_ms, render_ms in rows:
+        item = summary.setdefault(class_name, [0, 0.0, 0.0])
+        item[0] += 1
+        item[1] += create_ms
+        item[2] += render_ms
+    return sorted(
+        (
+            (class_name, int(count), create_ms, render_ms)
+            for class_name, (count, create_ms, render_ms) in summary.items()
+        ),
+        key=lambda row: row[2] + row[3],
+        reverse=True,
+    )
+
+
+@dataclass(slots=True)
+class RenderProfiler(fantas.FrameHook):
+    """
+    渲染性能分析器，统计每个 UI 元素生成渲染命令与执行渲染命令的耗时。
+    通过 Window.add_hook 挂载后生效，分析期间渲染命令不会合并为 blits 批次。
+    也可以直接赋值给 Renderer.profiler，此时需要每帧手动调用 end_frame。
+    生成耗时是从上一个渲染命令产出到该元素的渲染命令产出之间的时间，包含遍历子树的开销。
+    分析期间渲染器不使用保留模式，每帧都重新生成全部渲染命令，统计的是不复用时的生成耗时。
+    Args:
+        frames   : 每次汇总的帧数。
+        on_report: 汇总完成时的回调函数，参数为按总耗时降序排列的统计行。
+    """
+
+    frames: int = 60
+    on_report: Callable[[list[ProfileRow]], None] | None = None
+
+    create_times: dict[int, int] = field(
+        default_factory=dict, init=False, repr=False
+    )  # UI 元素 ID 到累计生成耗时（纳秒）的映射
+    render_times: dict[int, int] = field(
+        default_factory=dict, init=False, repr=False
+    )  # UI 元素 ID 到累计渲染耗时（纳秒）的映射
+    class_names: dict[int, str] = field(
+        default_factory=dict, init=False, repr=False
+    )  # UI 元素 ID 到类名的映射
+    frame_count: int = field(default=0, init=False)  # 当前已统计的帧数
+    report: list[ProfileRow] = field(
+        default_factory=list, init=False, repr=False
+    )  # 最近一次汇总的结果
+
+    def attach(self, window: fantas.Window) -> None:
+        """
+        挂载到窗口时分析该窗口的渲染器。
+        Args:
+            window (fantas.Window): 窗口对象。
+        """
+        window.renderer.profiler = self
+
+    def detach(self, window: fantas.Window) -> None:
+        """
+        从窗口卸载时停止分析该窗口的渲染器。
+        Args:
+            window (fantas.Window): 窗口对象。
+        """
+        if window.renderer.profiler is self:
+            window.renderer.profiler = None
+
+    def profile_commands(
+        self, commands: Iterable[fantas.RenderCommand]
+    ) -> Iterator[fantas.RenderCommand]:
+        """
+        包装渲染命令的生成过程，统计每个渲染命令的生成耗时。
+        Args:
+            commands (Iterable[fantas.RenderCommand]): 渲染命令的生成器。
+        Yields:
+            RenderCommand: 渲染命令对象。
+        """
+        get_time_ns = fantas.get_time_ns
+        create_times = self.create_times
+        class_names = self.class_names
+        start = get_time_ns()
+        for command in commands:
+            end = get_time_ns()
+            creator = command.creator
+            key = creator.ui_id
+            create_times[key] = create_times.get(key, 0) + end - start
+            class_names[key] = type(creator).__name__
+            yield command
+            start = get_time_ns()
+
+    def render_commands(
+        self,
+        commands: Iterable[fantas.RenderCommand],
+        target_surface: fantas.Surface,
+    ) -> None:
+        """
+        逐个执行渲染命令，统计每个渲染命令的渲染耗时。
+        Args:
+            commands (Iterable[fantas.RenderCommand]): 按层级升序排列的渲染命令。
+            target_surface (fantas.Surface): 目标 Surface 对象。
+        """
+        get_time_ns = fantas.get_time_ns
+        render_times = self.render_times
+        class_names = self.class_names
+        for command in commands:
+            start = get_time_ns()
+            blits = command.get_blits()
+            if blits is None:
+                command.render(target_surface)
+            else:
+                target_surface.blits(blits, doreturn=False)
+            end = get_time_ns()
+            creator = command.creator
+            key = creator.ui_id
+            render_times[key] = render_times.get(key, 0) + end - start
+            class_names[key] = type(creator).__name__
+
+    def end_frame(self) -> None:
+        """
+        结束一帧的统计，累计到 frames 帧时汇总并调用 on_report。
+        """
+        self.frame_count += 1
+        if self.frame_count < self.frames:
+            return
+        self.report = self.build_report()
+        self.reset()
+        if self.on_report is not None:
+            self.on_report(self.report)
+
+    def build_report(self) -> list[ProfileRow]:
+        """
+        汇总当前的统计数据。
+        Returns:
+            list[ProfileRow]: 按总耗时降序排列的统计行。
+        """
+        scale = 1 / (max(self.frame_count, 1) * 1_000_000)
+        create_times = self.create_times
+        render_times = self.render_times
+        return sorted(
+            (
+                (
+                    class_name,
+                    key,
+                    create_times.get(key, 0) * scale,
+                    render_times.get(key, 0) * scale,
+                )
+                for key, class_name in self.class_names.items()
+            ),
+            key=lambda row: row[2] + row[3],
+            reverse=True,
+        )
+
+    def reset(self) -> None:
+        """
+        清空统计数据。
+        """
+        self.create_times.clear()
+        self.render_times.clear()
+        self.class_names.clear()
+        self.frame_count = 0
@@ -0,0 +1,378 @@
+"""
+提供事件录制与回放工具，用于可重复的性能测试。
+"""
+
+from __future__ import annotations
+import atexit
+import struct
+import marshal
+from pathlib import Path
+from time import perf_counter_ns
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import TypeAlias
+
+import fantas
+
+__all__ = (
+    "encode_event",
+    "decode_event",
+    "pack_frames",
+    "unpack_frames",
+    "EventRecorder",
+    "EventReplayer",
+)
+
+# 文件头，(魔数, 格式版本)
+FILE_HEADER = struct.Struct("<4sI")
+FILE_MAGIC = b"FEVR"
+FILE_VERSION = 1
+# 帧头，(相对录制开始的时间（纳秒）, 事件数量)
+FRAME_HEADER = struct.Struct("<qI")
+# 事件头，(事件类型, 属性数据的字节数)
+EVENT_HEADER = struct.Struct("<II")
+
+# 录制的事件，(事件类型, 属性数据)
+RecordedEvent: TypeAlias = tuple[int, bytes]
+# 录制的一帧，(相对录制开始的时间（纳秒）, 这一帧处理的事件)
+RecordedFrame: TypeAlias = tuple[int, tuple[RecordedEvent, ...]]
+
+
+def encode_event(event: fantas.Event) -> RecordedEvent:
+    """
+    将事件编码为字节数据，window 属性保存为窗口 ID，无法序列化的属性会被跳过。
+    Args:
+        event (fantas.Event): 事件对象。
+    Returns:
+        RecordedEvent: (事件类型, 属性数据)。
+    """
+    attrs = dict(event.dict)
+    if "window" in attrs:
+        attrs["window"] = getattr(attrs["window"], "id", None)
+    try:
+        return event.type, marshal.dumps(attrs)
+    except ValueError:
+        pass
+    # 自定义事件可能带有 UI 元素等对象
+    plain: dict[str, object] = {}
+    for key, value in attrs.items():
+        try:
+            marshal.dumps(value)
+        except ValueError:
+            continue
+        plain[key] = value
+    return event.type, marshal.dumps(plain)
+
+
+def decode_event(
+    recorded: RecordedEvent,
+    windows: dict[int, fantas.Window] | None = None,
+    default_window: fantas.Window | None = None,
+) -> fantas.Event:
+    """
+    将字节数据解码为事件。
+    Args:
+        recorded (RecordedEvent): (事件类型, 属性数据)。
+        windows (dict[int, fantas.Window] | None): 窗口 ID 到窗口的映射，
+            用于还原 window 属性。
+        default_window (fantas.Window | None): 找不到窗口 ID 对应的窗口时使用的窗口。
+    Returns:
+        fantas.Event: 事件对象。
+    """
+    event_type, data = recorded
+    attrs = marshal.loads(data)
+    window_id = attrs.get("window")
+    if window_id is not None:
+        attrs["window"] = (windows or {}).get(window_id, default_window)
+    return fantas.Event(event_type, attrs)
+
+
+def pack_frames(frames: list[RecordedFrame]) -> bytes:
+    """
+    将录制的帧打包为字节数据。
+    Args:
+        frames (list[RecordedFrame]): 录制的帧。
+    Returns:
+        bytes: 字节数据。
+    """
+    parts = [FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION)]
+    for frame_time, events in frames:
+        parts.append(FRAME_HEADER.pack(frame_time, len(events)))
+        for event_type, data in events:
+            parts.append(EVENT_HEADER.pack(event_type, len(data)))
+            parts.append(data)
+    return b"".join(parts)
+
+
+def unpack_frames(data: bytes) -> list[RecordedFrame]:
+    """
+    从字节数据中解包录制的帧。
+    Args:
+        data (bytes): pack_frames 生成的字节数据。
+    Returns:
+        list[RecordedFrame]: 录制的帧。
+    Raises:
+        ValueError: 不是事件录制数据，或者格式版本不受支持。
+    """
+    if len(data) < FILE_HEADER.size:
+        raise ValueError("不是事件录制数据。")
+    magic, version = FILE_HEADER.unpack_from(data, 0)
+    if magic != FILE_MAGIC:
+        raise ValueError("不是事件录制数据。")
+    if version != FILE_VERSION:
+        raise ValueError(f"不支持的事件录制格式版本：{version}。")
+    frames: list[RecordedFrame] = []
+    offset = FILE_HEADER.size
+    while offset < len(data):
+        frame_time, count = FRAME_HEADER.unpack_from(data, offset)
+        offset += FRAME_HEADER.size
+        events: list[RecordedEvent] = []
+        for _ in range(count):
+            event_type, size = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            events.append((event_type, data[offset : offset + size]))
+            offset += size
+        frames.append((frame_time, tuple(events)))
+    return frames
+
+
+@dataclass(slots=True)
+class EventRecorder(fantas.FrameHook):
+    """
+    事件录制器，录制主循环每帧处理的事件，以及每帧开始处理事件时 fantas.get_time_ns 的读数。
+    通过 Window.add_hook 或 WindowConfig.event_record_file 启用，录制结果可以用 EventReplayer 回放。
+    """
+
+    frames: list[RecordedFrame] = field(
+        default_factory=list, init=False, repr=False
+    )  # 已结束的帧
+    events: list[RecordedEvent] = field(
+        default_factory=list, init=False, repr=False
+    )  # 当前帧处理的事件
+    start_time: int = field(
+        default_factory=fantas.get_time_ns, init=False, repr=False
+    )  # 录制开始的时间点（纳秒）
+    frame_time: int = field(default=0, init=False, repr=False)  # 当前帧相对录制开始的时间（纳秒）
+
+    def loop_start(self) -> None:
+        """
+        进入主循环时，如果还没有录制任何帧，将录制开始的时间点更新为当前时间。
+        """
+        if not self.frames:
+            self.start_time = fantas.get_time_ns()
+
+    def record(self, phase: str) -> None:
+        """
+        "Idle" 阶段结束，即开始处理事件时，记录当前帧的时间。
+        Args:
+            phase (str): 阶段名称。
+        """
+        if phase == "Idle":
+            self.frame_time = fantas.get_time_ns() - self.start_time
+
+    def end_frame(self) -> None:
+        """
+        结束当前帧，保存这一帧处理的事件。
+        """
+        self.frames.append((self.frame_time, tuple(self.events)))
+        self.events.clear()
+
+    def wrap_handle_event(
+        self, handle_event: Callable[[fantas.Event], None]
+    ) -> Callable[[fantas.Event], None]:
+        """
+        包装事件处理函数，在处理前录制事件。
+        Args:
+            handle_event (Callable[[fantas.Event], None]): 事件处理函数。
+        Returns:
+            Callable[[fantas.Event], None]: 录制事件的事件处理函数。
+        """
+        events = self.events
+
+        def recorded_handle_event(event: fantas.Event) -> None:
+            events.append(encode_event(event))
+            handle_event(event)
+
+        return recorded_handle_event
+
+    def to_bytes(self) -> bytes:
+        """
+        将录制的帧打包为字节数据。
+        Returns:
+            bytes: 字节数据。
+        """
+        return pack_frames(self.frames)
+
+    def dump(self, path: str | Path) -> None:
+        """
+        将录制的帧保存为文件。
+        Args:
+            path (str | Path): 文件路径。
+        """
+        Path(path).write_bytes(self.to_bytes())
+
+    def dump_at_exit(self, path: str | Path) -> None:
+        """
+        在程序退出时将录制的帧保存为文件。
+        Args:
+            path (str | Path): 文件路径。
+        """
+        atexit.register(self.dump, path)
+
+    def clear(self) -> None:
+        """
+        清空录制的帧，下一次进入主循环时重新开始计时。
+        """
+        self.frames.clear()
+        self.events.clear()
+
+
+@dataclass(slots=True)
+class EventReplayer(fantas.FrameHook):
+    """
+    事件回放器，将录制的事件交给主循环处理，用于可重复的性能测试。
+    全速回放时每帧回放一帧录制数据，不限制帧率，并把 fantas.get_time_ns 替换为虚拟时钟，
+    每帧开始处理事件时的时间与录制时相同，依赖时间的动画与帧函数得到相同的结果。
+    虚拟时钟与真实时钟同速前进，帧耗时记录与性能追踪测得的阶段耗时仍是真实耗时。
+    回放比录制时慢时虚拟时钟不会倒退，此时时间会晚于录制时。
+    虚拟时钟在挂载时替换，回放结束后仍然保留，直到从所有窗口卸载后才恢复。
+    实时回放时按录制的时间回放事件，使用真实时钟。
+    回放期间忽略真实的输入事件，只保留窗口关闭事件，没有显示设备时可以设置环境变量
+    SDL_VIDEODRIVER=dummy 运行。
+    Args:
+        frames      : 录制的帧。
+        real_time   : 是否实时回放。
+        close_at_end: 回放结束后是否向挂载的窗口发送窗口关闭事件。
+    """
+
+    frames: list[RecordedFrame]
+    real_time: bool = False
+    close_at_end: bool = True
+
+    index: int = field(default=0, init=False)  # 下一帧录制数据的索引
+    finished: bool = field(default=False, init=False)  # 是否已经回放结束
+    windows: dict[int, fantas.Window] = field(
+        default_factory=dict, init=False, repr=False
+    )  # 挂载的窗口，键为窗口 ID
+    saved_settings: dict[int, tuple[int, bool]] = field(
+        default_factory=dict, init=False, repr=False
+    )  # 挂载前窗口的 (帧率, 是否按需渲染)，键为窗口 ID
+    start_time: int = field(default=0, init=False, repr=False)  # 回放开始的真实时间点（纳秒）
+    offset: int = field(default=0, init=False, repr=False)  # 虚拟时钟相对真实时钟的偏移（纳秒）
+    real_clock: Callable[[], int] | None = field(
+        default=None, init=False, repr=False
+    )  # 被替换的 fantas.get_time_ns，没有替换时为 None
+
+    @classmethod
+    def load(
+        cls, path: str | Path, real_time: bool = False, close_at_end: bool = True
+    ) -> EventReplayer:
+        """
+        从文件中读取录制的帧。
+        Args:
+            path (str | Path): EventRecorder.dump 保存的文件路径。
+            real_time (bool): 是否实时回放。
+            close_at_end (bool): 回放结束后是否向挂载的窗口发送窗口关闭事件。
+        Returns:
+            EventReplayer: 事件回放器。
+        """
+        return cls(unpack_frames(Path(path).read_bytes()), real_time, close_at_end)
+
+    def attach(self, window: fantas.Window) -> None:
+        """
+        挂载到窗口时关闭按需渲染，全速回放时同时取消帧率限制，并替换 fantas.get_time_ns。
+        在主循环包装各个帧钩子之前替换，所有帧钩子与 UI 元素都使用同一个虚拟时钟。
+        Args:
+            window (fantas.Window): 窗口对象。
+        """
+        self.windows[window.id] = window
+        self.saved_settings[window.id] = (window.fps, window.on_demand)
+        window.on_demand = False
+        if not self.real_time:
+            window.fps = 0
+            self.install_clock()
+
+    def detach(self, window: fantas.Window) -> None:
+        """
+        从窗口卸载时恢复窗口的设置，从所有窗口卸载后恢复 fantas.get_time_ns。
+        Args:
+            window (fantas.Window): 窗口对象。
+        """
+        self.windows.pop(window.id, None)
+        settings = self.saved_settings.pop(window.id, None)
+        if settings is not None:
+            window.fps, window.on_demand = settings
+        if not self.windows:
+            self.restore_clock()
+
+    def loop_start(self) -> None:
+        """
+        进入主循环时开始计时。虚拟时钟的偏移不会减小，因此虚拟时间不会倒退。
+        """
+        self.start_time = perf_counter_ns()
+
+    def get_time_ns(self) -> int:
+        """
+        虚拟时钟。
+        Returns:
+            int: 虚拟时间（纳秒）。
+        """
+        return perf_counter_ns() + self.offset
+
+    def install_clock(self) -> None:
+        """
+        将 fantas.get_time_ns 替换为虚拟时钟。
+        """
+        if self.real_clock is None:
+            self.real_clock = fantas.get_time_ns
+            setattr(fantas, "get_time_ns", self.get_time_ns)
+
+    def restore_clock(self) -> None:
+        """
+        恢复被替换的 fantas.get_time_ns。
+        """
+        if self.real_clock is not None:
+            setattr(fantas, "get_time_ns", self.real_clock)
+            self.real_clock = None
+
+    def wrap_get_events(
+        self, get_events: Callable[[], list[fantas.Event]]
+    ) -> Callable[[], list[fantas.Event]]:
+        """
+        替换为返回录制事件的函数，真实事件中只保留窗口关闭事件。
+        Args:
+            get_events (Callable[[], list[fantas.Event]]): 获取事件的函数。
+        Returns:
+            Callable[[], list[fantas.Event]]: 获取录制事件的函数。
+        """
+        frames = self.frames
+        WINDOWCLOSE = fantas.WINDOWCLOSE  # pylint: disable=invalid-name
+
+        def replay_get_events() -> list[fantas.Event]:
+            events = [event for event in get_events() if event.type == WINDOWCLOSE]
+            if self.finished:
+                return events
+            windows = self.windows
+            default_window = next(iter(windows.values())) if len(windows) == 1 else None
+            now = perf_counter_ns()
+            if self.real_time:
+                elapsed = now - self.start_time
+                while self.index < len(frames) and frames[self.index][0] <= elapsed:
+                    for recorded in frames[self.index][1]:
+                        events.append(decode_event(recorded, windows, default_window))
+                    self.index += 1
+            elif self.index < len(frames):
+                frame_time, recorded_events = frames[self.index]
+                self.index += 1
+                # 使这一帧开始处理事件时的虚拟时间与录制时相同
+                self.offset = max(self.offset, self.start_time + frame_time - now)
+                for recorded in recorded_events:
+                    events.append(decode_event(recorded, windows, default_window))
+            if self.index >= len(frames):
+                self.finished = True
+                if self.close_at_end:
+                    for window in windows.values():
+                        events.append(fantas.Event(WINDOWCLOSE, window=window))
+            return events
+
+        return replay_get_events
@@ -0,0 +1,268 @@
+"""
+提供基于共享内存的进程间数据传输工具。
+"""
+
+from __future__ import annotations
+import os
+import sys
+import struct
+from dataclasses import dataclass, field
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+import fantas
+
+__all__ = (
+    "open_shared_memory",
+    "SharedRingBuffer",
+    "SharedFrameBuffer",
+)
+
+# 环形缓冲区头部，(已写入的总字节数, 已读取的总字节数)
+RING_HEADER = struct.Struct("<QQ")
+# 环形缓冲区中每条记录的长度前缀
+RING_LENGTH = struct.Struct("<I")
+# 表示缓冲区末尾剩余部分被跳过的长度前缀
+RING_SKIP = 0xFFFFFFFF
+# 帧缓冲区头部，(序号, x, y, 宽度, 高度)，序号为奇数时表示正在写入
+FRAME_HEADER = struct.Struct("<QIIII")
+
+
+def open_shared_memory(name: str) -> SharedMemory:
+    """
+    打开其他进程创建的共享内存，并且不让本进程的资源追踪器在退出时释放它。
+    Args:
+        name (str): 共享内存名称。
+    Returns:
+        SharedMemory: 共享内存对象。
+    """
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name, track=False)  # pylint: disable=unexpected-keyword-arg
+    shm = SharedMemory(name)
+    if os.name == "posix":
+        # Python 3.12 打开共享内存时也会注册到资源追踪器，需要手动取消
+        # pylint: disable-next=protected-access
+        name = shm._name  # type: ignore[attr-defined]
+        resource_tracker.unregister(name, "shared_memory")
+    return shm
+
+
+@dataclass(slots=True)
+class SharedRingBuffer:
+    """
+    共享内存环形缓冲区，单生产者单消费者，每条记录是一段字节数据。
+    写入方只把数据复制进共享内存并更新头部，不会阻塞，空间不足时丢弃记录。
+    Args:
+        shm      : 共享内存对象，可以用 create 或 open 创建。
+        owner    : 是否由本进程创建，为 True 时 close 会同时释放共享内存。
+    """
+
+    shm: SharedMemory
+    owner: bool = False
+
+    capacity: int = field(init=False)  # 数据区的字节数
+    dropped: int = field(default=0, init=False)  # 因空间不足被丢弃的记录数量
+
+    def __post_init__(self) -> None:
+        self.capacity = self.shm.size - RING_HEADER.size
+
+    @classmethod
+    def create(cls, capacity: int = 1024 * 1024) -> SharedRingBuffer:
+        """
+        创建新的共享内存环形缓冲区。
+        Args:
+            capacity (int): 数据区的字节数。
+        Returns:
+            SharedRingBuffer: 环形缓冲区对象。
+        """
+        shm = SharedMemory(create=True, size=RING_HEADER.size + capacity)
+        RING_HEADER.pack_into(shm.buf, 0, 0, 0)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def open(cls, name: str) -> SharedRingBuffer:
+        """
+        打开其他进程创建的共享内存环形缓冲区。
+        Args:
+            name (str): 共享内存名称。
+        Returns:
+            SharedRingBuffer: 环形缓冲区对象。
+        """
+        return cls(open_shared_memory(name))
+
+    @property
+    def name(self) -> str:
+        """共享内存名称"""
+        return self.shm.name
+
+    def write(self, data: bytes | bytearray | memoryview) -> bool:
+        """
+        写入一条记录。
+        Args:
+            data (bytes | bytearray | memoryview): 记录数据。
+        Returns:
+            bool: 写入成功返回 True，空间不足被丢弃时返回 False。
+        """
+        buf = self.shm.buf
+        capacity = self.capacity
+        write_pos, read_pos = RING_HEADER.unpack_from(buf, 0)
+        size = RING_LENGTH.size + len(data)
+        offset = write_pos % capacity
+        # 记录不跨越缓冲区末尾，剩余部分不足时跳到开头
+        skip = capacity - offset if offset + size > capacity else 0
+        if skip + size > capacity - (write_pos - read_pos):
+            self.dropped += 1
+            return False
+        start = RING_HEADER.size
+        if skip:
+            if skip >= RING_LENGTH.size:
+                RING_LENGTH.pack_into(buf, start + offset, RING_SKIP)
+            offset = 0
+        RING_LENGTH.pack_into(buf, start + offset, len(data))
+        begin = start + offset + RING_LENGTH.size
+        buf[begin : begin + len(data)] = data
+        # 数据写完后再发布新的写入位置
+        struct.pack_into("<Q", buf, 0, write_pos + skip + size)
+        return True
+
+    def read(self) -> bytes | None:
+        """
+        读取一条记录。
+        Returns:
+            bytes | None: 记录数据，没有新记录时返回 None。
+        """
+        buf = self.shm.buf
+        capacity = self.capacity
+        write_pos, read_pos = RING_HEADER.unpack_from(buf, 0)
+        if read_pos == write_pos:
+            return None
+        start = RING_HEADER.size
+        offset = read_pos % capacity
+        remain = capacity - offset
+        if remain < RING_LENGTH.size:
+            read_pos += remain
+            offset = 0
+        else:
+            (length,) = RING_LENGTH.unpack_from(buf, start + offset)
+            if length == RING_SKIP:
+                read_pos += remain
+                offset = 0
+        (length,) = RING_LENGTH.unpack_from(buf, start + offset)
+        begin = start + offset + RING_LENGTH.size
+        data = bytes(buf[begin : begin + length])
+        struct.pack_into("<Q", buf, 8, read_pos + RING_LENGTH.size + length)
+        return data
+
+    def close(self) -> None:
+        """
+        关闭共享内存，由本进程创建时同时释放它。
+        """
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+@dataclass(slots=True)
+class SharedFrameBuffer:
+    """
+    共享内存帧缓冲区，保存一张 RGBA 图像，读取方总是得到最新且完整的一帧。
+    写入方直接把 Surface 绘制进共享内存，读取时发现正在写入或被覆盖则放弃本次读取。
+    Args:
+        shm      : 共享内存对象，可以用 create 或 open 创建。
+        owner    : 是否由本进程创建，为 True 时 close 会同时释放共享内存。
+    """
+
+    shm: SharedMemory
+    owner: bool = False
+
+    last_sequence: int = field(default=0, init=False)  # 最近一次读取到的序号
+
+    @classmethod
+    def create(cls, max_size: tuple[int, int]) -> SharedFrameBuffer:
+        """
+        创建新的共享内存帧缓冲区。
+        Args:
+            max_size (tuple[int, int]): 图像的最大尺寸。
+        Returns:
+            SharedFrameBuffer: 帧缓冲区对象。
+        """
+        shm = SharedMemory(
+            create=True, size=FRAME_HEADER.size + max_size[0] * max_size[1] * 4
+        )
+        FRAME_HEADER.pack_into(shm.buf, 0, 0, 0, 0, 0, 0)
+        return cls(shm, owner=True)
+
+    @classmethod
+    def open(cls, name: str) -> SharedFrameBuffer:
+        """
+        打开其他进程创建的共享内存帧缓冲区。
+        Args:
+            name (str): 共享内存名称。
+        Returns:
+            SharedFrameBuffer: 帧缓冲区对象。
+        """
+        return cls(open_shared_memory(name))
+
+    @property
+    def name(self) -> str:
+        """共享内存名称"""
+        return self.shm.name
+
+    def write(
+        self,
+        source: fantas.Surface,
+        area: fantas.RectLike,
+        point: tuple[int, int] = (0, 0),
+    ) -> None:
+        """
+        将 Surface 的一个区域直接绘制进共享内存。
+        Args:
+            source (fantas.Surface): 源 Surface。
+            area (fantas.RectLike): 源 Surface 中要绘制的区域，超出最大尺寸的部分会被裁剪。
+            point (tuple[int, int]): 随图像一同保存的坐标，比如鼠标在图像中的位置。
+        """
+        buf = self.shm.buf
+        rect = fantas.Rect(area)
+        (sequence,) = struct.unpack_from("<Q", buf, 0)
+        # 序号为奇数表示正在写入
+        struct.pack_into("<Q", buf, 0, sequence + 1)
+        begin = FRAME_HEADER.size
+        size = rect.width * rect.height * 4
+        if size > len(buf) - begin:
+            rect.height = (len(buf) - begin) // (rect.width * 4)
+            size = rect.width * rect.height * 4
+        target = fantas.image.frombuffer(
+            buf[begin : begin + size], rect.size, "RGBA"
+        )
+        target.blit(source, (0, 0), rect)
+        FRAME_HEADER.pack_into(
+            buf, 0, sequence + 1, point[0], point[1], rect.width, rect.height
+        )
+        struct.pack_into("<Q", buf, 0, sequence + 2)
+
+    def read(self) -> tuple[tuple[int, int], tuple[int, int], bytes] | None:
+        """
+        读取最新的一帧。
+        Returns:
+            tuple[tuple[int, int], tuple[int, int], bytes] | None:
+                (坐标, 尺寸, RGBA 像素数据)，没有新的完整帧时返回 None。
+        """
+        buf = self.shm.buf
+        sequence, x, y, width, height = FRAME_HEADER.unpack_from(buf, 0)
+        if sequence & 1 or sequence == self.last_sequence:
+            return None
+        begin = FRAME_HEADER.size
+        data = bytes(buf[begin : begin + width * height * 4])
+        # 读取期间被覆盖时放弃本次读取
+        if struct.unpack_from("<Q", buf, 0)[0] != sequence:
+            return None
+        self.last_sequence = sequence
+        return (x, y), (width, height), data
+
+    def close(self) -> None:
+        """
+        关闭共享内存，由本进程创建时同时释放它。
+        """
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
@@ -0,0 +1,266 @@
+"""
+提供 Chrome 追踪事件格式的性能追踪工具，导出的文件可以用 Perfetto 或 chrome://tracing 打开。
+"""
+
+from __future__ import annotations
+import os
+import json
+import atexit
+from pathlib import Path
+from collections import deque
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+
+import fantas
+from fantas.base.framefunc import framefunc_dict
+from fantas.base.renderer import render_commands
+
+__all__ = ("Tracer",)
+
+
+@dataclass(slots=True)
+class Tracer(fantas.FrameHook):
+    """
+    性能追踪器，记录帧阶段、帧函数、事件分发与渲染命令的耗时。
+    事件保存在环形缓冲区中，超出 max_events 时丢弃最早的事件。
+    通过 Window.add_hook 或 WindowConfig.trace_file 启用，未启用时没有额外开销。
+    Args:
+        tid                   : 追踪线程 ID，在追踪查看器中显示为一条轨道，通常为窗口 ID。
+        max_events            : 保存的最大事件数量。
+        trace_render_commands : 是否记录每个渲染命令，节点很多时会产生大量事件。
+    """
+
+    tid: int = 0
+    max_events: int = 1_000_000
+    trace_render_commands: bool = True
+
+    pid: int = field(default_factory=os.getpid, init=False)  # 进程 ID
+    events: deque[dict[str, object]] = field(
+        init=False, repr=False
+    )  # 追踪事件，按记录顺序排列
+    origin: int = field(
+        default_factory=fantas.get_time_ns, init=False, repr=False
+    )  # 时间原点（纳秒）
+    last_time: int = field(
+        default_factory=fantas.get_time_ns, init=False, repr=False
+    )  # 上一次记录阶段的时间点（纳秒）
+    frame_start: int = field(
+        default_factory=fantas.get_time_ns, init=False, repr=False
+    )  # 当前帧的开始时间点（纳秒）
+    frame_count: int = field(default=0, init=False)  # 已结束的帧数
+    window: fantas.Window | None = field(
+        default=None, init=False, repr=False
+    )  # 最近挂载的窗口，用于确定事件的目标 UI 元素
+
+    def __post_init__(self) -> None:
+        self.events = deque(maxlen=self.max_events)
+
+    def add_complete_event(
+        self,
+        name: str,
+        category: str,
+        start: int,
+        end: int,
+        args: dict[str, object] | None = None,
+    ) -> None:
+        """
+        添加一个完整事件（ph 为 "X"）。
+        Args:
+            name (str): 事件名称。
+            category (str): 事件类别。
+            start (int): 开始时间点（纳秒）。
+            end (int): 结束时间点（纳秒）。
+            args (dict[str, object] | None): 附加参数。
+        """
+        event: dict[str, object] = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start - self.origin) / 1000,
+            "dur": (end - start) / 1000,
+            "pid": self.pid,
+            "tid": self.tid,
+        }
+        if args is not None:
+            event["args"] = args
+        self.events.append(event)
+
+    def record(self, phase: str) -> None:
+        """
+        记录从上一次调用 record 方法到当前的帧阶段。
+        Args:
+            phase (str): 阶段名称。
+        """
+        current_time = fantas.get_time_ns()
+        self.add_complete_event(phase, "phase", self.last_time, current_time)
+        self.last_time = current_time
+
+    def end_frame(self) -> None:
+        """
+        结束当前帧，记录从上一帧结束到当前的整帧事件。
+        """
+        current_time = fantas.get_time_ns()
+        self.add_complete_event(
+            "Frame",
+            "frame",
+            self.frame_start,
+            current_time,
+            {"frame": self.frame_count},
+        )
+        self.frame_count += 1
+        self.frame_start = self.last_time = current_time
+
+    def attach(self, window: fantas.Window) -> None:
+        """
+        挂载到窗口时记录该窗口的渲染命令。
+        Args:
+            window (fantas.Window): 窗口对象。
+        """
+        window.renderer.tracer = self
+        self.window = window
+
+    def detach(self, window: fantas.Window) -> None:
+        """
+        从窗口卸载时停止记录该窗口的渲染命令。
+        Args:
+            window (fantas.Window): 窗口对象。
+        """
+        if window.renderer.tracer is self:
+            window.renderer.tracer = None
+        if self.window is window:
+            self.window = None
+
+    def loop_start(self) -> None:
+        """
+        进入主循环时将当前帧的开始时间点与上一次记录阶段的时间点更新为当前时间。
+        """
+        self.frame_start = self.last_time = fantas.get_time_ns()
+
+    def wrap_handle_event(
+        self, handle_event: Callable[[fantas.Event], None]
+    ) -> Callable[[fantas.Event], None]:
+        """
+        包装事件处理函数，记录每次事件分发的事件类型与目标 UI 元素。
+        Args:
+            handle_event (Callable[[fantas.Event], None]): 事件处理函数。
+        Returns:
+            Callable[[fantas.Event], None]: 记录耗时的事件处理函数。
+        """
+        event_name = fantas.event.event_name
+
+        def traced_handle_event(event: fantas.Event) -> None:
+            # 每次调用时读取 fantas.get_time_ns，与帧阶段使用同一个时钟（比如回放时的虚拟时钟）
+            start = fantas.get_time_ns()
+            args: dict[str, object] = {"type": event.type}
+            # 目标 UI 元素需要在分发前确定，与 EventHandler.handle_event 一致
+            window = getattr(event, "window", None) or self.window
+            if window is not None:
+                args["ui_id"] = window.event_handler.get_focused_ui(event).ui_id
+            handle_event(event)
+            self.add_complete_event(
+                event_name(event.type), "event", start, fantas.get_time_ns(), args
+            )
+
+        return traced_handle_event
+
+    def wrap_run_framefuncs(
+        self, run_framefuncs: Callable[[], None]
+    ) -> Callable[[], None]:
+        """
+        替换为逐个记录帧函数耗时的 run_framefuncs 方法。
+        Args:
+            run_framefuncs (Callable[[], None]): 运行帧函数的函数，会被忽略。
+        Returns:
+            Callable[[], None]: 本追踪器的 run_framefuncs 方法。
+        """
+        return self.run_framefuncs
+
+    def run_framefuncs(self) -> None:
+        """
+        运行所有已启动的帧函数，并记录每个帧函数的耗时。
+        """
+        get_time_ns = fantas.get_time_ns
+        for func_id, framefunc in tuple(framefunc_dict.items()):
+            start = get_time_ns()
+            done = framefunc.call()
+            self.add_complete_event(
+                type(framefunc).__name__,
+                "framefunc",
+                start,
+                get_time_ns(),
+                {"func_id": func_id},
+            )
+            if done:
+                framefunc_dict.pop(func_id)
+
+    def render_commands(
+        self,
+        commands: Iterable[fantas.RenderCommand],
+        target_surface: fantas.Surface,
+    ) -> None:
+        """
+        执行渲染命令，并记录每个渲染命令的耗时。
+        不记录渲染命令时与 render_commands 函数相同。
+        Args:
+            commands (Iterable[fantas.RenderCommand]): 按层级升序排列的渲染命令。
+            target_surface (fantas.Surface): 目标 Surface 对象。
+        """
+        if not self.trace_render_commands:
+            render_commands(commands, target_surface)
+            return
+        get_time_ns = fantas.get_time_ns
+        for command in commands:
+            start = get_time_ns()
+            blits = command.get_blits()
+            if blits is None:
+                command.render(target_surface)
+            else:
+                target_surface.blits(blits, doreturn=False)
+            self.add_complete_event(
+                type(command).__name__,
+                "render",
+                start,
+                get_time_ns(),
+                {"ui_id": command.creator.ui_id},
+            )
+
+    def to_dict(self) -> dict[str, object]:
+        """
+        将记录的事件转换为 Chrome 追踪事件格式的字典。
+        Returns:
+            dict[str, object]: 可以序列化为 JSON 的追踪数据。
+        """
+        thread_name = {
+            "name": "thread_name",
+            "ph": "M",
+            "pid": self.pid,
+            "tid": self.tid,
+            "args": {"name": f"fantas window {self.tid}"},
+        }
+        return {
+            "traceEvents": [thread_name, *self.events],
+            "displayTimeUnit": "ms",
+        }
+
+    def dump(self, path: str | Path) -> None:
+        """
+        将记录的事件保存为 JSON 文件。
+        Args:
+            path (str | Path): 文件路径。
+        """
+        Path(path).write_text(json.dumps(self.to_dict()), encoding="utf-8")
+
+    def dump_at_exit(self, path: str | Path) -> None:
+        """
+        在程序退出时将记录的事件保存为 JSON 文件。
+        Args:
+            path (str | Path): 文件路径。
+        """
+        atexit.register(self.dump, path)
+
+    def clear(self) -> None:
+        """
+        清空记录的事件。
+        """
+        self.events.clear()
+        self.frame_count = 0
@@ -0,0 +1,46 @@
+from fantas import Surface, SurfaceCache, get_surface_bytes
+
+
+def test_surface_cache_lru_by_entries():
+    cache = SurfaceCache(max_entries=2)
+    a, b, c = Surface((2, 2)), Surface((2, 2)), Surface((2, 2))
+    cache.set("a", a)
+    cache.set("b", b)
+    assert cache.get("a") is a
+    cache.set("c", c)
+    assert "b" not in cache
+    assert cache.get("a") is a
+    assert cache.get("c") is c
+    assert len(cache) == 2
+
+
+def test_surface_cache_byte_budget():
+    surface = Surface((16, 16))
+    size = get_surface_bytes(surface)
+    cache = SurfaceCache(max_bytes=size * 2)
+    for i in range(3):
+        cache.set(i, Surface((16, 16)))
+    assert 0 not in cache
+    assert cache.total_bytes == size * 2
+    cache.set("huge", Surface((64, 64)))
+    assert "huge" not in cache
+    cache.pop(1)
+    assert cache.total_bytes == size
+    cache.clear()
+    assert cache.total_bytes == 0
+    assert len(cache) == 0
+
+
+def test_surface_cache_refcount_pins_entries():
+    cache = SurfaceCache(max_entries=1)
+    a, b = Surface((2, 2)), Surface((2, 2))
+    cache.set("a", a)
+    assert cache.acquire("a") is a
+    cache.set("b", b)
+    assert "a" in cache
+    assert "b" not in cache
+    cache.release("a")
+    cache.set("b", b)
+    assert "a" not in cache
+    assert cache.acquire("missing") is None
+    assert cache.refcounts == {}
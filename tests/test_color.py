@@ -1,4 +1,4 @@
-from fantas import get_distinct_blackorwhite, Color
+from fantas import get_distinct_blackorwhite, get_color_key, Color
 
 
 def test_get_distinct_blackorwhite():
@@ -13,3 +13,11 @@ def test_get_distinct_blackorwhite():
     assert get_distinct_blackorwhite(Color("#800000")) == Color("#FFFFFF")
     assert get_distinct_blackorwhite(Color("#008000")) == Color("#FFFFFF")
     assert get_distinct_blackorwhite(Color("#000080")) == Color("#FFFFFF")
+
+
+def test_get_color_key():
+    assert get_color_key(None) is None
+    assert get_color_key("red") == "red"
+    assert get_color_key(Color(1, 2, 3, 4)) == (1, 2, 3, 4)
+    assert get_color_key([1, 2, 3]) == (1, 2, 3)
+    assert hash(get_color_key(Color("#123456")))
@@ -0,0 +1,263 @@
+import gc
+
+import fantas
+from fantas import UI
+
+
+class FakeWindow:
+    size = (100, 100)
+
+    def __init__(self):
+        self.root_ui = UI()
+
+
+def create_handler():
+    window = FakeWindow()
+    return fantas.EventHandler(window), window.root_ui  # type: ignore[arg-type]
+
+
+def test_dispatch_chain_order_and_cache():
+    handler, root = create_handler()
+    middle, leaf = UI(), UI()
+    root.append(middle)
+    middle.append(leaf)
+    calls = []
+    event_type = fantas.MOUSECLICKED
+    for ui, name in ((root, "root"), (middle, "middle"), (leaf, "leaf")):
+        for capture in (True, False):
+            handler.add_event_listener(
+                event_type,
+                ui,
+                capture,
+                lambda _, n=name, c=capture: calls.append((n, c)),
+            )
+    handler.handle_event(fantas.Event(event_type), focused_ui=leaf)
+    assert calls == [
+        ("root", True),
+        ("middle", True),
+        ("leaf", True),
+        ("leaf", False),
+        ("middle", False),
+        ("root", False),
+    ]
+    chain = handler.get_dispatch_chain(event_type, leaf)
+    assert handler.get_dispatch_chain(event_type, leaf) is chain
+    assert handler.get_dispatch_chain(event_type, root) is handler.get_dispatch_chain(
+        event_type, root
+    )
+
+
+def test_listener_removed_during_dispatch():
+    handler, root = create_handler()
+    leaf = UI()
+    root.append(leaf)
+    calls = []
+    event_type = fantas.MOUSECLICKED
+
+    def parent_listener(_):
+        calls.append("root")
+
+    def leaf_listener(_):
+        calls.append("leaf")
+        # 冒泡阶段中移除尚未调用的监听器
+        handler.remove_event_listener(event_type, root, False, parent_listener)
+
+    handler.add_event_listener(event_type, leaf, False, leaf_listener)
+    handler.add_event_listener(event_type, root, False, parent_listener)
+    handler.handle_event(fantas.Event(event_type), focused_ui=leaf)
+    assert calls == ["leaf"]
+    key = (event_type, leaf.ui_id, False)
+    assert handler.get_dispatch_chain(event_type, leaf) == ((key, leaf_listener),)
+
+
+def test_shared_listener_removed_on_one_node_during_dispatch():
+    handler, root = create_handler()
+    leaf = UI()
+    root.append(leaf)
+    calls = []
+    event_type = fantas.MOUSECLICKED
+
+    def shared(_):
+        calls.append("shared")
+
+    def remover(_):
+        handler.remove_event_listener(event_type, root, False, shared)
+
+    # 同一个函数注册在两个节点上，只移除尚未调用的那一次注册
+    handler.add_event_listener(event_type, leaf, False, shared)
+    handler.add_event_listener(event_type, leaf, False, remover)
+    handler.add_event_listener(event_type, root, False, shared)
+    handler.handle_event(fantas.Event(event_type), focused_ui=leaf)
+    assert calls == ["shared"]
+
+def test_dispatch_chain_invalidation():
+    handler, root = create_handler()
+    a, b, leaf = UI(), UI(), UI()
+    root.append(a)
+    root.append(b)
+    a.append(leaf)
+    calls = []
+    event_type = fantas.MOUSECLICKED
+    handler.add_event_listener(event_type, a, False, lambda _: calls.append("a"))
+    handler.add_event_listener(event_type, b, False, lambda _: calls.append("b"))
+    handler.handle_event(fantas.Event(event_type), focused_ui=leaf)
+    assert calls == ["a"]
+    # 增加监听器
+    handler.add_event_listener(event_type, leaf, False, lambda _: calls.append("leaf"))
+    handler.handle_event(fantas.Event(event_type), focused_ui=leaf)
+    assert calls == ["a", "leaf", "a"]
+    # 树结构变化
+    b.append(leaf)
+    calls.clear()
+    handler.handle_event(fantas.Event(event_type), focused_ui=leaf)
+    assert calls == ["leaf", "b"]
+    # 停止传递
+    handler.add_event_listener(event_type, root, True, lambda _: True)
+    calls.clear()
+    handler.handle_event(fantas.Event(event_type), focused_ui=leaf)
+    assert not calls
+
+
+def create_motion(pos, rel, buttons=(0, 0, 0), window=None):
+    return fantas.Event(
+        fantas.MOUSEMOTION,
+        pos=pos,
+        rel=rel,
+        buttons=buttons,
+        touch=False,
+        window=window,
+    )
+
+
+def test_coalesce_mousemotion():
+    key = fantas.Event(fantas.KEYDOWN, key=97)
+    other = object()
+    events = [
+        create_motion((1, 1), (1, 1)),
+        create_motion((3, 2), (2, 1), (1, 0, 0)),
+        create_motion((4, 4), (1, 2), (0, 0, 1)),
+        key,
+        create_motion((5, 4), (1, 0)),
+        create_motion((6, 4), (1, 0), window=other),
+    ]
+    merged = fantas.coalesce_mousemotion(events)
+    assert len(merged) == 4
+    assert merged[0].pos == (4, 4)
+    assert merged[0].rel == (4, 4)
+    assert merged[0].buttons == (1, 0, 1)
+    assert merged[1] is key
+    assert merged[2] is events[4] and merged[3] is events[5]
+    single = [create_motion((1, 1), (1, 1)), key]
+    assert fantas.coalesce_mousemotion(single) is single
+
+
+def create_fill_command(parent, rect):
+    creator = UI()
+    parent.append(creator)
+    command = fantas.ColorFillCommand(creator=creator)
+    command.dest_rect = fantas.Rect(rect)
+    command.color = "black"
+    command.blend_flag = 0
+    return command
+
+
+def test_hover_hit_test_cache(monkeypatch):
+    window = FakeWindow()
+    window.renderer = fantas.Renderer(window)  # type: ignore[attr-defined]
+    handler = fantas.EventHandler(window)  # type: ignore[arg-type]
+    panel = create_fill_command(window.root_ui, (0, 0, 100, 100))
+    button = create_fill_command(panel.creator, (40, 40, 10, 10))
+    window.renderer.queue.extend([panel, button])
+    window.renderer.queue_generation += 1
+    calls = []
+    hit_test_command = fantas.Renderer.hit_test_command
+
+    def counted_hit_test_command(self, point):
+        calls.append(point)
+        return hit_test_command(self, point)
+
+    monkeypatch.setattr(fantas.Renderer, "hit_test_command", counted_hit_test_command)
+    handler.handle_event(create_motion((10, 10), (0, 0)))
+    handler.handle_event(create_motion((20, 20), (10, 10)))
+    assert handler.hover_ui is panel.creator
+    assert calls == [(10, 10)]
+    # 移动到上层渲染命令上
+    handler.handle_event(create_motion((45, 45), (25, 25)))
+    assert handler.hover_ui is button.creator
+    assert calls == [(10, 10), (45, 45)]
+    # 渲染队列变化后重新进行命中测试
+    window.renderer.queue_generation += 1
+    handler.handle_event(create_motion((46, 46), (1, 1)))
+    assert handler.hover_ui is button.creator
+    assert len(calls) == 3
+
+
+
+def test_hover_cache_checks_grid_candidates(monkeypatch):
+    window = FakeWindow()
+    window.size = (640, 480)
+    window.renderer = fantas.Renderer(window)  # type: ignore[attr-defined]
+    handler = fantas.EventHandler(window)  # type: ignore[arg-type]
+    background = create_fill_command(window.root_ui, (0, 0, 640, 480))
+    tiles = [
+        create_fill_command(background.creator, (x * 10, 300, 10, 10))
+        for x in range(64)
+    ]
+    window.renderer.queue.extend([background, *tiles])
+    window.renderer.queue_generation += 1
+    tested = []
+    hit_test = fantas.ColorFillCommand.hit_test
+
+    def counted_hit_test(self, point):
+        tested.append(self)
+        return hit_test(self, point)
+
+    monkeypatch.setattr(fantas.ColorFillCommand, "hit_test", counted_hit_test)
+    handler.handle_event(create_motion((10, 10), (0, 0)))
+    assert handler.hover_ui is background.creator
+    tested.clear()
+    # 复用命中结果时只检查同一网格单元中的上层候选，而不是整个渲染队列
+    handler.handle_event(create_motion((12, 12), (2, 2)))
+    assert handler.hover_ui is background.creator
+    assert tested == [background]
+    handler.handle_event(create_motion((15, 305), (3, 293)))
+    assert handler.hover_ui is tiles[1].creator
+
+class Row(UI):
+    def on_click(self, _):
+        return None
+
+
+def test_weak_listener_purged_on_collect():
+    handler, root = create_handler()
+    row = Row()
+    root.append(row)
+    event_type = fantas.MOUSECLICKED
+    handler.add_event_listener(event_type, row, False, row.on_click, weak=True)
+    handler.handle_event(fantas.Event(event_type), focused_ui=row)
+    ui_id = row.ui_id
+    root.remove(row)
+    # 窗口根元素会在子树被移除时调用
+    handler.release_detached(row)
+    del row
+    gc.collect()
+    assert ui_id not in handler.listener_keys
+    assert all(key[1] != ui_id for key in handler.listener_dict)
+
+
+def test_remove_and_purge_listeners():
+    handler, root = create_handler()
+    row, child = Row(), UI()
+    root.append(row)
+    row.append(child)
+    event_type = fantas.MOUSECLICKED
+    handler.add_event_listener(event_type, row, False, row.on_click, weak=True)
+    handler.remove_event_listener(event_type, row, False, row.on_click)
+    assert (event_type, row.ui_id, False) not in handler.listener_dict
+    handler.add_event_listener(event_type, row, True, lambda _: None)
+    handler.add_event_listener(event_type, child, False, lambda _: None)
+    count = len(handler.listener_dict)
+    handler.purge_listeners(row)
+    assert len(handler.listener_dict) == count - 2
+    assert row.ui_id not in handler.finalizers
+    assert child.ui_id not in handler.finalizers
@@ -0,0 +1,85 @@
+import csv
+import json
+import math
+
+import pytest
+
+from fantas import FrameTimeRecorder, get_budget_ms, percentile
+
+
+def test_percentile_nearest_rank():
+    values = [float(i) for i in range(1, 101)]
+    assert percentile(values, 0.5) == 50.0
+    assert percentile(values, 0.99) == 99.0
+    assert percentile(values, 1.0) == 100.0
+    assert percentile(values, 0.0) == 1.0
+    assert percentile([], 0.5) == 0.0
+
+
+def test_frame_time_stats_and_jank():
+    recorder = FrameTimeRecorder(budget_ms=10.0, history=100)
+    for i in range(100):
+        render = 30.0 if i == 50 else 4.0
+        recorder.add_frame({"Idle": 12.0, "Event": 1.0, "Render": render})
+    stats = recorder.stats()
+    assert stats.count == 100
+    assert stats.p50 == pytest.approx(5.0)
+    assert stats.p99 == pytest.approx(5.0)
+    assert stats.max == pytest.approx(31.0)
+    assert stats.jank == recorder.jank_count == 1
+    assert recorder.stats("Idle").jank == 100
+    assert recorder.get_phases() == ["Idle", "Event", "Render", "Frame"]
+    assert recorder.histogram(bin_ms=5.0) == [0, 99, 0, 0, 0, 0, 1]
+
+
+def test_frame_time_ring_buffer():
+    recorder = FrameTimeRecorder(history=4)
+    for i in range(10):
+        recorder.add_frame({"Render": float(i)})
+    assert recorder.get_times() == [6.0, 7.0, 8.0, 9.0]
+    assert recorder.frame_count == 10
+    recorder.record("Render")
+    recorder.end_frame()
+    assert recorder.frame_count == 11
+    assert recorder.get_times("Render")[-1] >= 0.0
+    recorder.reset()
+    assert recorder.stats().count == 0
+
+
+def test_frame_time_dump(tmp_path):
+    recorder = FrameTimeRecorder(history=2)
+    for i in range(3):
+        recorder.add_frame({"Event": 1.0, "Render": float(i)})
+    recorder.dump(tmp_path / "frames.json")
+    data = json.loads((tmp_path / "frames.json").read_text(encoding="utf-8"))
+    assert data["frame_count"] == 3
+    assert data["stats"]["Frame"]["max"] == 3.0
+    assert data["frames"][-1] == {"Event": 1.0, "Render": 2.0, "Frame": 3.0}
+    recorder.dump(tmp_path / "frames.csv")
+    with open(tmp_path / "frames.csv", encoding="utf-8", newline="") as file:
+        rows = list(csv.reader(file))
+    assert rows[0] == ["frame", "Event", "Render", "Frame"]
+    assert rows[1] == ["1", "1.0", "1.0", "2.0"]
+    assert len(rows) == 3
+
+
+def test_frame_budget_follows_window_fps():
+    class FakeWindow:
+        fps = 0
+
+    assert get_budget_ms(0) == math.inf
+    window = FakeWindow()
+    recorder = FrameTimeRecorder()
+    recorder.attach(window)  # type: ignore[arg-type]
+    recorder.add_frame({"Render": 1000.0})
+    assert recorder.jank_count == 0
+    assert recorder.to_dict()["budget_ms"] is None
+    window.fps = 100
+    recorder.end_frame()
+    assert recorder.budget_ms == 10.0
+    recorder.add_frame({"Render": 20.0})
+    assert recorder.jank_count == 1
+    recorder.detach(window)  # type: ignore[arg-type]
+    window.fps = 50
+    recorder.end_frame()
+    assert recorder.budget_ms == 10.0
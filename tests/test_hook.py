@@ -0,0 +1,64 @@
+import fantas
+from fantas import FrameHook, FrameHookChain, chain_hooks
+
+
+class RecordingHook(FrameHook):
+    __slots__ = ("calls",)
+
+    def __init__(self):
+        self.calls = []
+
+    def record(self, phase):
+        self.calls.append(phase)
+
+    def end_frame(self):
+        self.calls.append("end")
+
+    def wrap_handle_event(self, handle_event):
+        def wrapped(event):
+            self.calls.append("event")
+            handle_event(event)
+
+        return wrapped
+
+
+def test_chain_hooks_specialises():
+    a, b = RecordingHook(), RecordingHook()
+    assert chain_hooks([]) is None
+    assert chain_hooks([a, a]) is a
+    chain = chain_hooks([a, b, a])
+    assert isinstance(chain, FrameHookChain)
+    assert chain.hooks == (a, b)
+    chain.record("Idle")
+    chain.end_frame()
+    assert a.calls == b.calls == ["Idle", "end"]
+
+
+def test_hook_chain_wraps_in_order():
+    a, b = RecordingHook(), RecordingHook()
+    handled = []
+    handle_event = chain_hooks([a, b]).wrap_handle_event(handled.append)
+    event = fantas.Event(fantas.MOUSECLICKED)
+    handle_event(event)
+    assert handled == [event]
+    assert a.calls == b.calls == ["event"]
+    run_framefuncs = fantas.run_framefuncs
+    assert FrameHook().wrap_run_framefuncs(run_framefuncs) is run_framefuncs
+
+
+def test_frame_time_recorder_is_hook():
+    recorder = fantas.FrameTimeRecorder()
+    hook = chain_hooks([recorder, RecordingHook()])
+    hook.loop_start()
+    for phase in ("Idle", "Event", "FrameFunc", "PreRender", "Render"):
+        hook.record(phase)
+    hook.end_frame()
+    assert recorder.frame_count == 1
+    assert recorder.get_phases() == [
+        "Idle",
+        "Event",
+        "FrameFunc",
+        "PreRender",
+        "Render",
+        "Frame",
+    ]
@@ -0,0 +1,319 @@
+import pytest
+
+import fantas
+from fantas import Rect, Renderer
+from fantas.base.renderer import merge_rects, render_commands
+
+
+def test_merge_rects_overlapping():
+    merged = merge_rects([Rect(0, 0, 10, 10), Rect(5, 5, 10, 10)])
+    assert merged == [Rect(0, 0, 15, 15)]
+
+
+def test_merge_rects_chain():
+    merged = merge_rects([Rect(0, 0, 10, 10), Rect(20, 0, 10, 10), Rect(8, 0, 14, 10)])
+    assert merged == [Rect(0, 0, 30, 10)]
+
+
+def test_merge_rects_disjoint_and_empty():
+    merged = merge_rects([Rect(0, 0, 10, 10), Rect(50, 50, 10, 10), Rect(5, 5, 0, 0)])
+    assert sorted(map(tuple, merged)) == [(0, 0, 10, 10), (50, 50, 10, 10)]
+
+
+class FakeWindow:
+    size = (640, 480)
+    root_ui = None
+
+
+def create_fill_command(rect):
+    command = fantas.ColorFillCommand(creator=fantas.UI())
+    command.dest_rect = Rect(rect)
+    command.color = "black"
+    command.blend_flag = 0
+    return command
+
+
+def create_renderer(commands):
+    renderer = Renderer(FakeWindow())  # type: ignore[arg-type]
+    renderer.queue.extend(commands)
+    renderer.queue_generation += 1
+    return renderer
+
+
+@pytest.mark.parametrize("count", [4, 400])
+def test_hit_test_command_topmost_first(count):
+    commands = [
+        create_fill_command(((i % 20) * 32, (i // 20) * 24, 48, 36))
+        for i in range(count)
+    ]
+    renderer = create_renderer(commands)
+    for point in [(0, 0), (40, 30), (300, 200), (639, 479), (700, 10), (-5, 5)]:
+        expected = None
+        for command in reversed(commands):
+            if command.hit_test(point):
+                expected = command
+                break
+        assert renderer.hit_test_command(point) is expected
+
+
+def test_hit_test_command_global_and_rebuild():
+    background = fantas.ColorBackgroundFillCommand(creator=fantas.UI())
+    commands = [background] + [
+        create_fill_command((i * 10, 0, 10, 10)) for i in range(100)
+    ]
+    renderer = create_renderer(commands)
+    assert renderer.hit_test_command((5, 5)) is commands[1]
+    assert renderer.hit_test_command((5, 200)) is background
+    commands[1].dest_rect = Rect(0, 100, 10, 10)
+    renderer.queue_generation += 1
+    assert renderer.hit_test_command((5, 5)) is background
+    assert renderer.hit_test_command((5, 105)) is commands[1]
+
+
+def test_occlusion_culling():
+    bottom = create_fill_command((10, 10, 20, 20))
+    partly_hidden = create_fill_command((90, 90, 20, 20))
+    cover = create_fill_command((0, 0, 100, 100))
+    blended = create_fill_command((0, 0, 200, 200))
+    blended.blend_flag = fantas.BLEND_ADD
+    renderer = create_renderer([bottom, partly_hidden, cover, blended])
+    visible = renderer.get_visible_queue(Rect(0, 0, 640, 480))
+    assert visible == [partly_hidden, cover, blended]
+    renderer.queue.append(fantas.ColorBackgroundFillCommand(creator=fantas.UI()))
+    renderer.queue_generation += 1
+    assert renderer.get_visible_queue(Rect(0, 0, 640, 480)) == [renderer.queue[-1]]
+
+
+def create_image_command(color, pos):
+    surface = fantas.Surface((4, 4))
+    surface.fill(color)
+    command = fantas.SurfaceRenderCommand(creator=fantas.UI())
+    command.surface = surface
+    command.dest_rect = Rect(pos, (4, 4))
+    command.fill_mode = fantas.FillMode.IGNORE
+    return command
+
+
+def test_hit_test_with_occlusion_culling():
+    image = create_image_command("red", (10, 10))
+    text = create_text_command((20, 20, 60, 30))
+    dialog = create_fill_command((0, 0, 100, 100))
+    renderer = create_renderer([image, text, dialog])
+    renderer.occlusion_culling = True
+    renderer.render(fantas.Surface((640, 480)))
+    assert renderer.get_visible_queue(Rect(0, 0, 640, 480)) == [dialog]
+    assert renderer.hit_test_command((200, 200)) is None
+    assert renderer.hit_test_command((12, 12)) is dialog
+    # 被剔除的渲染命令也能正确地进行命中测试
+    assert image.hit_test((12, 12))
+    assert not image.hit_test((14, 14))
+    rendered = create_text_command((20, 20, 60, 30))
+    rendered.get_blits()
+    assert text.hit_test(rendered.affected_rects[0].center)
+    assert not text.hit_test((85, 55))
+
+
+def test_render_commands_batches_blits():
+    target = fantas.Surface((16, 16))
+    commands = [
+        create_image_command("red", (0, 0)),
+        create_image_command("green", (2, 0)),
+        create_fill_command((3, 0, 1, 1)),
+        create_image_command("blue", (8, 8)),
+    ]
+    commands[2].color = "white"
+    render_commands(commands, target)
+    assert target.get_at((0, 0)) == fantas.Color("red")
+    assert target.get_at((2, 0)) == fantas.Color("green")
+    assert target.get_at((3, 0)) == fantas.Color("white")
+    assert target.get_at((8, 8)) == fantas.Color("blue")
+    assert commands[3].hit_test((11, 11))
+    assert not commands[3].hit_test((12, 12))
+
+
+@pytest.mark.parametrize("flags", [0, fantas.SRCALPHA])
+def test_repeat_uses_tiled_cache(flags):
+    tile = fantas.Surface((3, 2), flags)
+    tile.fill((10, 20, 30, 128) if flags else (10, 20, 30))
+    tile.set_at((0, 0), (200, 100, 50, 255))
+    command = fantas.SurfaceRenderCommand(creator=fantas.UI())
+    command.surface = tile
+    command.dest_rect = Rect(1, 1, 8, 5)
+    command.fill_mode = fantas.FillMode.REPEAT
+    blits = command.get_blits()
+    assert len(blits) == 1
+    tiled, pos = blits[0]
+    assert pos == (1, 1)
+    assert tiled.get_size() == (8, 5)
+    assert tiled.get_at((3, 2)) == tile.get_at((0, 0))
+    assert tiled.get_at((7, 4)) == tile.get_at((1, 0))
+    assert command.get_blits()[0][0] is tiled
+    command.mark_dirty()
+    assert command.get_blits()[0][0] is not tiled
+
+
+def create_label_command(rect, style):
+    command = fantas.LabelRenderCommand(creator=fantas.UI())
+    command.rect = Rect(rect)
+    command.style = style
+    return command
+
+
+def test_label_raster_shared():
+    style = fantas.LabelStyle(bgcolor="white", border_width=2, border_radius=6)
+    a = create_label_command((0, 0, 40, 20), style)
+    b = create_label_command((50, 50, 40, 20), style.copy())
+    assert a.get_blits()[0][0] is b.get_blits()[0][0]
+    c = create_label_command((0, 0, 40, 20), fantas.LabelStyle(bgcolor="red"))
+    assert c.get_blits() is None
+    assert c.is_opaque()
+    assert not a.is_opaque()
+
+
+def create_text_command(rect, text="fantas\ntext"):
+    command = fantas.TextRenderCommand(creator=fantas.UI())
+    command.text = text
+    command.align_mode = fantas.AlignMode.CENTER
+    command.style = fantas.TextStyle()
+    command.rect = Rect(rect)
+    command.offset = [0, 0]
+    return command
+
+
+def test_text_raster_shared_and_hit_rects():
+    a = create_text_command((0, 0, 100, 60))
+    b = create_text_command((200, 100, 100, 60))
+    raster_a, pos_a = a.get_blits()[0]
+    raster_b, pos_b = b.get_blits()[0]
+    assert raster_a is raster_b
+    assert (pos_a, pos_b) == ((0, 0), (200, 100))
+    assert a.affected_rects
+    assert [r.move(200, 100) for r in a.affected_rects] == b.affected_rects
+    a.mark_dirty()
+    assert a.get_blits()[0][0] is not raster_a
+
+
+def test_text_raster_cache_holds_many_blocks():
+    commands = [
+        create_text_command((0, i * 20, 100, 20), f"row {i}") for i in range(300)
+    ]
+    rasters = [command.get_blits()[0][0] for command in commands]
+    assert all(
+        command.get_blits()[0][0] is raster
+        for command, raster in zip(commands, rasters)
+    )
+
+
+def create_gradient_command(rect, start_pos, end_pos):
+    command = fantas.LinearGradientRenderCommand(creator=fantas.UI())
+    command.rect = Rect(rect)
+    command.start_color = fantas.Color(0, 0, 0)
+    command.end_color = fantas.Color(255, 100, 0)
+    command.start_pos = fantas.Vector2(start_pos)
+    command.end_pos = fantas.Vector2(end_pos)
+    return command
+
+
+@pytest.mark.parametrize("use_numpy", [False, True])
+@pytest.mark.parametrize("end_pos", [(40, 30), (15, 60), (10, 40), (50, 10)])
+def test_linear_gradient_single_pass(monkeypatch, use_numpy, end_pos):
+    import fantas.ext.renderer as ext_renderer
+
+    if use_numpy and not ext_renderer.HAS_NUMPY:
+        pytest.skip("numpy is not installed")
+    monkeypatch.setattr(ext_renderer, "HAS_NUMPY", use_numpy)
+    command = create_gradient_command((10, 10, 40, 30), (10, 10), end_pos)
+    target = fantas.Surface((60, 50))
+    command.render(target)
+    assert not command.cache_dirty
+    assert command.get_blits() is not None
+    v = command.end_pos - command.start_pos
+    for x, y in [(10, 10), (49, 39), (30, 20), (12, 35), (45, 11)]:
+        d = fantas.Vector2(x, y) - command.start_pos
+        t = fantas.math.clamp(d.dot(v) / v.length_squared(), 0, 1)
+        expected = command.start_color.lerp(command.end_color, t)
+        actual = target.get_at((x, y))
+        assert all(abs(a - b) <= 4 for a, b in zip(actual, expected))
+
+
+def test_linear_gradient_shared_cache():
+    from fantas.ext.renderer import gradient_surface_cache
+
+    a = create_gradient_command((0, 0, 30, 20), (0, 0), (30, 20))
+    b = create_gradient_command((50, 40, 30, 20), (50, 40), (80, 60))
+    target = fantas.Surface((100, 100))
+    a.render(target)
+    b.render(target)
+    assert a.surface_cache is b.surface_cache
+    key = a.cache_key
+    assert gradient_surface_cache.refcounts[key] == 2
+    a.mark_dirty()
+    assert gradient_surface_cache.refcounts[key] == 1
+    a.render(target)
+    assert a.surface_cache is b.surface_cache
+    del b
+    assert gradient_surface_cache.refcounts[key] == 1
+
+
+def test_renderer_pending_until_rendered():
+    renderer = create_renderer([create_fill_command((0, 0, 4, 4))])
+    assert renderer.pending
+    renderer.render(fantas.Surface((8, 8)))
+    assert not renderer.pending
+    renderer.mark_dirty((0, 0, 2, 2))
+    assert renderer.pending
+    renderer.render(fantas.Surface((8, 8)))
+    renderer.invalidate()
+    assert renderer.pending
+
+
+def test_render_profiler_reports_per_ui():
+    reports = []
+    profiler = fantas.RenderProfiler(frames=2, on_report=reports.append)
+    commands = [create_fill_command((0, 0, 4, 4)), create_fill_command((4, 4, 4, 4))]
+    commands[1].color = "white"
+    target = fantas.Surface((8, 8))
+    for _ in range(2):
+        list(profiler.profile_commands(commands))
+        profiler.render_commands(commands, target)
+        profiler.end_frame()
+    assert reports == [profiler.report]
+    assert {row[1] for row in profiler.report} == {
+        command.creator.ui_id for command in commands
+    }
+    assert target.get_at((5, 5)) == fantas.Color("white")
+    assert fantas.summarize_by_class(profiler.report)[0][:2] == ("UI", 2)
+    assert profiler.frame_count == 0 and not profiler.class_names
+
+
+def test_render_profiler_bypasses_retained_mode():
+    root = fantas.UI()
+    label = fantas.Label(Rect(0, 0, 10, 10))
+    root.append(label)
+    renderer = Renderer(FakeWindow(), retained_mode=True)  # type: ignore[arg-type]
+    renderer.pre_render(root)
+    generation = renderer.queue_generation
+    renderer.pre_render(root)
+    assert renderer.queue_generation == generation
+    profiler = fantas.RenderProfiler()
+    renderer.profiler = profiler
+    # 分析期间每帧都重新生成渲染命令，并统计到创建它的元素上
+    renderer.pre_render(root)
+    assert renderer.queue_generation == generation + 1
+    assert renderer.retained_commands is None
+    assert label.ui_id in profiler.create_times
+
+def test_tracer_records_render_commands():
+    tracer = fantas.Tracer(tid=7)
+    renderer = create_renderer([create_fill_command((0, 0, 4, 4))])
+    renderer.tracer = tracer
+    renderer.render(fantas.Surface((8, 8)))
+    tracer.record("Render")
+    tracer.end_frame()
+    events = tracer.to_dict()["traceEvents"]
+    assert events[0]["ph"] == "M"
+    assert [event["cat"] for event in events[1:]] == ["render", "phase", "frame"]
+    command_event = events[1]
+    assert command_event["name"] == "ColorFillCommand"
+    assert command_event["args"] == {"ui_id": renderer.queue[0].creator.ui_id}
+    assert all(event["tid"] == 7 for event in events)
@@ -0,0 +1,77 @@
+import pytest
+
+import fantas
+from fantas.utils.replay import pack_frames, unpack_frames
+
+
+class FakeWindow:
+    def __init__(self, window_id):
+        self.id = window_id
+        self.fps = 60
+        self.on_demand = True
+
+
+def record_frames(recorder, frames):
+    handle_event = recorder.wrap_handle_event(lambda _: None)
+    recorder.loop_start()
+    for events in frames:
+        recorder.record("Idle")
+        for event in events:
+            handle_event(event)
+        recorder.end_frame()
+
+
+def test_recorder_round_trip():
+    window = FakeWindow(3)
+    recorder = fantas.EventRecorder()
+    motion = fantas.Event(
+        fantas.MOUSEMOTION,
+        pos=(10, 20),
+        rel=(1, 2),
+        buttons=(0, 0, 0),
+        touch=False,
+        window=window,
+    )
+    clicked = fantas.Event(fantas.MOUSECLICKED, ui=fantas.UI())
+    record_frames(recorder, [[motion], [], [clicked]])
+    frames = unpack_frames(recorder.to_bytes())
+    assert [len(events) for _, events in frames] == [1, 0, 1]
+    assert frames[0][0] <= frames[1][0] <= frames[2][0]
+    windows = {3: window}
+    decoded = fantas.decode_event(frames[0][1][0], windows)  # type: ignore[arg-type]
+    assert decoded.type == fantas.MOUSEMOTION
+    assert decoded.pos == (10, 20) and decoded.rel == (1, 2)
+    assert decoded.window is window
+    # 无法序列化的属性会被跳过
+    assert not hasattr(fantas.decode_event(frames[2][1][0]), "ui")
+    with pytest.raises(ValueError):
+        unpack_frames(b"not a recording")
+
+
+def test_replayer_full_speed():
+    window = FakeWindow(1)
+    key = fantas.Event(fantas.KEYDOWN, key=97, window=window)
+    second = 1_000_000_000
+    frames = pack_frames([(0, ()), (second, (fantas.encode_event(key),))])
+    replayer = fantas.EventReplayer(unpack_frames(frames))
+    real_clock = fantas.get_time_ns
+    replayer.attach(window)  # type: ignore[arg-type]
+    try:
+        assert window.fps == 0 and not window.on_demand
+        # 主循环包装帧钩子之前就已经替换为虚拟时钟
+        assert fantas.get_time_ns == replayer.get_time_ns
+        get_events = replayer.wrap_get_events(list)
+        replayer.loop_start()
+        start = replayer.start_time
+        assert get_events() == []
+        events = get_events()
+        # 第二帧开始处理事件时的虚拟时间与录制时相同
+        assert fantas.get_time_ns() - start >= second
+        assert [event.type for event in events] == [fantas.KEYDOWN, fantas.WINDOWCLOSE]
+        assert events[0].key == 97 and events[0].window is window
+        assert replayer.finished
+        assert fantas.get_time_ns == replayer.get_time_ns
+    finally:
+        replayer.detach(window)  # type: ignore[arg-type]
+    assert fantas.get_time_ns is real_clock
+    assert window.fps == 60 and window.on_demand
@@ -0,0 +1,51 @@
+import pytest
+
+import fantas
+from fantas.utils.shm import SharedFrameBuffer, SharedRingBuffer
+
+
+@pytest.fixture
+def ring():
+    writer = SharedRingBuffer.create(64)
+    reader = SharedRingBuffer.open(writer.name)
+    yield writer, reader
+    reader.close()
+    writer.close()
+
+
+def test_ring_buffer_wraps_in_order(ring):
+    writer, reader = ring
+    received = []
+    for i in range(50):
+        assert writer.write(bytes([i]) * (i % 13))
+        received.append(reader.read())
+    assert received == [bytes([i]) * (i % 13) for i in range(50)]
+    assert reader.read() is None
+
+
+def test_ring_buffer_drops_when_full(ring):
+    writer, reader = ring
+    assert writer.write(b"a" * 40)
+    assert not writer.write(b"b" * 40)
+    assert writer.dropped == 1
+    assert reader.read() == b"a" * 40
+    assert writer.write(b"c" * 40)
+    assert reader.read() == b"c" * 40
+
+
+def test_frame_buffer_roundtrip():
+    writer = SharedFrameBuffer.create((4, 4))
+    reader = SharedFrameBuffer.open(writer.name)
+    surface = fantas.Surface((8, 8))
+    surface.fill("red")
+    surface.fill("blue", (2, 2, 1, 1))
+    assert reader.read() is None
+    writer.write(surface, (1, 1, 3, 2), (1, 1))
+    point, size, pixels = reader.read()
+    assert point == (1, 1) and size == (3, 2)
+    shot = fantas.image.frombuffer(pixels, size, "RGBA")
+    assert shot.get_at((0, 0)) == fantas.Color("red")
+    assert shot.get_at((1, 1)) == fantas.Color("blue")
+    assert reader.read() is None
+    reader.close()
+    writer.close()
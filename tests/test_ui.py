@@ -0,0 +1,162 @@
+import fantas
+from fantas import UI, Label, Rect
+
+
+def create_retained(root):
+    UI.retained = True
+    try:
+        return root.create_retained_render_commands()
+    finally:
+        UI.retained = False
+
+
+def test_version_bumps_ancestors():
+    root = UI()
+    child = Label(Rect(0, 0, 10, 10))
+    root.append(child)
+    version = root.version
+    UI.observe_versions()
+    child.rect = Rect(1, 1, 10, 10)
+    assert root.version > version
+    # 同一变化周期内重复修改只增加自己的版本号
+    version, child_version = root.version, child.version
+    child.rect = Rect(2, 2, 10, 10)
+    assert root.version == version and child.version > child_version
+    UI.observe_versions()
+    root.remove(child)
+    assert root.version > version
+
+
+def test_retained_commands_reused_until_changed():
+    root = UI()
+    a = Label(Rect(0, 0, 10, 10))
+    b = Label(Rect(20, 0, 10, 10))
+    root.append(a)
+    root.append(b)
+    first = create_retained(root)
+    assert create_retained(root) is first
+    b_cache = b.render_cache
+    a.label_style = fantas.LabelStyle(bgcolor="red")
+    second = create_retained(root)
+    assert second is not first
+    assert second == first
+    assert b.render_cache is b_cache
+
+
+def test_retained_in_place_mutation_needs_mark_changed():
+    root = UI()
+    label = Label(Rect(0, 0, 10, 10))
+    root.append(label)
+    create_retained(root)
+    label.rect.x = 5
+    assert create_retained(root)[0].rect.x == 0
+    label.mark_changed()
+    assert create_retained(root)[0].rect.x == 5
+
+
+def test_viewport_culling_skips_contained_subtree():
+    root = UI()
+    panel = fantas.BlankUI(Rect(1000, 0, 100, 100))
+    panel.append(Label(Rect(0, 0, 10, 10)))
+    root.append(panel)
+    UI.viewport = Rect(0, 0, 640, 480)
+    try:
+        assert len(list(root.create_render_commands())) == 1
+        panel.contains_children = True
+        assert list(root.create_render_commands()) == []
+        panel.rect = Rect(600, 0, 100, 100)
+        assert len(list(root.create_render_commands())) == 1
+    finally:
+        UI.viewport = None
+
+
+def test_retained_commands_reused_with_culled_child():
+    root = UI()
+    shown = Label(Rect(0, 0, 10, 10))
+    hidden = fantas.CacheGroup(Rect(1000, 0, 100, 100))
+    hidden.append(Label(Rect(0, 0, 10, 10)))
+    root.append(shown)
+    root.append(hidden)
+    UI.viewport = Rect(0, 0, 640, 480)
+    try:
+        first = create_retained(root)
+        assert len(first) == 1
+        # 被剔除的子节点不影响父节点复用渲染命令
+        assert create_retained(root) is first
+        # 视口变化后重新判断是否剔除
+        UI.viewport = Rect(0, 0, 1280, 480)
+        assert len(create_retained(root)) == 2
+    finally:
+        UI.viewport = None
+
+def test_cache_group_reuses_surface_and_hits_children():
+    root = UI()
+    group = fantas.CacheGroup(Rect(100, 50, 40, 40), bgcolor="black")
+    label = Label(Rect(10, 10, 10, 10), fantas.LabelStyle(bgcolor="red"))
+    group.append(label)
+    root.append(group)
+    (command,) = root.create_render_commands()
+    content_version = command.content_version
+    assert command.surface.get_at((10, 10)) == fantas.Color("red")
+    assert command.get_blits() == ((command.surface, (100, 50)),)
+    (again,) = root.create_render_commands()
+    assert again is command
+    assert command.content_version == content_version
+    assert command.get_hit_ui((115, 65)) is label
+    assert not command.hit_test((105, 55))
+    label.rect = Rect(0, 0, 10, 10)
+    list(root.create_render_commands())
+    assert command.content_version == content_version + 1
+    assert command.get_hit_ui((105, 55)) is label
+
+
+def test_is_animating_checks_subtree():
+    root = UI()
+    panel = fantas.BlankUI(Rect(0, 0, 10, 10))
+    root.append(panel)
+    assert not root.is_animating()
+    playing = UI()
+    playing.set_animating(True)
+    panel.append(playing)
+    assert root.is_animating() and panel.is_animating()
+    # 移动到其他子树时计数随之转移
+    other = UI()
+    root.append(other)
+    other.append(playing)
+    assert not panel.is_animating() and root.is_animating()
+    playing.set_animating(False)
+    assert not root.is_animating()
+    playing.set_animating(True)
+    root.remove(other)
+    assert not root.is_animating() and other.is_animating()
+
+
+def test_layout_data_cleared_on_detach():
+    root = UI()
+    layout = fantas.RelativeLayout()
+    root.append(layout)
+    a = Label(Rect(0, 0, 10, 10))
+    b = Label(Rect(0, 0, 10, 10))
+    layout.append(a, margin_left=5)
+    layout.append(b, margin_top=5)
+    root.append(a)
+    assert a.ui_id not in layout.margin_dict
+    layout.pop(0)
+    assert not layout.margin_dict
+
+
+def test_layout_reused_until_father_resized():
+    root = fantas.BlankUI(Rect(0, 0, 100, 100))
+    layout = fantas.RelativeLayout()
+    root.append(layout)
+    label = Label(Rect(0, 0, 10, 10))
+    layout.append(label, margin_right=5)
+    first = create_retained(root)
+    assert label.rect.right == 95
+    assert create_retained(root) is first
+    root.rect = Rect(0, 0, 200, 100)
+    create_retained(root)
+    assert label.rect.right == 195
+    layout.set_margin_right(label, 10)
+    create_retained(root)
+    assert label.rect.right == 190